@@ -0,0 +1,96 @@
+"""Benchmark refreshing the attribute view for a 10k member structure."""
+import os
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt5.QtWidgets import QApplication, QTreeView
+from asyncua import ua
+
+from uawidgets.attribute_widget import AttributeWidget
+
+
+MEMBERS = 10000
+CHANGED = 100
+ROUNDS = 5
+
+
+class BigStructure:
+    """Structure with many Double members, like a generated one."""
+
+    ua_types = [("Member{}".format(idx), "Double") for idx in range(MEMBERS)]
+
+    def __init__(self, offset: int = 0) -> None:
+        for idx, (name, _) in enumerate(self.ua_types):
+            setattr(self, name, float(idx + (offset if idx < CHANGED else 0)))
+
+
+class FakeNode:
+    """Node answering attribute reads with a big structure as Value."""
+
+    def __init__(self) -> None:
+        self.offset = 0
+
+    def get_attributes(self, attrs):
+        values = []
+        for attr in attrs:
+            if attr == ua.AttributeIds.Value:
+                variant = ua.Variant(BigStructure(self.offset),
+                                     ua.VariantType.ExtensionObject)
+                values.append(ua.DataValue(variant))
+            elif attr == ua.AttributeIds.BrowseName:
+                values.append(ua.DataValue(ua.Variant(ua.QualifiedName("Big"))))
+            else:
+                values.append(ua.DataValue(
+                    ua.Variant(), ua.StatusCode(ua.StatusCodes.BadAttributeIdInvalid)))
+        return values
+
+
+def expand_value(widget: AttributeWidget, view: QTreeView) -> None:
+    """Expand the Value attribute down to the structure members."""
+    value_item = widget._model.findItems("Value")[0]
+    view.setExpanded(value_item.index(), True)
+    view.setExpanded(value_item.child(0, 0).index(), True)
+
+
+def measure(refresh) -> float:
+    """Return the mean duration of a refresh in milliseconds."""
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        refresh()
+        QApplication.processEvents()
+    return (time.perf_counter() - start) / ROUNDS * 1000
+
+
+def main() -> None:
+    """Compare a full rebuild with the in-place diff update."""
+    app = QApplication(sys.argv)
+    view = QTreeView()
+    view.show()
+    widget = AttributeWidget(view)
+    node = FakeNode()
+    widget.show_attributes(node)
+    expand_value(widget, view)
+
+    def rebuild():
+        node.offset += 1
+        widget.clear()
+        widget._current_node = None
+        widget.show_attributes(node)
+        expand_value(widget, view)
+
+    def diff():
+        node.offset += 1
+        widget.show_attributes(node)
+
+    print("Structure with {} members, {} change per refresh".format(
+        MEMBERS, CHANGED))
+    print("full rebuild: {:8.1f} ms".format(measure(rebuild)))
+    print("diff update:  {:8.1f} ms".format(measure(diff)))
+    app.quit()
+
+
+if __name__ == "__main__":
+    main()
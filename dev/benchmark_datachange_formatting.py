@@ -0,0 +1,98 @@
+"""Benchmark data changes of array-valued subscriptions."""
+import datetime
+import os
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt5.QtWidgets import QApplication, QTableView
+from asyncua import ua
+
+from uaclient.handler import DataChangeHandler
+from uaclient.subscription_model import SubscriptionModel
+
+
+ITEMS = 1000
+ARRAY_SIZE = 1000
+# notifications per item between two refreshes of the view
+NOTIFICATIONS = 3
+ROUNDS = 5
+
+
+class FakeNode:
+    """Node with nothing but a NodeId, like the ones of a subscription."""
+
+    def __init__(self, idx: int) -> None:
+        self.nodeid = ua.NodeId(idx, 2)
+
+
+class FakeNotification:
+    """Notification data holding the DataValue of a monitored item."""
+
+    def __init__(self, value: ua.DataValue) -> None:
+        self.monitored_item = ua.MonitoredItemNotification()
+        self.monitored_item.Value = value
+
+
+class EagerHandler(DataChangeHandler):
+    """Handler formatting every notification as received."""
+
+    def datachange_notification(self, node, val, data):
+        value = data.monitored_item.Value
+        str(val)
+        value.StatusCode.name
+        value.SourceTimestamp.isoformat()
+        value.ServerTimestamp.isoformat()
+        DataChangeHandler.datachange_notification(self, node, val, data)
+
+
+def notify(handler: DataChangeHandler, nodes, offset: int) -> None:
+    """Send an array value for every node, like the subscription does."""
+    now = datetime.datetime.utcnow()
+    for node in nodes:
+        array = [float(offset + idx) for idx in range(ARRAY_SIZE)]
+        value = ua.DataValue(ua.Variant(array, ua.VariantType.Double))
+        value.SourceTimestamp = value.ServerTimestamp = now
+        handler.datachange_notification(node, array, FakeNotification(value))
+
+
+def measure(handler: DataChangeHandler, model: SubscriptionModel,
+            nodes) -> float:
+    """Return the mean duration of notifications and a refresh in ms."""
+    elapsed = 0.0
+    for offset in range(ROUNDS):
+        start = time.perf_counter()
+        for _ in range(NOTIFICATIONS):
+            notify(handler, nodes, offset)
+        model.update(handler.take_changes())
+        QApplication.processEvents()
+        elapsed += time.perf_counter() - start
+    return elapsed / ROUNDS * 1000
+
+
+def main() -> None:
+    """Compare formatting on notification with formatting on display."""
+    app = QApplication(sys.argv)
+    nodes = [FakeNode(idx) for idx in range(ITEMS)]
+    model = SubscriptionModel()
+    model.add_nodes(nodes, [str(node.nodeid) for node in nodes],
+                    ua.MonitoringParameters(), "Default")
+    view = QTableView()
+    view.setModel(model)
+    view.resize(1200, 600)
+    view.show()
+    QApplication.processEvents()
+
+    print("{} items with {} element arrays, {} notifications per item "
+          "and refresh".format(ITEMS, ARRAY_SIZE, NOTIFICATIONS))
+    print("format on notification: {:8.1f} ms".format(
+        measure(EagerHandler(), model, nodes)))
+    print("format visible cells:   {:8.1f} ms".format(
+        measure(DataChangeHandler(), model, nodes)))
+    app.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -9,7 +9,9 @@ setup(name="opcua-client",
       packages=["uaclient"],
       license="GNU General Public License",
       install_requires=["asyncua>=0.8.0", "PyQt5>=5.13.1"],
+      extras_require={"parquet": ["pyarrow"], "history": ["numpy"]},
       entry_points={'console_scripts':
-                    ['opcua-client = uaclient.mainwindow:main']
+                    ['opcua-client = uaclient.mainwindow:main',
+                     'opcua-recorder = uaclient.recorder:main']
                     }
       )
@@ -1,6 +1,10 @@
 
+import datetime
 import unittest
 import sys
+import tempfile
+import threading
+import time
 print("SYS:PATH", sys.path)
 sys.path.insert(0, "python-opcua")
 sys.path.insert(0, "opcua-widgets")
@@ -10,11 +14,27 @@ print("PWD", os.getcwd())
 from asyncua.sync import ua
 from asyncua.sync import Server
 
-from PyQt5.QtCore import QTimer, QSettings, QModelIndex, Qt, QCoreApplication
+from PyQt5.QtCore import QTimer, QSettings, QModelIndex, Qt, QCoreApplication, \
+    QObject, QPersistentModelIndex
+from PyQt5.QtGui import QStandardItemModel
 from PyQt5.QtWidgets import QApplication
 from PyQt5.QtTest import QTest
 
 from uaclient.mainwindow import Window
+from uaclient.uaclient import UaClient
+from uaclient.reconnector import Reconnector
+from uaclient.handler import DataChangeHandler, ItemStatistics
+from uaclient.subscription_model import SubscriptionModel, HISTORY_ROLE
+from uaclient.value_history import HistoryStore, use_numpy
+from uaclient.subscription_groups import SubscriptionGroup, DEFAULT_GROUP
+from uaclient.variable_crawler import VariableCrawler
+from uaclient.recorder import Recorder, read_recording
+from uaclient.comparewidget import CompareUI
+from uaclient.watch_lists import WatchedNode, load_watch_lists, \
+    save_watch_list, remove_watch_list
+from uawidgets.model_merge import RowData, merge_rows, clear_highlights
+from uawidgets.refs_widget import RefsModel
+from uawidgets.tree_widget import TreeViewModel
 
 
 class TestClient(unittest.TestCase):
@@ -59,6 +79,847 @@ class TestClient(unittest.TestCase):
         self.assertEqual(data, server_node.nodeid)
 
 
+class TestUaClient(unittest.TestCase):
+    def setUp(self):
+        # keep the settings written by the tests away from the user's
+        self._settings_dir = tempfile.TemporaryDirectory()
+        QSettings.setPath(QSettings.NativeFormat, QSettings.UserScope,
+                          self._settings_dir.name)
+        self.server = Server()
+        url = "opc.tcp://localhost:48401/freeopcua/server/"
+        self.server.set_endpoint(url)
+        self.server.start()
+        self.uaclient = UaClient()
+        self.uaclient.connect(url)
+
+    def tearDown(self):
+        self.uaclient.disconnect()
+        self.server.stop()
+        self._settings_dir.cleanup()
+
+    def _wait_for(self, predicate, timeout=5, message="condition"):
+        """Poll predicate until it is true, fail after timeout seconds."""
+        deadline = time.monotonic() + timeout
+        while not predicate():
+            if time.monotonic() >= deadline:
+                self.fail("Timed out after {} s waiting for {}".format(
+                    timeout, message))
+            time.sleep(0.1)
+
+    def _wait_for_value(self, handler, value):
+        """Return the changes taken last, once they end with value."""
+        changes = []
+
+        def received():
+            changes[:] = handler.take_changes()
+            return changes and changes[-1][1].Value.Value == value
+
+        self._wait_for(received, message="value {}".format(value))
+        return changes
+
+    def test_subscribe_attributes(self):
+        received = []
+        event = threading.Event()
+
+        class Handler:
+            def datachange_notification(self, node, val, data):
+                received.append(data.subscription_data.attribute)
+                event.set()
+
+        node = self.uaclient.get_node(ua.ObjectIds.Server_ServerStatus_State)
+        attrs = [ua.AttributeIds.Value, ua.AttributeIds.DisplayName]
+        self.uaclient.subscribe_attributes(node, attrs, Handler())
+        self.assertEqual(len(self.uaclient._attribute_handles), 2)
+        self.assertTrue(event.wait(5))
+        self.uaclient.unsubscribe_attributes()
+        self.assertEqual(self.uaclient._attribute_handles, [])
+
+    def test_data_changes_are_coalesced(self):
+        var = self.server.nodes.objects.add_variable(2, "Counter", 0)
+        node = self.uaclient.get_node(var.nodeid)
+        handler = DataChangeHandler()
+        self.uaclient.subscribe_datachange(node, handler)
+        for value in range(1, 11):
+            var.write_value(value)
+        changes = self._wait_for_value(handler, 10)
+        # only the latest value is kept, the others are counted
+        self.assertEqual([change[1].Value.Value for change in changes], [10])
+        self.assertGreater(handler.superseded, 0)
+        self.assertEqual(handler.take_changes(), [])
+        statistics = changes[0][3]
+        self.assertEqual(statistics.coalesced, handler.superseded)
+        self.assertEqual(statistics.notifications, handler.notifications)
+        self.assertGreater(statistics.rate, 0)
+
+    def test_item_statistics(self):
+        statistics = ItemStatistics()
+        now = datetime.datetime.utcnow()
+        value = ua.DataValue(ua.Variant(1.5))
+        value.SourceTimestamp = now - datetime.timedelta(milliseconds=300)
+        value.ServerTimestamp = now - datetime.timedelta(milliseconds=100)
+        statistics.add(value, 10.0, now)
+        self.assertEqual(statistics.rate, 0)
+        self.assertAlmostEqual(statistics.source_latency, 200)
+        self.assertAlmostEqual(statistics.server_latency, 100)
+        value = ua.DataValue(ua.Variant(2.5), ua.StatusCode(0x480))
+        statistics.add(value, 10.5, now)
+        statistics.add(value, 11.0, now)
+        self.assertAlmostEqual(statistics.rate, 2)
+        self.assertEqual(statistics.notifications, 3)
+        self.assertEqual(statistics.overflows, 2)
+
+    @unittest.skipUnless(use_numpy, "numpy is not installed")
+    def test_value_history(self):
+        history = HistoryStore(size=4, max_bytes=8 * 16)
+        first, second, third = (ua.NodeId(idx, 2) for idx in range(3))
+        now = datetime.datetime.utcnow()
+        for idx in range(6):
+            value = ua.DataValue(ua.Variant(float(idx)))
+            value.SourceTimestamp = now + datetime.timedelta(seconds=idx)
+            history.add(first, value)
+            history.add(second, ua.DataValue(ua.Variant(idx)))
+            history.add(third, value)
+        # the ring buffer keeps the latest points from the oldest on
+        timestamps, values = history.get(first).get_points()
+        self.assertEqual(values.tolist(), [2.0, 3.0, 4.0, 5.0])
+        self.assertEqual((timestamps[1:] - timestamps[:-1]).tolist(),
+                         [1.0, 1.0, 1.0])
+        xs, ys = history.get(first).scale(30, 10)
+        self.assertEqual(xs.tolist(), [0, 10, 20, 30])
+        self.assertEqual(ys.tolist()[0], 10)
+        # the third node exceeds the memory bound and gets no history
+        self.assertIsNone(history.get(third))
+        self.assertEqual(history.get_bytes(), 8 * 16)
+        # texts are not numeric
+        history.add(third, ua.DataValue(ua.Variant("text")))
+        history.remove(second)
+        history.add(third, ua.DataValue(ua.Variant(1.0)))
+        self.assertEqual(history.get(third).count, 1)
+
+        model = SubscriptionModel(history=history)
+        node = self.uaclient.get_node(first)
+        model.add_node(node, "first", ua.MonitoringParameters(),
+                       DEFAULT_GROUP)
+        idx = model.index(0, model.HISTORY_COLUMN)
+        self.assertIs(model.data(idx, HISTORY_ROLE), history.get(first))
+        self.assertIsNone(model.data(idx))
+
+    def test_modify_datachange(self):
+        var = self.server.nodes.objects.add_variable(2, "Analog", 0.0)
+        node = self.uaclient.get_node(var.nodeid)
+        handler = DataChangeHandler()
+        self.uaclient.subscribe_datachange(node, handler)
+        params = self.uaclient.get_default_monitoring_parameters()
+        params.SamplingInterval = 100
+        params.QueueSize = 5
+        params.Filter = ua.DataChangeFilter()
+        params.Filter.Trigger = ua.DataChangeTrigger.StatusValue
+        params.Filter.DeadbandType = ua.DeadbandType.Absolute
+        params.Filter.DeadbandValue = 1.0
+        results = self.uaclient.modify_datachange({var.nodeid: params})
+        self.assertTrue(results[var.nodeid].StatusCode.is_good())
+        # notifications still reach the handler of the item
+        var.write_value(5.0)
+        changes = self._wait_for_value(handler, 5.0)
+        self.assertEqual([change[1].Value.Value for change in changes], [5.0])
+
+    def test_subscribe_datachanges_in_bulk(self):
+        self.uaclient.max_nodes_per_request = 400
+        folder = self.server.nodes.objects.add_folder(2, "Tags")
+        nodes = [self.uaclient.get_node(
+            folder.add_variable(2, "Tag{}".format(i), i).nodeid)
+            for i in range(1000)]
+        missing = self.uaclient.get_node(ua.NodeId("Missing", 2))
+        start = time.perf_counter()
+        results = self.uaclient.subscribe_datachanges(
+            [*nodes, missing], DataChangeHandler())
+        self.assertLess(time.perf_counter() - start, 5)
+        self.assertTrue(all(isinstance(results[node.nodeid], int)
+                            for node in nodes))
+        self.assertEqual(results[missing.nodeid],
+                         ua.StatusCode(ua.StatusCodes.BadNodeIdUnknown))
+        self.assertEqual(
+            len(self.uaclient.subscription_groups[DEFAULT_GROUP].handles),
+            1000)
+
+    def test_watch_lists(self):
+        var = self.server.nodes.objects.add_variable(2, "Level", 0.0)
+        params = self.uaclient.get_default_monitoring_parameters()
+        params.QueueSize = 4
+        params.Filter = ua.DataChangeFilter()
+        params.Filter.DeadbandType = ua.DeadbandType.Absolute
+        params.Filter.DeadbandValue = 0.5
+        endpoint = "opc.tcp://watch-list-test:4840"
+        save_watch_list(endpoint, "Tank", [
+            WatchedNode.from_parameters(var.nodeid, "Level", DEFAULT_GROUP,
+                                        params),
+            WatchedNode("ns=2;s=Missing", "Missing")])
+        watched = load_watch_lists(endpoint)["Tank"]
+        remove_watch_list(endpoint, "Tank")
+        self.assertEqual(load_watch_lists(endpoint), {})
+        self.assertEqual([item.name for item in watched],
+                         ["Level", "Missing"])
+        restored = watched[0].get_parameters()
+        self.assertEqual(restored.QueueSize, 4)
+        self.assertEqual(restored.Filter.DeadbandType,
+                         ua.DeadbandType.Absolute)
+        # the saved parameters are requested when subscribing in bulk
+        handler = DataChangeHandler()
+        nodes = [self.uaclient.get_node(ua.NodeId.from_string(item.nodeid))
+                 for item in watched]
+        results = self.uaclient.subscribe_datachanges(
+            nodes, handler, parameters={var.nodeid: restored})
+        self.assertIsInstance(results[var.nodeid], int)
+        self.assertEqual(results[nodes[1].nodeid],
+                         ua.StatusCode(ua.StatusCodes.BadNodeIdUnknown))
+        var.write_value(2.0)
+        changes = self._wait_for_value(handler, 2.0)
+        self.assertEqual([change[1].Value.Value for change in changes],
+                         [2.0])
+
+    def test_set_triggering(self):
+        trigger = self.server.nodes.objects.add_variable(2, "Trigger", 0.0)
+        linked = self.server.nodes.objects.add_variable(2, "Linked", 0.0)
+        nodes = [self.uaclient.get_node(trigger.nodeid),
+                 self.uaclient.get_node(linked.nodeid)]
+        handler = DataChangeHandler()
+        self.uaclient.subscribe_datachanges(nodes, handler)
+        # an item cannot trigger itself
+        results = self.uaclient.set_triggering(trigger.nodeid,
+                                               [trigger.nodeid])
+        self.assertEqual(results[trigger.nodeid], ua.StatusCode(
+            ua.StatusCodes.BadMonitoredItemIdInvalid))
+        # the test server does not support SetTriggering, the item is not
+        # switched to sampling and keeps reporting
+        with self.assertRaises(ua.UaStatusCodeError):
+            self.uaclient.set_triggering(trigger.nodeid, [linked.nodeid])
+        self.assertIsNone(
+            self.uaclient.get_datachange_trigger(linked.nodeid))
+        linked.write_value(3.0)
+        values = []
+        self._wait_for(lambda: values.extend(
+            value.Value.Value for node, value, _, _
+            in handler.take_changes() if node.nodeid == linked.nodeid)
+            or 3.0 in values, message="value 3.0")
+        self.assertEqual(values[-1], 3.0)
+
+        model = SubscriptionModel()
+        model.add_nodes(nodes, ["Trigger", "Linked"],
+                        ua.MonitoringParameters(), DEFAULT_GROUP)
+        model.set_triggers({linked.nodeid: trigger.nodeid})
+        self.assertEqual(model.data(model.index(1, model.TRIGGER_COLUMN)),
+                         "Trigger")
+        # hidden columns are saved by key, the trigger is not a statistic
+        self.assertEqual(len(model.COLUMN_KEYS), model.columnCount())
+        self.assertEqual(model.COLUMN_KEYS[model.TRIGGER_COLUMN],
+                         "triggered_by")
+        watched = WatchedNode.from_parameters(
+            linked.nodeid, "Linked", DEFAULT_GROUP,
+            ua.MonitoringParameters(), model.get_trigger(linked.nodeid))
+        self.assertEqual(watched.to_dict()["trigger"],
+                         trigger.nodeid.to_string())
+        # the link is gone with the trigger item
+        model.remove_node(trigger.nodeid)
+        self.assertIsNone(model.get_trigger(linked.nodeid))
+
+    def test_reconnect_keeps_subscriptions(self):
+        var = self.server.nodes.objects.add_variable(2, "Pressure", 1.0)
+        node = self.uaclient.get_node(var.nodeid)
+        handler = DataChangeHandler()
+        params = self.uaclient.get_default_monitoring_parameters()
+        params.QueueSize = 3
+        self.uaclient.subscribe_datachanges([node], handler,
+                                            parameters={var.nodeid: params})
+        self.assertFalse(self.uaclient.is_connection_lost())
+        client = self.uaclient.client
+        client.tloop.loop.call_soon_threadsafe(
+            client.aio_obj.uaclient.protocol.transport.close)
+        self._wait_for(self.uaclient.is_connection_lost,
+                       message="the lost connection")
+        # the test server cannot transfer subscriptions, the items are
+        # created again with their parameters
+        self.assertEqual(self.uaclient.reconnect(), {})
+        self.assertFalse(self.uaclient.is_connection_lost())
+        self.assertIs(self.uaclient._dc_parameters[var.nodeid], params)
+        handler.take_changes()
+        var.write_value(3.0)
+        changes = self._wait_for_value(handler, 3.0)
+        self.assertEqual([change[1].Value.Value for change in changes],
+                         [3.0])
+
+    def test_reconnect_transfers_subscriptions(self):
+        var = self.server.nodes.objects.add_variable(2, "Temperature", 1.0)
+        node = self.uaclient.get_node(var.nodeid)
+        self.uaclient.subscribe_datachanges([node], DataChangeHandler())
+        group = self.uaclient.subscription_groups[DEFAULT_GROUP]
+        subscription = group.subscription
+        client = self.uaclient.client
+        client.tloop.loop.call_soon_threadsafe(
+            client.aio_obj.uaclient.protocol.transport.close)
+        self._wait_for(self.uaclient.is_connection_lost,
+                       message="the lost connection")
+        # the test server does not support TransferSubscriptions, answer
+        # like a server that does
+        transferred = []
+        send_request = self.uaclient._send_request
+
+        def transfer(request, response_type):
+            if not isinstance(request, ua.TransferSubscriptionsRequest):
+                return send_request(request, response_type)
+            transferred.extend(request.Parameters.SubscriptionIds)
+            response = ua.TransferSubscriptionsResponse()
+            response.Parameters.Results = [
+                ua.TransferResult() for _ in transferred]
+            return response
+
+        self.uaclient._send_request = transfer
+        self.assertEqual(self.uaclient.reconnect(), {})
+        self.assertEqual(transferred,
+                         [subscription.aio_obj.subscription_id])
+        # the transferred Subscription and its items are kept
+        self.assertIs(group.subscription, subscription)
+        self.assertIn(var.nodeid, group.handles)
+        self.assertFalse(self.uaclient.is_connection_lost())
+
+    def test_reconnect_in_background(self):
+        # attempts without a connection fail and back off
+        reconnector = Reconnector(UaClient(), interval=100, max_interval=300)
+        errors = []
+        # the signals are taken in the thread of the attempt
+        reconnector.failed.connect(errors.append, Qt.DirectConnection)
+        for delay in (100, 200, 300, 300):
+            reconnector.start()
+            reconnector.wait()
+            self.assertEqual(reconnector.get_delay(), delay)
+            self.assertFalse(reconnector.is_due())
+        self.assertEqual(len(errors), 4)
+
+        client = self.uaclient.client
+        client.tloop.loop.call_soon_threadsafe(
+            client.aio_obj.uaclient.protocol.transport.close)
+        self._wait_for(self.uaclient.is_connection_lost,
+                       message="the lost connection")
+        reconnector = Reconnector(self.uaclient)
+        results = []
+        reconnector.reconnected.connect(results.append, Qt.DirectConnection)
+        self.assertTrue(reconnector.is_due())
+        reconnector.start()
+        reconnector.wait()
+        self.assertEqual(results, [{}])
+        self.assertFalse(self.uaclient.is_connection_lost())
+
+    def test_recorder(self):
+        number = self.server.nodes.objects.add_variable(2, "Flow", 0.0)
+        text = self.server.nodes.objects.add_variable(2, "Batch", "none")
+        counter = self.server.nodes.objects.add_variable(
+            2, "Counter", ua.Variant(2 ** 53 + 1, ua.VariantType.Int64))
+        missing = ua.NodeId("Missing", 2)
+        with tempfile.TemporaryDirectory() as directory:
+            recorder = Recorder(self.uaclient, directory, batch_size=2,
+                                flush_interval=0.1, rotate_bytes=1)
+            failed = recorder.start([number.nodeid, text.nodeid,
+                                     counter.nodeid, missing])
+            self.assertEqual(list(failed), [missing])
+            for value in range(1, 6):
+                number.write_value(float(value))
+                time.sleep(0.05)
+            text.write_value("B-42")
+            time.sleep(0.05)
+            text.write_value("")
+            time.sleep(0.05)
+            text.write_value(ua.Variant(None, ua.VariantType.String))
+            self._wait_for(lambda: recorder.recorded >= 10,
+                           message="10 recorded notifications")
+            recorder.stop()
+            self.assertGreater(len(recorder.files), 1)
+            records = [record for path in recorder.files
+                       for record in read_recording(path)]
+        self.assertEqual(len(records), recorder.recorded)
+        self.assertEqual(
+            [value for nodeid, _, _, _, value in records
+             if nodeid == number.nodeid.to_string()],
+            [0.0, 1.0, 2.0, 3.0, 4.0, 5.0])
+        self.assertEqual(
+            [value for nodeid, _, _, _, value in records
+             if nodeid == text.nodeid.to_string()],
+            ["none", "B-42", "", None])
+        # 64-bit integers are not rounded through doubles
+        self.assertEqual(
+            [value for nodeid, _, _, _, value in records
+             if nodeid == counter.nodeid.to_string()], [2 ** 53 + 1])
+        self.assertTrue(all(status == 0 and source is not None
+                            for _, source, _, status, _ in records))
+
+    def test_variable_crawler(self):
+        machine = self.server.nodes.objects.add_object(2, "Machine")
+        expected = []
+        for unit in range(3):
+            obj = machine.add_object(2, "Unit{}".format(unit))
+            expected.append(obj.add_variable(2, "Speed", 1.5).nodeid)
+            expected.append(obj.add_variable(2, "Count", 1).nodeid)
+            obj.add_property(2, "Serial", "abc")
+            folder = obj.add_folder(2, "Axes")
+            expected.append(folder.add_variable(2, "Position", 2.5).nodeid)
+        crawler = VariableCrawler(self.uaclient)
+        found = crawler.crawl([machine.nodeid])
+        self.assertEqual(set(found), set(expected))
+        self.assertFalse(crawler.truncated)
+        crawler = VariableCrawler(self.uaclient,
+                                  data_types=[ua.NodeId(ua.ObjectIds.Double)])
+        self.assertEqual(len(crawler.crawl([machine.nodeid])), 6)
+        crawler = VariableCrawler(self.uaclient, namespaces={0})
+        self.assertEqual(crawler.crawl([machine.nodeid]), [])
+        crawler = VariableCrawler(self.uaclient, limit=4)
+        self.assertEqual(len(crawler.crawl([machine.nodeid])), 4)
+        self.assertTrue(crawler.truncated)
+        # exactly at the limit with the Axes folders not browsed yet
+        crawler = VariableCrawler(self.uaclient, limit=6)
+        self.assertEqual(len(crawler.crawl([machine.nodeid])), 6)
+        self.assertTrue(crawler.truncated)
+        crawler = VariableCrawler(self.uaclient, limit=10)
+        self.assertEqual(len(crawler.crawl([machine.nodeid])), 9)
+        self.assertFalse(crawler.truncated)
+
+    def test_subscription_groups(self):
+        var = self.server.nodes.objects.add_variable(2, "Fast", 0)
+        other = self.server.nodes.objects.add_variable(2, "Queued", 0)
+        node = self.uaclient.get_node(var.nodeid)
+        other_node = self.uaclient.get_node(other.nodeid)
+        handler = DataChangeHandler()
+        params = self.uaclient.get_default_monitoring_parameters()
+        params.QueueSize = 5
+        self.uaclient.subscribe_datachanges(
+            [node, other_node], handler,
+            parameters={other.nodeid: params})
+        self.uaclient.set_subscription_group(
+            SubscriptionGroup("Fast", publishing_interval=50, priority=10))
+        unknown = self.uaclient.get_node(ua.NodeId("Unknown", 2))
+        results = self.uaclient.move_datachanges(
+            [node, other_node, unknown], handler, "Fast")
+        self.assertEqual(results.pop(unknown.nodeid).value,
+                         ua.StatusCodes.BadMonitoredItemIdInvalid)
+        self.assertTrue(all(isinstance(handle, int)
+                            for handle in results.values()))
+        self.assertEqual(self.uaclient.get_datachange_group(var.nodeid),
+                         "Fast")
+        groups = self.uaclient.subscription_groups
+        self.assertEqual(groups[DEFAULT_GROUP].handles, {})
+        self.assertEqual(set(groups["Fast"].handles),
+                         {var.nodeid, other.nodeid})
+        # the items are created again with the parameters of their rows
+        self.assertEqual(
+            self.uaclient._dc_parameters[other.nodeid].QueueSize, 5)
+        self.assertNotIn(var.nodeid, self.uaclient._dc_parameters)
+        self.uaclient.unsubscribe_datachange(other_node)
+        self.assertNotEqual(
+            groups["Fast"].subscription.aio_obj.subscription_id,
+            groups[DEFAULT_GROUP].subscription.aio_obj.subscription_id)
+        # groups with items can neither be changed nor removed
+        with self.assertRaises(ValueError):
+            self.uaclient.set_subscription_group(SubscriptionGroup("Fast"))
+        with self.assertRaises(ValueError):
+            self.uaclient.remove_subscription_group("Fast")
+        var.write_value(7)
+        changes = self._wait_for_value(handler, 7)
+        self.assertEqual([change[1].Value.Value for change in changes],
+                         [7])
+        self.uaclient.unsubscribe_datachange(node)
+        self.uaclient.remove_subscription_group("Fast")
+        self.assertNotIn("Fast", self.uaclient.subscription_groups)
+
+    def test_subscription_model_batches_updates(self):
+        model = SubscriptionModel()
+        nodes = [self.uaclient.get_node(ua.NodeId(i, 2)) for i in range(10)]
+        for node in nodes:
+            model.add_node(node, str(node.nodeid.Identifier),
+                           self.uaclient.get_default_monitoring_parameters(),
+                           DEFAULT_GROUP)
+        model.remove_node(nodes[0].nodeid)
+        signals = []
+        model.dataChanged.connect(
+            lambda first, last, roles: signals.append((first.row(),
+                                                       last.row())))
+        value = ua.DataValue(ua.Variant(1.5))
+        self.assertEqual(model.index(2, 1).data(), "No Data yet")
+        model.update([(nodes[i], value, 2, ItemStatistics())
+                      for i in (3, 7, 5)])
+        self.assertEqual(signals, [(2, 6)])
+        self.assertEqual(model.rowCount(), 9)
+        self.assertEqual(model.get_node(6), nodes[7])
+        self.assertIs(model.get_value(nodes[7].nodeid), value)
+        self.assertEqual(model.index(6, 1).data(), "1.5")
+        self.assertEqual(model.index(6, model.COUNT_COLUMN).data(), "2")
+        self.assertEqual(model.index(6, model.STATISTICS_COLUMN).data(), "0.0")
+        # texts are formatted when shown and again after a new value
+        self.assertIsNone(model._texts[5])
+        model.update([(nodes[7], ua.DataValue(ua.Variant(2.5)), 1,
+                       ItemStatistics())])
+        self.assertIsNone(model._texts[6])
+        self.assertEqual(model.index(6, 1).data(), "2.5")
+        self.assertEqual(model.index(6, model.COUNT_COLUMN).data(), "3")
+        # edited monitoring parameters are collected until taken
+        self.assertTrue(model.setData(
+            model.index(1, model.DEADBAND_TYPE_COLUMN), "Percent"))
+        self.assertTrue(model.setData(
+            model.index(2, model.QUEUE_SIZE_COLUMN), 10))
+        self.assertFalse(model.setData(
+            model.index(2, model.SAMPLING_COLUMN), "fast"))
+        edited = model.take_edited()
+        self.assertEqual(set(edited), {nodes[2].nodeid, nodes[3].nodeid})
+        self.assertEqual(edited[nodes[2].nodeid].Filter.DeadbandType,
+                         ua.DeadbandType.Percent)
+        self.assertEqual(edited[nodes[3].nodeid].QueueSize, 10)
+        self.assertEqual(model.take_edited(), {})
+
+    def test_unsubscribe_in_bulk(self):
+        self.uaclient.max_nodes_per_request = 2
+        variables = [self.server.nodes.objects.add_variable(
+            2, "Bulk{}".format(idx), 0.0) for idx in range(5)]
+        nodes = [self.uaclient.get_node(var.nodeid) for var in variables]
+        handler = DataChangeHandler()
+        self.uaclient.subscribe_datachanges(nodes, handler)
+        removed = [nodes[idx].nodeid for idx in (0, 1, 3, 4)]
+        # a row whose item could not be created again has no handle
+        unknown = ua.NodeId("Unknown", 2)
+        results = self.uaclient.unsubscribe_datachanges(removed + [unknown])
+        self.assertEqual(results.pop(unknown).value,
+                         ua.StatusCodes.BadMonitoredItemIdInvalid)
+        self.assertEqual(set(results), set(removed))
+        self.assertTrue(all(result.is_good() for result in results.values()))
+        self.assertEqual(list(self.uaclient.subscription_groups[
+            DEFAULT_GROUP].handles), [nodes[2].nodeid])
+        # the remaining item keeps reporting
+        variables[2].write_value(4.0)
+        values = []
+        self._wait_for(lambda: values.extend(
+            value.Value.Value for node, value, _, _
+            in handler.take_changes() if node.nodeid == nodes[2].nodeid)
+            or 4.0 in values, message="value 4.0")
+        self.assertEqual(values[-1], 4.0)
+        self.uaclient.unsubscribe_datachange(nodes[2])
+
+        # rows are removed in contiguous ranges and found again by NodeId
+        model = SubscriptionModel()
+        model.add_nodes(nodes, [str(idx) for idx in range(5)],
+                        ua.MonitoringParameters(), DEFAULT_GROUP)
+        signals = []
+        model.rowsRemoved.connect(
+            lambda parent, first, last: signals.append((first, last)))
+        model.remove_nodes(removed)
+        self.assertEqual(signals, [(3, 4), (0, 1)])
+        self.assertEqual(model.rowCount(), 1)
+        self.assertTrue(model.has_node(nodes[2].nodeid))
+        self.assertEqual(model.get_node(0), nodes[2])
+
+    def test_bulk_read_and_browse_in_chunks(self):
+        self.uaclient.max_nodes_per_request = 2
+        nodeids = [ua.NodeId(ua.ObjectIds.RootFolder),
+                   ua.NodeId(ua.ObjectIds.ObjectsFolder),
+                   ua.NodeId(ua.ObjectIds.TypesFolder)]
+        values = self.uaclient.read_attributes(
+            nodeids, ua.AttributeIds.DisplayName)
+        self.assertEqual([value.Value.Value.Text for value in values],
+                         ["Root", "Objects", "Types"])
+        refs = self.uaclient.browse(nodeids)
+        self.assertEqual(len(refs), 3)
+        self.assertIn(ua.NodeId(ua.ObjectIds.Server),
+                      [ref.NodeId for ref in refs[1]])
+
+    def test_merge_rows(self):
+        class View:
+            def isExpanded(self, index):
+                return False
+
+        def make_rows(values):
+            return [RowData([name, str(value), "Int32"], [None, value, None],
+                            children=[RowData([name + ".0", "", ""])])
+                    for name, value in values]
+
+        model = QStandardItemModel()
+        root = model.invisibleRootItem()
+        for row in make_rows([("a", 1), ("b", 2), ("c", 3)]):
+            root.appendRow(row.to_items())
+        items = {root.child(idx, 0).text(): root.child(idx, 1)
+                 for idx in range(3)}
+        changed = []
+        payload = [3]
+        # reordered, b removed, d inserted and a with an equal text
+        merge_rows(View(), root, make_rows(
+            [("c", 3), ("a", 1), ("d", 4)]), changed)
+        merge_rows(View(), root, [RowData(["a", "1", "Int32"],
+                                          [None, payload, None])],
+                   changed, remove_obsolete=False)
+        self.assertEqual([root.child(idx, 0).text() for idx in range(3)],
+                         ["a", "c", "d"])
+        # matched rows keep their items and children
+        self.assertIs(root.child(0, 1), items["a"])
+        self.assertIs(root.child(1, 1), items["c"])
+        self.assertEqual(root.child(1, 0).child(0, 0).text(), "c.0")
+        self.assertEqual(root.child(2, 1).text(), "4")
+        self.assertEqual(root.child(0, 1).data(Qt.UserRole), payload)
+        self.assertEqual(changed, [])
+        merge_rows(View(), root, make_rows(
+            [("a", 1), ("c", 5), ("d", 4)]), changed)
+        self.assertEqual([QPersistentModelIndex(items["c"].index())],
+                         changed)
+        self.assertEqual(items["c"].data(Qt.UserRole), 5)
+        clear_highlights(changed)
+        self.assertIsNone(items["c"].data(Qt.BackgroundRole))
+
+    def test_refs_model_changes(self):
+        def make_ref(identifier):
+            ref = ua.ReferenceDescription()
+            ref.ReferenceTypeId = ua.NodeId(ua.ObjectIds.Organizes)
+            ref.NodeId = ua.NodeId(identifier, 2)
+            return ref
+
+        model = RefsModel(None, str)
+        refs = [make_ref(idx) for idx in range(4)]
+        model.append_refs(refs)
+        edited = make_ref(10)
+        model.stage_edit(1, edited)
+        model.stage_delete([2])
+        model.stage_add(make_ref(11))
+        self.assertTrue(model.has_changes())
+        added, deleted = model.get_changes()
+        self.assertEqual([ref_idx for ref_idx, _ in added], [1, 4])
+        self.assertEqual(deleted, [(2, refs[2]), (1, refs[1])])
+        self.assertTrue(model.is_edited(1))
+        self.assertIs(model.get_original(1), refs[1])
+        # discarding restores the original and drops the new row
+        model.discard_changes()
+        self.assertFalse(model.has_changes())
+        self.assertEqual(model.rowCount(), 4)
+        self.assertIs(model.data(model.index(1, 0), Qt.UserRole), refs[1])
+
+        model.stage_edit(1, edited)
+        model.stage_delete([2])
+        new = make_ref(11)
+        model.stage_add(new)
+        added, _ = model.get_changes()
+        model.commit_changes([added[-1][0]], [2])
+        self.assertEqual([model.data(model.index(row, 0), Qt.UserRole)
+                          for row in range(model.rowCount())],
+                         [refs[0], edited, refs[3], new])
+        # the edit whose original could not be deleted stays staged
+        self.assertTrue(model.is_edited(1))
+        # an edit that could not be added is undone if the original was
+        # added again, otherwise the copy stays staged as an addition
+        model.commit_changes([], [1], restored=[1])
+        self.assertFalse(model.has_changes())
+        self.assertIs(model.data(model.index(1, 0), Qt.UserRole), refs[1])
+        model.stage_edit(1, edited)
+        model.commit_changes([], [1])
+        self.assertFalse(model.is_edited(1))
+        self.assertEqual(model.get_changes(), ([(1, edited)], []))
+
+    def test_refs_model_paging(self):
+        def make_page(names, reftype=ua.ObjectIds.Organizes):
+            page = []
+            for name in names:
+                ref = ua.ReferenceDescription()
+                ref.ReferenceTypeId = ua.NodeId(reftype)
+                ref.BrowseName = ua.QualifiedName(name, 2)
+                page.append(ref)
+            return page
+
+        pages = [make_page("ae") + make_page("c", ua.ObjectIds.HasComponent)]
+
+        class Widget(QObject):
+            def fetch_more(self):
+                model.continuation_point = None
+                model.append_refs(pages.pop(0))
+
+        def get_names():
+            return [model.data(model.index(row, 2))[2:]
+                    for row in range(model.rowCount())]
+
+        model = RefsModel(Widget(), str)
+        model.append_refs(make_page("db") + make_page(
+            "f", ua.ObjectIds.HasComponent))
+        model.continuation_point = b"next"
+        self.assertEqual(get_names(), ["d", "b", "f"])
+        model.sort(2)
+        self.assertEqual(get_names(), ["b", "d", "f"])
+        selected = QPersistentModelIndex(model.index(1, 2))
+        # the next page is merged into the sorted rows
+        self.assertTrue(model.canFetchMore(QModelIndex()))
+        model.fetchMore(QModelIndex())
+        self.assertFalse(model.canFetchMore(QModelIndex()))
+        self.assertEqual(get_names(), ["a", "b", "c", "d", "e", "f"])
+        self.assertEqual(selected.row(), 3)
+        model.sort(2, Qt.DescendingOrder)
+        self.assertEqual(get_names(), ["f", "e", "d", "c", "b", "a"])
+        model.set_type_filter(ua.NodeId(ua.ObjectIds.HasComponent))
+        self.assertEqual(get_names(), ["f", "c"])
+        self.assertEqual(model.get_reference_types(),
+                         [ua.NodeId(ua.ObjectIds.Organizes),
+                          ua.NodeId(ua.ObjectIds.HasComponent)])
+        model.set_type_filter(None)
+        # deleted references are removed from the rows
+        model.stage_delete([0, 2, 3])
+        model.commit_changes([], [ref_idx for ref_idx, _
+                                  in model.get_changes()[1]])
+        self.assertEqual(get_names(), ["e", "b", "a"])
+        self.assertEqual(model.get_row(
+            model.data(model.index(2, 0), Qt.UserRole)), 2)
+
+    def test_compare_attributes(self):
+        nodeids = [self.server.nodes.objects.add_variable(
+            2, "Compared{}".format(idx), float(idx)).nodeid
+            for idx in range(3)]
+        attrs = [ua.AttributeIds.Value, ua.AttributeIds.DataType]
+        self.uaclient._operation_limits["MaxNodesPerRead"] = 4
+        reads = []
+        service = self.uaclient._service
+        self.uaclient._service = lambda name, params: \
+            reads.append(len(params.NodesToRead)) or service(name, params)
+        rows = CompareUI.read_texts(self.uaclient, nodeids, attrs)
+        # six attributes in requests of at most four
+        self.assertEqual(reads, [4, 2])
+        self.assertEqual([row[:2] for row in rows],
+                         [["0.0", "Double"], ["1.0", "Double"],
+                          ["2.0", "Double"]])
+        # the timestamps of the Value follow the attributes
+        self.assertEqual(len(rows[0]), 4)
+        self.assertTrue(rows[0][2])
+        # an empty list of attributes is read back from QSettings as None
+        QSettings().setValue("compare_attributes", None)
+        self.assertEqual(CompareUI._load_attributes(), [])
+        QSettings().setValue("compare_attributes", "DataType")
+        self.assertEqual(CompareUI._load_attributes(),
+                         [ua.AttributeIds.DataType])
+
+    def test_data_type_registry(self):
+        data_types = self.uaclient.data_types
+        self.assertEqual(data_types.get_name(ua.NodeId(ua.ObjectIds.Double)),
+                         "Double")
+        self.assertEqual(
+            data_types.get_variant_type(ua.NodeId(ua.ObjectIds.Duration)),
+            ua.VariantType.Double)
+        self.assertEqual(
+            data_types.get_variant_type(ua.NodeId(ua.ObjectIds.ServerState)),
+            ua.VariantType.Int32)
+
+    def test_display_name_cache(self):
+        idx = self.server.register_namespace("http://test.org")
+        objects = self.server.nodes.objects
+        obj_type = self.server.nodes.base_object_type.add_object_type(
+            idx, "VendorType")
+        nodeids = [objects.add_object(idx, "Obj{}".format(i), obj_type).nodeid
+                   for i in range(3)]
+        # the type definitions are loaded in the background after connecting
+        self.uaclient.type_loader.wait()
+        reads = []
+        service = self.uaclient._service
+        self.uaclient._service = lambda name, params: \
+            reads.append(name) or service(name, params)
+        names = self.uaclient.display_names.get_names(
+            [*nodeids, ua.NodeId(ua.ObjectIds.Organizes), obj_type.nodeid])
+        self.assertEqual(names, ["Obj0", "Obj1", "Obj2", "Organizes",
+                                 "VendorType"])
+        self.assertEqual(reads, ["read"])
+        self.uaclient.display_names.get_name(obj_type.nodeid)
+        self.assertEqual(reads, ["read"])
+
+    def test_type_definition_loader(self):
+        xml = ('<opc:TypeDictionary xmlns:opc="http://opcfoundation.org/'
+               'BinarySchema/" TargetNamespace="urn:test">'
+               '<opc:StructuredType Name="TestPoint">'
+               '<opc:Field Name="X" TypeName="opc:Double"/>'
+               '</opc:StructuredType></opc:TypeDictionary>')
+        type_system = self.server.get_node(
+            ua.ObjectIds.OPCBinarySchema_TypeSystem)
+        dictionary = type_system.add_variable(
+            2, "TestDictionary", xml.encode("utf-8"),
+            ua.VariantType.ByteString)
+        loader = self.uaclient.type_loader
+        loader.wait()
+        loaded = []
+        loader.loaded.connect(loaded.append, Qt.DirectConnection)
+        with tempfile.TemporaryDirectory() as cache_dir:
+            loader.cache_dir = cache_dir
+            self.uaclient.reference_index.clear()
+            loader.load(self.uaclient.endpoint)
+            loader.wait()
+            self.assertEqual(loaded, [1])
+            # the generated code and its hash
+            self.assertEqual(len(os.listdir(cache_dir)), 2)
+            # the worker does not touch the reference index of the GUI
+            self.assertEqual(len(self.uaclient.reference_index), 0)
+            # without version the dictionary contents invalidate the cache
+            nodeids = loader._get_dictionaries()
+            self.assertEqual(nodeids, [dictionary.nodeid])
+            key = loader._get_cache_key(nodeids)
+            path = os.path.join(cache_dir, key + ".py")
+            self.assertEqual(loader._load_cached(path), 1)
+            dictionary.write_value(xml.replace("X", "Y").encode("utf-8"),
+                                   ua.VariantType.ByteString)
+            self.assertNotEqual(loader._get_cache_key(nodeids), key)
+            # with version only the properties are read
+            dictionary.add_property(2, "NamespaceUri", "urn:test")
+            version = dictionary.add_property(2, "DictionaryVersion", "1")
+            key = loader._get_cache_key(nodeids)
+            dictionary.write_value(xml.encode("utf-8"),
+                                   ua.VariantType.ByteString)
+            self.assertEqual(loader._get_cache_key(nodeids), key)
+            version.write_value("2")
+            self.assertNotEqual(loader._get_cache_key(nodeids), key)
+            # tampered code is not executed
+            with open(path, "a") as source:
+                source.write("raise RuntimeError()\n")
+            self.assertIsNone(loader._load_cached(path))
+            # an interrupted load neither caches nor reports anything
+            loader.isInterruptionRequested = lambda: True
+            loader.run()
+            del loader.isInterruptionRequested
+            self.assertEqual(loaded, [1])
+            self.assertEqual(len(os.listdir(cache_dir)), 2)
+
+    def test_reference_index(self):
+        index = self.uaclient.reference_index
+        root = ua.NodeId(ua.ObjectIds.RootFolder)
+        state = ua.NodeId(ua.ObjectIds.Server_ServerStatus_State)
+        self.assertIsNone(index.find_path(root, state))
+        distances = index.expand([root], 4)
+        self.assertEqual(distances[state], 4)
+        path = index.find_path(root, state)
+        self.assertEqual(len(path), 4)
+        self.assertEqual(path[-1][1][2], state)
+        # known nodes are not browsed again
+        browsed = []
+        self.uaclient.browse = lambda nodeids, *args: browsed.extend(nodeids)
+        index.expand([root], 2)
+        self.assertEqual(browsed, [])
+
+    def test_tree_browses_are_indexed(self):
+        index = self.uaclient.reference_index
+        objects = self.uaclient.get_node(ua.ObjectIds.ObjectsFolder)
+        server = ua.NodeId(ua.ObjectIds.Server)
+        model = TreeViewModel(reference_index=index)
+        self.assertEqual(index.get_edges(objects.nodeid), [])
+        model._get_children_descriptions(objects)
+        self.assertIn(server, [edge[2] for edge
+                               in index.get_edges(objects.nodeid)])
+        # the references are indexed for both of their ends
+        self.assertEqual(len(index.find_path(server, objects.nodeid)), 1)
+
+    def test_reference_types(self):
+        reftypes = self.uaclient.reference_types
+        tree = reftypes.get_tree()
+        self.assertEqual(tree[0], (ua.NodeId(ua.ObjectIds.References),
+                                   "References", 0))
+        hierarchical = reftypes.get_subtypes(
+            ua.NodeId(ua.ObjectIds.HierarchicalReferences))
+        self.assertIn(ua.NodeId(ua.ObjectIds.HasComponent), hierarchical)
+        self.assertNotIn(ua.NodeId(ua.ObjectIds.HasTypeDefinition),
+                         hierarchical)
+        self.assertEqual(reftypes.get_name(
+            ua.NodeId(ua.ObjectIds.HasProperty)), "HasProperty")
+        # the hierarchy is loaded only once per session
+        self.uaclient.browse = None
+        self.assertEqual(len(reftypes.get_tree()), len(tree))
+
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
@@ -0,0 +1,228 @@
+"""Grid comparing the attributes of many nodes side by side."""
+import logging
+from typing import List, Dict, Any, TYPE_CHECKING
+
+from PyQt5.QtCore import QTimer, QSettings, Qt
+from PyQt5.QtGui import QStandardItemModel, QStandardItem
+from PyQt5.QtWidgets import QMenu, QAction, QHeaderView
+
+from asyncua.sync import ua
+from asyncua.sync import Node
+from asyncua.common.ua_utils import val_to_string
+
+if TYPE_CHECKING:
+    from uaclient.uaclient import UaClient
+
+logger = logging.getLogger(__name__)
+
+
+class CompareUI(object):
+    """
+    Show the selected attributes of many nodes in a grid.
+
+    Every node is a row and every attribute a column. All cells are filled
+    by a single Read, which the UaClient splits according to the operation
+    limits of the server.
+    """
+
+    DEFAULT_ATTRIBUTES = ["Value", "DataType", "AccessLevel"]
+    # extra columns shown for the timestamps of the Value attribute
+    TIMESTAMPS = ["Source Timestamp", "Server Timestamp"]
+
+    def __init__(self, window, uaclient) -> None:
+        """Create a new CompareUI for the given Window and UaClient."""
+        self.window = window
+        self.uaclient = uaclient
+        self._nodes: List[Node] = []
+        # maps the nodes to their row
+        self._rows: Dict[Node, int] = {}
+        self._attrs: List[ua.AttributeIds] = self._load_attributes()
+
+        self.model = QStandardItemModel()
+        self.window.ui.compareView.setModel(self.model)
+        self.window.ui.compareView.horizontalHeader().setSectionResizeMode(
+            QHeaderView.Interactive)
+        self._set_header()
+
+        self._attrs_menu = QMenu()
+        for attr in ua.AttributeIds:
+            action = QAction(attr.name, self._attrs_menu)
+            action.setCheckable(True)
+            action.setChecked(attr in self._attrs)
+            action.setData(attr)
+            action.toggled.connect(self._attributes_changed)
+            self._attrs_menu.addAction(action)
+        self.window.ui.compareAttrsButton.setMenu(self._attrs_menu)
+
+        self._timer = QTimer()
+        self._timer.setInterval(
+            int(QSettings().value("compare_refresh_interval", 1000)))
+        self._timer.timeout.connect(self.refresh)
+
+        self.window.ui.actionAddToCompare.triggered.connect(self._add_nodes)
+        self.window.ui.actionRemoveFromCompare.triggered.connect(
+            self._remove_nodes)
+        self.window.ui.compareRefreshButton.clicked.connect(self.refresh)
+        self.window.ui.compareClearButton.clicked.connect(self.clear)
+        self.window.ui.compareLiveCheckBox.toggled.connect(self._set_live)
+
+        # populate contextual menu
+        self.window.addAction(self.window.ui.actionAddToCompare)
+        self.window.addAction(self.window.ui.actionRemoveFromCompare)
+
+    @staticmethod
+    def _load_attributes() -> List[ua.AttributeIds]:
+        """Load the compared attributes from QSettings."""
+        names = QSettings().value("compare_attributes",
+                                  CompareUI.DEFAULT_ATTRIBUTES)
+        # an empty list is read back as None
+        if names is None:
+            names = []
+        elif isinstance(names, str):
+            names = [names]
+        return [ua.AttributeIds[name] for name in names
+                if name in ua.AttributeIds.__members__]
+
+    def _get_columns(self) -> List[str]:
+        """Return the labels of the columns after the node column."""
+        columns = [attr.name for attr in self._attrs]
+        if ua.AttributeIds.Value in self._attrs:
+            columns.extend(self.TIMESTAMPS)
+        return columns
+
+    def _set_header(self) -> None:
+        """Set the header labels and column count for the attributes."""
+        columns = self._get_columns()
+        self.model.setColumnCount(len(columns) + 1)
+        self.model.setHorizontalHeaderLabels(["DisplayName", *columns])
+
+    def show_error(self, *args: Any) -> None:
+        """Show an error in the Window."""
+        self.window.show_error(*args)
+
+    def clear(self) -> None:
+        """Remove all nodes from the comparison."""
+        self.window.ui.compareLiveCheckBox.setChecked(False)
+        self._nodes = []
+        self._rows.clear()
+        self.model.removeRows(0, self.model.rowCount())
+
+    def _attributes_changed(self, _: bool) -> None:
+        """Update the columns to the attributes checked in the menu."""
+        self._attrs = [action.data() for action in self._attrs_menu.actions()
+                       if action.isChecked()]
+        QSettings().setValue("compare_attributes",
+                             [attr.name for attr in self._attrs])
+        self._set_header()
+        for row in range(self.model.rowCount()):
+            for col in range(1, self.model.columnCount()):
+                self.model.setItem(row, col, QStandardItem())
+        self.refresh()
+
+    def _add_nodes(self) -> None:
+        """Add the nodes selected in the tree and read their attributes."""
+        nodes = [node for node in self.window.tree_ui.get_selected_nodes()
+                 if node not in self._rows]
+        if not nodes:
+            return
+        self.window.ui.compareDockWidget.raise_()
+        self._nodes.extend(nodes)
+        self._append_rows(nodes)
+        self.refresh()
+
+    def _append_rows(self, nodes: List[Node]) -> None:
+        """Append rows for the nodes, named by one bulk Read."""
+        try:
+            names = self.uaclient.read_attributes(
+                [node.nodeid for node in nodes], ua.AttributeIds.DisplayName)
+        except Exception as ex:
+            self.show_error(ex)
+            names = [None] * len(nodes)
+        columns = len(self._get_columns())
+        for node, name in zip(nodes, names):
+            if name is not None and name.StatusCode.is_good():
+                text = name.Value.Value.Text
+            else:
+                text = node.nodeid.to_string()
+            name_item = QStandardItem(text)
+            name_item.setData(node, Qt.UserRole)
+            name_item.setToolTip(node.nodeid.to_string())
+            self._rows[node] = self.model.rowCount()
+            self.model.appendRow(
+                [name_item, *(QStandardItem() for _ in range(columns))])
+
+    def _remove_nodes(self) -> None:
+        """Remove the nodes selected in the tree from the comparison."""
+        selected = set(self.window.tree_ui.get_selected_nodes())
+        for row in reversed(range(len(self._nodes))):
+            if self._nodes[row] in selected:
+                self.model.removeRow(row)
+                del self._nodes[row]
+        self._rows = {node: row for row, node in enumerate(self._nodes)}
+
+    def _set_live(self, live: bool) -> None:
+        """Start or stop reading the attributes periodically."""
+        if live:
+            self._timer.start()
+        else:
+            self._timer.stop()
+
+    def refresh(self) -> None:
+        """Read all attributes of all nodes and update the cells."""
+        if not self._nodes or not self._attrs \
+                or self.uaclient.client is None:
+            return
+        try:
+            rows = self.read_texts(self.uaclient,
+                                   [node.nodeid for node in self._nodes],
+                                   self._attrs)
+        except Exception as ex:
+            self.window.ui.compareLiveCheckBox.setChecked(False)
+            self.show_error(ex)
+            return
+        for row, texts in enumerate(rows):
+            for col, text in enumerate(texts, 1):
+                item = self.model.item(row, col)
+                if item.text() != text:
+                    item.setText(text)
+
+    @staticmethod
+    def read_texts(uaclient: "UaClient", nodeids: List[ua.NodeId],
+                   attrs: List[ua.AttributeIds]) -> List[List[str]]:
+        """
+        Read the attributes of the nodes with a single bulk Read and return
+        the texts of every node, followed by the timestamps of the Value.
+        """
+        nodes_to_read = []
+        for nodeid in nodeids:
+            for attr in attrs:
+                rvi = ua.ReadValueId()
+                rvi.NodeId = nodeid
+                rvi.AttributeId = attr
+                nodes_to_read.append(rvi)
+        values = uaclient.read(nodes_to_read)
+        count = len(attrs)
+        rows = []
+        for row in range(len(nodeids)):
+            texts = []
+            timestamps = []
+            for attr, value in zip(attrs,
+                                   values[row * count:(row + 1) * count]):
+                texts.append(CompareUI._value_to_string(uaclient, attr, value))
+                if attr == ua.AttributeIds.Value:
+                    timestamps = [value.SourceTimestamp,
+                                  value.ServerTimestamp]
+            texts.extend("" if timestamp is None else timestamp.isoformat()
+                         for timestamp in timestamps)
+            rows.append(texts)
+        return rows
+
+    @staticmethod
+    def _value_to_string(uaclient: "UaClient", attr: ua.AttributeIds,
+                         value: ua.DataValue) -> str:
+        """Return the text shown for an attribute value."""
+        if not value.StatusCode.is_good():
+            return value.StatusCode.name
+        if attr == ua.AttributeIds.DataType:
+            return uaclient.data_types.get_name(value.Value.Value)
+        return val_to_string(value.Value.Value)
@@ -0,0 +1,108 @@
+"""Per session registry of the DataTypes known by the server."""
+import logging
+from typing import Dict, List, Optional, TYPE_CHECKING
+
+from asyncua.sync import ua
+from asyncua.ua import NodeId, VariantType
+
+if TYPE_CHECKING:
+    from uaclient.uaclient import UaClient
+
+
+class DataTypeRegistry:
+    """
+    Resolve DataType NodeIds to names and VariantTypes.
+
+    Every DataType is resolved at most once per session, the whole type
+    hierarchy can be loaded upfront with one Browse request per level.
+    """
+
+    def __init__(self, uaclient: "UaClient") -> None:
+        """Create a new DataTypeRegistry using the given UaClient."""
+        self._uaclient = uaclient
+
+        # maps DataType NodeIds to their BrowseName
+        self._names: Dict[NodeId, str] = {}
+
+        # maps DataType NodeIds to the NodeId of their supertype
+        self._supertypes: Dict[NodeId, Optional[NodeId]] = {}
+
+    def clear(self) -> None:
+        """Forget everything known about the DataTypes of the session."""
+        self._names.clear()
+        self._supertypes.clear()
+
+    def preload(self) -> None:
+        """Load names and supertypes of all DataTypes of the server."""
+        base = NodeId(ua.ObjectIds.BaseDataType)
+        self._names[base] = "BaseDataType"
+        self._supertypes[base] = None
+        level = [base]
+        while level:
+            results = self._uaclient.browse(
+                level, ua.ObjectIds.HasSubtype,
+                nodeclass_mask=ua.NodeClass.DataType)
+            next_level = []
+            for parent, refs in zip(level, results):
+                for ref in refs:
+                    if ref.NodeId in self._supertypes:
+                        continue
+                    self._names[ref.NodeId] = ref.BrowseName.Name
+                    self._supertypes[ref.NodeId] = parent
+                    next_level.append(ref.NodeId)
+            level = next_level
+        logging.debug("Preloaded %s DataTypes", len(self._names))
+
+    def get_name(self, nodeid: NodeId) -> str:
+        """Return the name of a DataType."""
+        return self.get_names([nodeid])[0]
+
+    def get_names(self, nodeids: List[NodeId]) -> List[str]:
+        """Return the names of DataTypes, reading unknown ones in bulk."""
+        unknown = list({nodeid for nodeid in nodeids
+                        if nodeid not in self._names})
+        if unknown:
+            values = self._uaclient.read_attributes(
+                unknown, ua.AttributeIds.BrowseName)
+            for nodeid, value in zip(unknown, values):
+                if value.StatusCode.is_good():
+                    self._names[nodeid] = value.Value.Value.Name
+                else:
+                    self._names[nodeid] = nodeid.to_string()
+        return [self._names[nodeid] for nodeid in nodeids]
+
+    def get_variant_type(self, nodeid: NodeId) -> VariantType:
+        """Return the VariantType used to encode values of a DataType."""
+        base = nodeid
+        while base is not None:
+            if base.NamespaceIndex == 0 and isinstance(base.Identifier, int):
+                if base.Identifier == ua.ObjectIds.Enumeration:
+                    return VariantType.Int32
+                try:
+                    return VariantType(base.Identifier)
+                except ValueError:
+                    pass
+            base = self._get_supertype(base)
+        return VariantType.Variant
+
+    def get_known_types(self) -> Dict[NodeId, str]:
+        """Return the names of all DataTypes resolved so far."""
+        return dict(self._names)
+
+    def is_subtype(self, nodeid: NodeId, supertype: NodeId) -> bool:
+        """Return if a DataType is supertype or one of its subtypes."""
+        base: Optional[NodeId] = nodeid
+        while base is not None:
+            if base == supertype:
+                return True
+            base = self._get_supertype(base)
+        return False
+
+    def _get_supertype(self, nodeid: NodeId) -> Optional[NodeId]:
+        """Return the supertype of a DataType, browsing if unknown."""
+        if nodeid not in self._supertypes:
+            refs = self._uaclient.browse(
+                [nodeid], ua.ObjectIds.HasSubtype,
+                direction=ua.BrowseDirection.Inverse)[0]
+            self._supertypes[nodeid] = refs[0].NodeId if refs else None
+        return self._supertypes[nodeid]
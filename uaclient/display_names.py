@@ -0,0 +1,64 @@
+"""Per session cache of the DisplayNames of nodes."""
+import logging
+from typing import Dict, List, TYPE_CHECKING
+
+from asyncua.sync import ua
+from asyncua.ua import NodeId
+
+if TYPE_CHECKING:
+    from uaclient.uaclient import UaClient
+
+
+class DisplayNameCache:
+    """
+    Resolve NodeIds to readable names.
+
+    Standard nodes are named from ua.ObjectIdNames, all other nodes by
+    their DisplayName, which is read at most once per session and in bulk
+    for all nodes requested together.
+    """
+
+    def __init__(self, uaclient: "UaClient") -> None:
+        """Create a new DisplayNameCache using the given UaClient."""
+        self._uaclient = uaclient
+
+        # maps NodeIds of the server to their DisplayName
+        self._names: Dict[NodeId, str] = {}
+
+    def clear(self) -> None:
+        """Forget all names read during the session."""
+        self._names.clear()
+
+    @staticmethod
+    def get_standard_name(nodeid: NodeId) -> str:
+        """Return the name of a node without asking the server, or ''."""
+        if nodeid.NamespaceIndex == 0 \
+                and nodeid.Identifier in ua.ObjectIdNames:
+            return ua.ObjectIdNames[nodeid.Identifier]
+        return ""
+
+    def set_name(self, nodeid: NodeId, name: str) -> None:
+        """Remember a DisplayName learned from another service."""
+        self._names[nodeid] = name
+
+    def get_name(self, nodeid: NodeId) -> str:
+        """Return the name of a node."""
+        return self.get_names([nodeid])[0]
+
+    def get_names(self, nodeids: List[NodeId]) -> List[str]:
+        """Return the names of nodes, reading unknown ones in bulk."""
+        unknown = list({nodeid for nodeid in nodeids
+                        if nodeid not in self._names
+                        and not nodeid.is_null()
+                        and not self.get_standard_name(nodeid)})
+        if unknown:
+            logging.debug("Reading %s DisplayNames", len(unknown))
+            values = self._uaclient.read_attributes(
+                unknown, ua.AttributeIds.DisplayName)
+            for nodeid, value in zip(unknown, values):
+                if value.StatusCode.is_good() and value.Value.Value.Text:
+                    self._names[nodeid] = value.Value.Value.Text
+                else:
+                    self._names[nodeid] = nodeid.to_string()
+        return [self._names.get(nodeid) or self.get_standard_name(nodeid)
+                or nodeid.to_string() for nodeid in nodeids]
@@ -0,0 +1,149 @@
+"""Explorer for the reference graph around the nodes of a server."""
+import logging
+from typing import Dict, List, Optional
+
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QStandardItemModel, QStandardItem
+from PyQt5.QtWidgets import QHeaderView
+
+from asyncua.ua import NodeId
+
+from uaclient.reference_index import Edge
+
+logger = logging.getLogger(__name__)
+
+
+class ExplorerUI(object):
+    """
+    Show the neighbourhood of a node and paths between nodes.
+
+    Both are taken from the ReferenceIndex of the UaClient, which is
+    filled by the Browse requests of the UaClient, the address space tree
+    and the references pane, so only nodes that were never browsed
+    completely cost a request.
+    """
+
+    HEADER_LABELS = ["DisplayName", "Reference", "NodeId"]
+
+    def __init__(self, window, uaclient) -> None:
+        """Create a new ExplorerUI for the given Window and UaClient."""
+        self.window = window
+        self.uaclient = uaclient
+        self._path_start: Optional[NodeId] = None
+
+        self.model = QStandardItemModel()
+        self.model.setHorizontalHeaderLabels(self.HEADER_LABELS)
+        self.window.ui.explorerView.setModel(self.model)
+        self.window.ui.explorerView.header().setSectionResizeMode(
+            QHeaderView.Interactive)
+
+        self.window.ui.explorerExpandButton.clicked.connect(self.expand)
+        self.window.ui.explorerPathButton.clicked.connect(self.find_path)
+        self.window.ui.actionSetPathStart.triggered.connect(
+            self._set_path_start)
+
+        # populate contextual menu
+        self.window.addAction(self.window.ui.actionSetPathStart)
+
+    def show_error(self, *args) -> None:
+        """Show an error in the Window."""
+        self.window.show_error(*args)
+
+    def clear(self) -> None:
+        """Remove the shown graph and the path start."""
+        self._path_start = None
+        self.clear_rows()
+
+    def _set_path_start(self) -> None:
+        """Use the current node as start of the next path search."""
+        node = self.window.get_current_node()
+        if node is not None:
+            self._path_start = node.nodeid
+
+    def _get_reference_text(self, edge: Edge) -> str:
+        """Return the reference type of an edge with its direction."""
+        name = self.uaclient.display_names.get_name(edge[0])
+        return name if edge[1] else "<- " + name
+
+    def _make_row(self, nodeid: NodeId, edge: Optional[Edge])\
+            -> List[QStandardItem]:
+        """Return the items showing a node reached by edge."""
+        items = [QStandardItem(self.uaclient.display_names.get_name(nodeid)),
+                 QStandardItem(self._get_reference_text(edge) if edge
+                               else ""),
+                 QStandardItem(nodeid.to_string())]
+        items[0].setData(nodeid, Qt.UserRole)
+        return items
+
+    def expand(self) -> None:
+        """Show all nodes within the chosen number of hops of the node."""
+        node = self.window.get_current_node()
+        if node is None or self.uaclient.client is None:
+            return
+        hops = self.window.ui.explorerHopsSpinBox.value()
+        index = self.uaclient.reference_index
+        try:
+            distances = index.expand([node.nodeid], hops)
+            # read all names still unknown with one request
+            nodeids = set(distances)
+            nodeids.update(edge[0] for nodeid in distances
+                           for edge in index.get_edges(nodeid))
+            self.uaclient.display_names.get_names(list(nodeids))
+        except Exception as ex:
+            self.show_error(ex)
+            return
+        self.clear_rows()
+        root = self._make_row(node.nodeid, None)
+        self.model.appendRow(root)
+        # every node is shown once, below the first node reaching it
+        shown = {node.nodeid}
+        level: Dict[NodeId, QStandardItem] = {node.nodeid: root[0]}
+        for hop in range(1, hops + 1):
+            next_level = {}
+            for nodeid, item in level.items():
+                for edge in index.get_edges(nodeid):
+                    target = edge[2]
+                    if target in shown or distances.get(target) != hop:
+                        continue
+                    shown.add(target)
+                    row = self._make_row(target, edge)
+                    item.appendRow(row)
+                    next_level[target] = row[0]
+            level = next_level
+        self.window.ui.explorerView.expandToDepth(0)
+        logger.info("Explored %s nodes around %s", len(shown), node)
+
+    def clear_rows(self) -> None:
+        """Remove the shown graph but keep the path start."""
+        self.model.removeRows(0, self.model.rowCount())
+
+    def find_path(self) -> None:
+        """Show the shortest known path from the path start to the node."""
+        node = self.window.get_current_node()
+        if node is None or self._path_start is None:
+            self.show_error(ValueError("Set a path start first"))
+            return
+        index = self.uaclient.reference_index
+        path = index.find_path(self._path_start, node.nodeid)
+        self.clear_rows()
+        if path is None:
+            names = self.uaclient.display_names
+            self.show_error(ValueError(
+                "No path known between {} and {} among {} indexed nodes, "
+                "expand further".format(names.get_name(self._path_start),
+                                        names.get_name(node.nodeid),
+                                        len(index))))
+            return
+        try:
+            self.uaclient.display_names.get_names(
+                [nodeid for step in path for nodeid in (step[1][0],
+                                                        step[1][2])])
+        except Exception as ex:
+            self.show_error(ex)
+            return
+        parent = self.model.invisibleRootItem()
+        parent.appendRow(self._make_row(self._path_start, None))
+        for _, edge in path:
+            row = self._make_row(edge[2], edge)
+            parent.appendRow(row)
+        self.window.ui.explorerDockWidget.raise_()
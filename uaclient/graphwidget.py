@@ -92,11 +92,11 @@ class GraphUI(object):
         if node not in self._node_list:
             dtype = node.get_attribute(ua.AttributeIds.DataType)
 
-            dtypeStr = ua.ObjectIdNames[dtype.Value.Value.Identifier]
+            dtypeStr = self.uaclient.data_types.get_name(dtype.Value.Value)
+            vtype = self.uaclient.data_types.get_variant_type(dtype.Value.Value)
 
-
-
-            if dtypeStr in self.acceptedDatatypes and not isinstance(node.get_value() ,list):
+            if (dtypeStr in self.acceptedDatatypes or vtype.name in self.acceptedDatatypes) \
+                    and not isinstance(node.get_value() ,list):
                 self._node_list.append(node)
                 displayName = node.get_display_name().Text
                 colorIndex = len(self._node_list) % len(self.colorCycle)
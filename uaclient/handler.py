@@ -1,21 +1,168 @@
 """Subscription handler definitions."""
 
-from datetime import datetime
+import threading
+import time
+from datetime import datetime, timezone
 
 from PyQt5.QtCore import QObject, pyqtSignal
 
+from asyncua.sync import ua
+
+
+# InfoType DataValue with the Overflow bit set, the server discarded values
+# from the queue of the monitored item
+OVERFLOW_BITS = 0x480
+
+# weight of the latest notification in the running averages
+SMOOTHING = 0.2
+
+
+def _to_naive_utc(timestamp):
+    """Return a timestamp comparable with datetime.utcnow()."""
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+    return timestamp
+
+
+def _smooth(average, value):
+    """Return the running average updated with a new value."""
+    if average is None:
+        return value
+    return average + SMOOTHING * (value - average)
+
+
+class ItemStatistics(object):
+    """
+    Running statistics of the notifications of one monitored item.
+
+    Rate and latencies are exponential moving averages, so updating them
+    costs a few arithmetic operations per notification. Latencies are in
+    milliseconds and None until a notification carried the timestamps.
+    """
+
+    __slots__ = ("notifications", "coalesced", "overflows", "interval",
+                 "source_latency", "server_latency", "_last")
+
+    def __init__(self):
+        self.notifications = 0
+        # notifications replaced before the GUI took them
+        self.coalesced = 0
+        # notifications flagged with the Overflow bit
+        self.overflows = 0
+        # average seconds between notifications
+        self.interval = None
+        self.source_latency = None
+        self.server_latency = None
+        self._last = None
+
+    @property
+    def rate(self):
+        """Return the average notifications per second."""
+        if not self.interval:
+            return 0.0
+        return 1 / self.interval
+
+    def add(self, value, received, now):
+        """Account for a notification received at a monotonic time."""
+        self.notifications += 1
+        if value.StatusCode is not None \
+                and value.StatusCode.value & OVERFLOW_BITS == OVERFLOW_BITS:
+            self.overflows += 1
+        if self._last is not None:
+            self.interval = _smooth(self.interval, received - self._last)
+        self._last = received
+        if value.ServerTimestamp is not None:
+            server = _to_naive_utc(value.ServerTimestamp)
+            self.server_latency = _smooth(
+                self.server_latency,
+                (now - server).total_seconds() * 1000)
+            if value.SourceTimestamp is not None:
+                self.source_latency = _smooth(
+                    self.source_latency,
+                    (server - _to_naive_utc(value.SourceTimestamp))
+                    .total_seconds() * 1000)
+
 
 class DataChangeHandler(QObject):
-    data_change_fired = pyqtSignal(object, str, str)
+    """
+    Collect data changes in a buffer holding the latest value per node.
+
+    The GUI drains the buffer at its own refresh rate with take_changes,
+    values replaced before they were taken are only counted. Values are
+    kept as received, formatting them is left to the GUI. Every node also
+    gets running ItemStatistics, the totals over all nodes are kept too.
+    Given a HistoryStore, every numeric value is added to its history.
+    """
+
+    def __init__(self, history=None):
+        QObject.__init__(self)
+        self.history = history
+        self._lock = threading.Lock()
+        # maps NodeIds to the latest (node, DataValue, count, statistics)
+        # not yet taken, count being the number of notifications it replaces
+        self._changes = {}
+        # maps NodeIds to the ItemStatistics of their notifications
+        self._statistics = {}
+        # number of notifications replaced before they were taken
+        self.superseded = 0
+        # number of all notifications and of those flagged as overflow
+        self.notifications = 0
+        self.overflows = 0
+
+    def datachange_notification(self, node, val, data):
+        value = data.monitored_item.Value
+        received = time.monotonic()
+        now = datetime.utcnow()
+        with self._lock:
+            statistics = self._statistics.get(node.nodeid)
+            if statistics is None:
+                statistics = self._statistics[node.nodeid] = ItemStatistics()
+            overflows = statistics.overflows
+            statistics.add(value, received, now)
+            self.notifications += 1
+            self.overflows += statistics.overflows - overflows
+            count = 1
+            if node.nodeid in self._changes:
+                self.superseded += 1
+                statistics.coalesced += 1
+                count += self._changes[node.nodeid][2]
+            self._changes[node.nodeid] = (node, value, count, statistics)
+        if self.history is not None:
+            self.history.add(node.nodeid, value)
+
+    def take_changes(self):
+        """Return the changes received since the last call and forget them."""
+        with self._lock:
+            changes = self._changes
+            self._changes = {}
+        return list(changes.values())
+
+    def forget(self, nodeid):
+        """Drop the pending change and statistics of an unsubscribed node."""
+        with self._lock:
+            self._changes.pop(nodeid, None)
+            self._statistics.pop(nodeid, None)
+        if self.history is not None:
+            self.history.remove(nodeid)
+
+    def clear(self):
+        """Drop pending changes and reset all statistics."""
+        with self._lock:
+            self._changes = {}
+            self._statistics = {}
+            self.superseded = 0
+            self.notifications = 0
+            self.overflows = 0
+        if self.history is not None:
+            self.history.clear()
+
+
+class AttributeHandler(QObject):
+    attribute_changed = pyqtSignal(object, object, object)
 
     def datachange_notification(self, node, val, data):
-        if data.monitored_item.Value.SourceTimestamp:
-            dato = data.monitored_item.Value.SourceTimestamp.isoformat()
-        elif data.monitored_item.Value.ServerTimestamp:
-            dato = data.monitored_item.Value.ServerTimestamp.isoformat()
-        else:
-            dato = datetime.now().isoformat()
-        self.data_change_fired.emit(node, str(val), dato)
+        attr = ua.AttributeIds(data.subscription_data.attribute)
+        self.attribute_changed.emit(node, attr, data.monitored_item.Value)
 
 
 class EventHandler(QObject):
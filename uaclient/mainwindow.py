@@ -1,7 +1,11 @@
 #! /usr/bin/env python3
+import itertools
+import json
 import os
 import sys
+import time
 import traceback
+from copy import copy
 
 import logging
 from typing import List, Optional
@@ -10,16 +14,28 @@ from PyQt5.QtCore import QTimer, Qt, QSettings, \
     QItemSelection, QCoreApplication, pyqtSlot, QPoint
 from PyQt5.QtGui import QStandardItemModel, QStandardItem, QIcon, QCloseEvent
 from PyQt5.QtWidgets import QMainWindow, QWidget, QApplication, \
-    QMenu, QMessageBox, QAction
+    QMenu, QMessageBox, QAction, QProgressDialog, QInputDialog
 
 from asyncua.sync import ua
 from asyncua.sync import Node
 
-from uaclient.handler import DataChangeHandler, EventHandler
+from uaclient.handler import DataChangeHandler, EventHandler, \
+    AttributeHandler
 from uaclient.uaclient import UaClient
+from uaclient.reconnector import Reconnector
 from uaclient.mainwindow_ui import Ui_MainWindow
 from uaclient.connection_dialog import ConnectionDialog
 from uaclient.graphwidget import GraphUI
+from uaclient.comparewidget import CompareUI
+from uaclient.subscription_group_dialog import SubscriptionGroupDialog
+from uaclient.recursive_subscribe_dialog import RecursiveSubscribeDialog
+from uaclient.subscription_groups import DEFAULT_GROUP
+from uaclient.watch_lists import WatchedNode, LAST_SESSION, \
+    load_watch_lists, save_watch_list, remove_watch_list
+from uaclient.explorerwidget import ExplorerUI
+from uaclient.subscription_model import SubscriptionModel, \
+    MonitoringDelegate, SparklineDelegate
+from uaclient.value_history import HistoryStore, use_numpy
 from uawidgets.attribute_widget import AttributeWidget
 
 from uawidgets.tree_widget import TreeWidget
@@ -86,11 +102,26 @@ class EventUI(object):
             self._subscribed_nodes.append(node)
 
     def _unsubscribe(self):
-        node = self.window.get_current_node()
-        if node is None:
+        nodes = [node for node in self.window.tree_ui.get_selected_nodes()
+                 if node in self._subscribed_nodes]
+        if not nodes:
             return
-        self._subscribed_nodes.remove(node)
-        self.uaclient.unsubscribe_events(node)
+        for node in nodes:
+            self._subscribed_nodes.remove(node)
+        try:
+            results = self.uaclient.unsubscribe_events(nodes)
+        except Exception as ex:
+            self.show_error(ex)
+            return
+        errors = [result for result in results.values()
+                  if not result.is_good()]
+        if errors:
+            logger.warning("Could not unsubscribe from the events of %s "
+                           "nodes", len(errors))
+            try:
+                errors[0].check()
+            except Exception as ex:
+                self.show_error(ex)
 
     def _update_event_model(self, event):
         self.model.appendRow([QStandardItem(str(event))])
@@ -98,25 +129,91 @@ class EventUI(object):
 
 class DataChangeUI(object):
 
+    # number of nodes subscribed between updates of the progress dialog
+    SUBSCRIBE_STEP = 1000
+
     def __init__(self, window, uaclient):
         self.window = window
         self.uaclient = uaclient
-        self._subhandler = DataChangeHandler()
-        self._subscribed_nodes = []
-        self.model = QStandardItemModel()
+        # numeric values are kept in a history of a fixed number of points
+        # per node, bounded in total, painted as a line in the last column
+        self._history = None
+        if use_numpy:
+            self._history = HistoryStore(
+                int(QSettings().value("datachange_history_points", 200)),
+                int(QSettings().value("datachange_history_mb", 32))
+                * 1024 * 1024)
+        self._subhandler = DataChangeHandler(self._history)
+        self.model = SubscriptionModel(history=self._history)
         self.window.ui.subView.setModel(self.model)
+        self.window.ui.subView.setItemDelegate(MonitoringDelegate(
+            self.window.ui.subView,
+            lambda: sorted(self.uaclient.subscription_groups)))
+        self.window.ui.subView.setItemDelegateForColumn(
+            SubscriptionModel.HISTORY_COLUMN,
+            SparklineDelegate(self.window.ui.subView))
         self.window.ui.subView.horizontalHeader().setSectionResizeMode(1)
 
+        # the statistics columns are hidden unless chosen from the header
+        header = self.window.ui.subView.horizontalHeader()
+        header.setContextMenuPolicy(Qt.CustomContextMenu)
+        header.customContextMenuRequested.connect(self._show_header_menu)
+        keys = SubscriptionModel.COLUMN_KEYS
+        hidden = keys[SubscriptionModel.STATISTICS_COLUMN:
+                      SubscriptionModel.TRIGGER_COLUMN]
+        try:
+            hidden = json.loads(QSettings().value(
+                "datachange_hidden_columns", json.dumps(hidden)))
+        except (TypeError, ValueError) as ex:
+            logger.warning("Could not load the hidden columns: %s", ex)
+        if not use_numpy:
+            hidden.append(keys[SubscriptionModel.HISTORY_COLUMN])
+        for column, key in enumerate(keys):
+            header.setSectionHidden(column, key in hidden)
+
         self.window.ui.actionSubscribeDataChange.triggered.connect(self._subscribe)
+        self.window.ui.actionSubscribeRecursive.triggered.connect(self._subscribe_recursive)
         self.window.ui.actionUnsubscribeDataChange.triggered.connect(self._unsubscribe)
+        self.window.ui.actionUnsubscribeSelected.triggered.connect(self._unsubscribe_selected)
+        self.window.ui.actionUnsubscribeAll.triggered.connect(self._unsubscribe_all)
+        self.window.ui.actionSubscriptionGroups.triggered.connect(self._edit_groups)
+        self.window.ui.actionLinkTrigger.triggered.connect(self._link_trigger)
+        self.window.ui.actionUnlinkTrigger.triggered.connect(self._unlink_trigger)
+        self.window.ui.actionSaveWatchList.triggered.connect(self._save_watch_list)
+        self.window.ui.actionLoadWatchList.triggered.connect(self._load_watch_list)
+        self.window.ui.actionRemoveWatchList.triggered.connect(self._remove_watch_list)
 
         # populate contextual menu
         self.window.addAction(self.window.ui.actionSubscribeDataChange)
+        self.window.addAction(self.window.ui.actionSubscribeRecursive)
         self.window.addAction(self.window.ui.actionUnsubscribeDataChange)
+        # contextual menu of the rows
+        self.window.ui.subView.setContextMenuPolicy(Qt.ActionsContextMenu)
+        self.window.ui.subView.addAction(self.window.ui.actionUnsubscribeSelected)
+        self.window.ui.subView.addAction(self.window.ui.actionUnsubscribeAll)
+        self.window.ui.subView.addAction(self.window.ui.actionLinkTrigger)
+        self.window.ui.subView.addAction(self.window.ui.actionUnlinkTrigger)
+
+        # handle subscriptions, the handler buffers the latest values which
+        # are shown at most refresh rate times per second, the totals of
+        # the handler are summed up in the title once per second
+        self._title = self.window.ui.subDockWidget.windowTitle()
+        self._summary_time = time.monotonic()
+        self._notifications = 0
+        # if the connection is lost and the rows are shown as stale
+        self._connection_lost = False
+        self._timer = QTimer()
+        rate = float(QSettings().value("datachange_refresh_rate", 20))
+        self._timer.setInterval(int(1000 / rate))
+        self._timer.timeout.connect(self._show_changes)
+
+        # edits of the monitoring parameters are sent together once the
+        # event loop is idle again
+        self._modify_timer = QTimer()
+        self._modify_timer.setSingleShot(True)
+        self._modify_timer.timeout.connect(self._modify_monitoring)
+        self.model.parameters_edited.connect(self._modify_timer.start)
 
-        # handle subscriptions
-        self._subhandler.data_change_fired.connect(self._update_subscription_model, type=Qt.QueuedConnection)
-        
         # accept drops
         self.model.canDropMimeData = self.canDropMimeData
         self.model.dropMimeData = self.dropMimeData
@@ -125,63 +222,493 @@ class DataChangeUI(object):
         return True
 
     def dropMimeData(self, mdata, action, row, column, parent):
-        node = self.uaclient.client.get_node(mdata.text())
-        self._subscribe(node)
+        # the tree joins the NodeIds of all dragged nodes
+        nodes = [self.uaclient.client.get_node(nodeid)
+                 for nodeid in mdata.text().split(", ")]
+        self._subscribe(nodes)
         return True
 
     def clear(self):
-        self._subscribed_nodes = []
+        self._timer.stop()
+        self._subhandler.clear()
+        self._notifications = 0
+        self._connection_lost = False
+        self.window.ui.subDockWidget.setWindowTitle(self._title)
         self.model.clear()
 
     def show_error(self, *args):
         self.window.show_error(*args)
 
-    def _subscribe(self, node=None):
-        if not isinstance(node, Node):
-            node = self.window.get_current_node()
-            if node is None:
-                return
-        if node in self._subscribed_nodes:
-            logger.warning("allready subscribed to node: %s ", node)
+    def _subscribe(self, nodes=None):
+        if isinstance(nodes, Node):
+            nodes = [nodes]
+        elif not isinstance(nodes, list):
+            nodes = self.window.tree_ui.get_selected_nodes()
+        unique = {}
+        for node in nodes:
+            if self.model.has_node(node.nodeid):
+                logger.warning("allready subscribed to node: %s ", node)
+            else:
+                unique.setdefault(node.nodeid, node)
+        nodes = list(unique.values())
+        if not nodes:
             return
-        self.model.setHorizontalHeaderLabels(["DisplayName", "Value", "Timestamp"])
-        text = str(node.get_display_name().Text)
-        row = [QStandardItem(text), QStandardItem("No Data yet"), QStandardItem("")]
-        row[0].setData(node)
-        self.model.appendRow(row)
-        self._subscribed_nodes.append(node)
+        try:
+            names = self.uaclient.display_names.get_names(
+                [node.nodeid for node in nodes])
+        except Exception as ex:
+            logger.warning("Could not read the names of %s nodes: %s",
+                           len(nodes), ex)
+            names = [node.nodeid.to_string() for node in nodes]
+        self.model.add_nodes(
+            nodes, names, self.uaclient.get_default_monitoring_parameters(),
+            DEFAULT_GROUP)
         self.window.ui.subDockWidget.raise_()
+        self._timer.start()
         try:
-            self.uaclient.subscribe_datachange(node, self._subhandler)
+            results = self.uaclient.subscribe_datachanges(
+                nodes, self._subhandler)
         except Exception as ex:
             self.window.show_error(ex)
-            idx = self.model.indexFromItem(row[0])
-            self.model.takeRow(idx.row())
+            self.model.remove_nodes([node.nodeid for node in nodes])
             raise
+        errors = [result for result in results.values()
+                  if isinstance(result, ua.StatusCode)]
+        self.model.remove_nodes([nodeid for nodeid, result in results.items()
+                                 if isinstance(result, ua.StatusCode)])
+        if errors:
+            logger.warning("Could not subscribe to %s of %s nodes",
+                           len(errors), len(nodes))
+            try:
+                errors[0].check()
+            except Exception as ex:
+                self.window.show_error(ex)
+
+    def _subscribe_recursive(self):
+        nodes = self.window.tree_ui.get_selected_nodes()
+        if not nodes:
+            return
+        dialog = RecursiveSubscribeDialog(self.window, self.uaclient)
+        if not dialog.exec_():
+            return
+        crawler = dialog.get_crawler()
+        progress = QProgressDialog("Searching variables...", "Cancel", 0, 0,
+                                   self.window)
+        progress.setWindowModality(Qt.WindowModal)
+        progress.setMinimumDuration(500)
+
+        def report(found, browsed):
+            progress.setLabelText("Found {} variables below {} nodes".format(
+                found, browsed))
+            QApplication.processEvents()
+            return not progress.wasCanceled()
+
+        try:
+            nodeids = crawler.crawl([node.nodeid for node in nodes], report)
+        except Exception as ex:
+            progress.close()
+            self.show_error(ex)
+            return
+        if progress.wasCanceled():
+            return
+        # subscribe in steps, every step is split further by the UaClient
+        # according to the limits of the server
+        progress.setLabelText("Subscribing to {} variables".format(
+            len(nodeids)))
+        progress.setMaximum(len(nodeids))
+        for start in range(0, len(nodeids), self.SUBSCRIBE_STEP):
+            progress.setValue(start)
+            if progress.wasCanceled():
+                break
+            try:
+                self._subscribe([self.uaclient.get_node(nodeid) for nodeid in
+                                 nodeids[start:start + self.SUBSCRIBE_STEP]])
+            except Exception:
+                break
+        progress.close()
+        if crawler.truncated:
+            self.show_error(ValueError(
+                "Subscribed to the first {} variables only".format(
+                    crawler.limit)))
 
     def _unsubscribe(self):
-        node = self.window.get_current_node()
-        if node is None:
+        self.unsubscribe([node.nodeid for node
+                          in self.window.tree_ui.get_selected_nodes()
+                          if self.model.has_node(node.nodeid)])
+
+    def _unsubscribe_selected(self):
+        self.unsubscribe(self._get_selected_nodeids())
+
+    def _unsubscribe_all(self):
+        self.unsubscribe([node.nodeid for node, _, _, _
+                          in self.model.get_rows()])
+
+    def unsubscribe(self, nodeids):
+        """
+        Unsubscribe from data changes with as few requests as possible and
+        remove their rows in contiguous ranges.
+        """
+        if not nodeids:
+            return
+        results = {}
+        try:
+            results = self.uaclient.unsubscribe_datachanges(nodeids)
+        except Exception as ex:
+            self.show_error(ex)
+        finally:
+            for nodeid in nodeids:
+                self._subhandler.forget(nodeid)
+            self.model.remove_nodes(nodeids)
+        errors = [result for result in results.values()
+                  if not result.is_good()]
+        if errors:
+            logger.warning("Could not unsubscribe from %s of %s data "
+                           "changes", len(errors), len(nodeids))
+            try:
+                errors[0].check()
+            except Exception as ex:
+                self.show_error(ex)
+
+    def _get_selected_nodeids(self):
+        rows = sorted({idx.row() for idx in self.window.ui.subView
+                       .selectionModel().selectedIndexes()})
+        return [self.model.get_node(row).nodeid for row in rows]
+
+    def _link_trigger(self):
+        nodeids = self._get_selected_nodeids()
+        if not nodeids:
+            return
+        groups = {self.uaclient.get_datachange_group(nodeid)
+                  for nodeid in nodeids}
+        if len(groups) > 1:
+            self.show_error(ValueError(
+                "Items can only be linked to a trigger of their own "
+                "subscription group"))
+            return
+        selected = set(nodeids)
+        triggers = [(node.nodeid, "{} ({})".format(name,
+                                                  node.nodeid.to_string()))
+                    for node, name, group, _ in self.model.get_rows()
+                    if group in groups and node.nodeid not in selected]
+        if not triggers:
+            self.show_error(ValueError(
+                "No other item of the subscription group can be a trigger"))
+            return
+        label, ok = QInputDialog.getItem(
+            self.window, "Link to Trigger",
+            "Report {} items with changes of".format(len(nodeids)),
+            [label for _, label in triggers], 0, False)
+        if ok:
+            self.link_trigger(dict((label, nodeid)
+                                   for nodeid, label in triggers)[label],
+                              nodeids)
+
+    def _unlink_trigger(self):
+        nodeids = [nodeid for nodeid in self._get_selected_nodeids()
+                   if self.model.get_trigger(nodeid) is not None]
+        if not nodeids:
+            return
+        try:
+            self.uaclient.remove_triggering(nodeids)
+        except Exception as ex:
+            self.show_error(ex)
+        finally:
+            self._show_triggers(nodeids)
+
+    def link_trigger(self, trigger, nodeids):
+        """
+        Link data changes to a trigger item in bulk, they are only sampled
+        and reported with the changes of the trigger item.
+        """
+        try:
+            results = self.uaclient.set_triggering(trigger, nodeids)
+        except Exception as ex:
+            self.show_error(ex)
+            return
+        finally:
+            self._show_triggers(nodeids)
+        errors = [result for result in results.values()
+                  if not result.is_good()]
+        if errors:
+            logger.warning("Could not link %s of %s items to %s",
+                           len(errors), len(nodeids), trigger)
+            try:
+                errors[0].check()
+            except Exception as ex:
+                self.show_error(ex)
+
+    def _show_triggers(self, nodeids=None):
+        """Show the trigger items of nodes as linked by the UaClient."""
+        if nodeids is None:
+            nodeids = [node.nodeid for node, _, _, _ in self.model.get_rows()]
+        self.model.set_triggers({
+            nodeid: self.uaclient.get_datachange_trigger(nodeid)
+            for nodeid in nodeids})
+
+    def _choose_watch_list(self, title, editable=False):
+        if self.uaclient.endpoint is None:
+            return None
+        names = sorted(load_watch_lists(self.uaclient.endpoint))
+        if not names and not editable:
+            self.show_error(ValueError(
+                "No watch lists are saved for {}".format(
+                    self.uaclient.endpoint)))
+            return None
+        name, ok = QInputDialog.getItem(self.window, title, "Watch list",
+                                        names, 0, editable)
+        name = name.strip()
+        return name if ok and name else None
+
+    def _save_watch_list(self):
+        name = self._choose_watch_list("Save Watch List", editable=True)
+        if name is not None:
+            self.save_watch_list(name)
+
+    def _load_watch_list(self):
+        name = self._choose_watch_list("Load Watch List")
+        if name is None:
+            return
+        watched = load_watch_lists(self.uaclient.endpoint)[name]
+        restored, unresolved = self.restore_watch_list(watched)
+        logger.info("Restored %s of %s nodes of watch list %s", restored,
+                    len(watched), name)
+        if unresolved:
+            box = QMessageBox(
+                QMessageBox.Warning, "Load Watch List",
+                "Subscribed to {} of {} nodes of {}, {} could not be "
+                "resolved.".format(restored, len(watched), name,
+                                   len(unresolved)),
+                QMessageBox.Ok, self.window)
+            box.setDetailedText("\n".join(
+                "{}: {}".format(nodeid, reason)
+                for nodeid, reason in unresolved))
+            box.exec_()
+
+    def _remove_watch_list(self):
+        name = self._choose_watch_list("Remove Watch List")
+        if name is not None:
+            remove_watch_list(self.uaclient.endpoint, name)
+
+    def save_watch_list(self, name):
+        """Save the watched nodes as a watch list of the endpoint."""
+        save_watch_list(self.uaclient.endpoint, name, [
+            WatchedNode.from_parameters(node.nodeid, node_name, group, params,
+                                        self.model.get_trigger(node.nodeid))
+            for node, node_name, group, params in self.model.get_rows()])
+
+    def save_last_session(self):
+        """Save the watched nodes before they are lost by disconnecting."""
+        if self.uaclient.endpoint is not None and self.model.rowCount():
+            self.save_watch_list(LAST_SESSION)
+
+    def restore_watch_list(self, watched):
+        """
+        Subscribe to the nodes of a watch list with one bulk request per
+        group and return the number of nodes subscribed to and the
+        (NodeId, reason) of the nodes that could not be resolved.
+        """
+        unresolved = []
+        rows = []
+        seen = set()
+        for item in watched:
+            try:
+                nodeid = ua.NodeId.from_string(item.nodeid)
+            except ua.UaError:
+                unresolved.append((item.nodeid, "Invalid NodeId"))
+                continue
+            if nodeid in seen or self.model.has_node(nodeid):
+                continue
+            seen.add(nodeid)
+            if item.group not in self.uaclient.subscription_groups:
+                logger.warning("Subscription group %s is unknown, %s is "
+                               "watched in %s", item.group, item.nodeid,
+                               DEFAULT_GROUP)
+                item.group = DEFAULT_GROUP
+            rows.append((self.uaclient.get_node(nodeid), item))
+        if not rows:
+            return 0, unresolved
+
+        # consecutive rows with the same group and parameters are inserted
+        # together and share their parameters
+        parameters = {}
+        for _, run in itertools.groupby(rows, key=lambda row: (
+                row[1].group, row[1].sampling_interval, row[1].queue_size,
+                row[1].discard_oldest, row[1].deadband_type,
+                row[1].deadband_value)):
+            run = list(run)
+            params = run[0][1].get_parameters()
+            self.model.add_nodes([node for node, _ in run],
+                                 [item.name for _, item in run], params,
+                                 run[0][1].group)
+            for node, _ in run:
+                parameters[node.nodeid] = params
+        self.window.ui.subDockWidget.raise_()
+        self._timer.start()
+
+        groups = {}
+        for node, item in rows:
+            groups.setdefault(item.group, []).append(node)
+        restored = 0
+        for group, nodes in groups.items():
+            try:
+                results = self.uaclient.subscribe_datachanges(
+                    nodes, self._subhandler, group, parameters)
+            except Exception as ex:
+                self.model.remove_nodes([node.nodeid for node in nodes])
+                unresolved.extend((node.nodeid.to_string(), str(ex))
+                                  for node in nodes)
+                continue
+            rejected = [(nodeid, result) for nodeid, result in results.items()
+                        if isinstance(result, ua.StatusCode)]
+            self.model.remove_nodes([nodeid for nodeid, _ in rejected])
+            unresolved.extend((nodeid.to_string(), result.name)
+                              for nodeid, result in rejected)
+            restored += len(results) - len(rejected)
+
+        # links are set once their trigger items are subscribed too
+        triggers = {}
+        for node, item in rows:
+            if item.trigger is not None and self.model.has_node(node.nodeid):
+                triggers.setdefault(item.trigger, []).append(node.nodeid)
+        for trigger, nodeids in triggers.items():
+            try:
+                trigger = ua.NodeId.from_string(trigger)
+            except ua.UaError:
+                logger.warning("Invalid trigger NodeId %s", trigger)
+                continue
+            if self.model.has_node(trigger):
+                self.link_trigger(trigger, nodeids)
+        return restored, unresolved
+
+    def _edit_groups(self):
+        SubscriptionGroupDialog(self.window, self.uaclient).exec_()
+
+    def _modify_monitoring(self):
+        errors = []
+        parameters = self.model.take_edited()
+        moved = self.model.take_moved()
+        groups = {}
+        for nodeid, group in moved.items():
+            groups.setdefault(group, []).append(nodeid)
+            # moved items are created with the parameters of their row
+            parameters.pop(nodeid, None)
+        for group, nodeids in groups.items():
+            # moved items sample with the interval of their new group but
+            # keep their other parameters
+            interval = \
+                self.uaclient.subscription_groups[group].publishing_interval
+            moved_parameters = {}
+            for nodeid in nodeids:
+                params = copy(self.model.get_parameters(nodeid))
+                params.SamplingInterval = interval
+                moved_parameters[nodeid] = params
+            try:
+                results = self.uaclient.move_datachanges(
+                    [self.uaclient.get_node(nodeid) for nodeid in nodeids],
+                    self._subhandler, group, moved_parameters)
+            except Exception as ex:
+                errors.append(ex)
+                results = {}
+            for nodeid in nodeids:
+                result = results.get(nodeid)
+                if isinstance(result, int):
+                    self.model.set_parameters(nodeid,
+                                              moved_parameters[nodeid])
+                    continue
+                if result is not None:
+                    try:
+                        result.check()
+                    except Exception as ex:
+                        errors.append(ex)
+                    if result.value == \
+                            ua.StatusCodes.BadMonitoredItemIdInvalid:
+                        # the row has no item that stayed in a group
+                        continue
+                self.model.set_group(
+                    nodeid, self.uaclient.get_datachange_group(nodeid))
+        if moved:
+            # links do not reach into other groups, they were removed
+            self._show_triggers()
+        results = {}
+        if parameters:
+            try:
+                results = self.uaclient.modify_datachange(parameters)
+            except Exception as ex:
+                errors.append(ex)
+        for nodeid, result in results.items():
+            try:
+                result.StatusCode.check()
+            except Exception as ex:
+                errors.append(ex)
+            else:
+                self.model.set_revised(nodeid, result)
+        if errors:
+            logger.warning("Could not modify %s monitored items",
+                           len(errors))
+            self.show_error(errors[0])
+
+    def _show_header_menu(self, position):
+        header = self.window.ui.subView.horizontalHeader()
+        menu = QMenu(header)
+        for column, label in enumerate(SubscriptionModel.HEADER_LABELS):
+            action = menu.addAction(label)
+            action.setCheckable(True)
+            action.setChecked(not header.isSectionHidden(column))
+            action.setData(column)
+            if column == SubscriptionModel.HISTORY_COLUMN:
+                # there is no history to show without numpy
+                action.setEnabled(use_numpy)
+        action = menu.exec_(header.mapToGlobal(position))
+        if action is None:
             return
-        self.uaclient.unsubscribe_datachange(node)
-        self._subscribed_nodes.remove(node)
-        i = 0
-        while self.model.item(i):
-            item = self.model.item(i)
-            if item.data() == node:
-                self.model.removeRow(i)
-            i += 1
-
-    def _update_subscription_model(self, node, value, timestamp):
-        i = 0
-        while self.model.item(i):
-            item = self.model.item(i)
-            if item.data() == node:
-                it = self.model.item(i, 1)
-                it.setText(value)
-                it_ts = self.model.item(i, 2)
-                it_ts.setText(timestamp)
-            i += 1
+        header.setSectionHidden(action.data(), not action.isChecked())
+        QSettings().setValue("datachange_hidden_columns", json.dumps(
+            [key for column, key in enumerate(SubscriptionModel.COLUMN_KEYS)
+             if header.isSectionHidden(column)]))
+
+    def _show_changes(self):
+        self.model.update(self._subhandler.take_changes())
+        now = time.monotonic()
+        if now - self._summary_time >= 1:
+            self._show_summary(now)
+
+    def _show_summary(self, now):
+        notifications = self._subhandler.notifications
+        rate = (notifications - self._notifications) \
+            / (now - self._summary_time)
+        self._notifications = notifications
+        self._summary_time = now
+        summary = "{} items, {:.0f} notifications/s, {} overflows, " \
+            "{} coalesced".format(self.model.rowCount(), rate,
+                                  self._subhandler.overflows,
+                                  self._subhandler.superseded)
+        if self._connection_lost:
+            summary += ", connection lost"
+        stale = self.model.get_stale_count()
+        if stale:
+            summary += ", {} stale".format(stale)
+        self.window.ui.subDockWidget.setWindowTitle(
+            "{} ({})".format(self._title, summary))
+
+    def connection_lost(self):
+        """Show the rows as stale until the connection is back."""
+        if not self._connection_lost:
+            self._connection_lost = True
+            self.model.set_stale()
+            self._show_summary(time.monotonic())
+
+    def reconnected(self, failed):
+        """Report the data changes that could not be subscribed again."""
+        self._connection_lost = False
+        # links of recreated items may be lost
+        self._show_triggers()
+        if failed:
+            logger.warning("Could not subscribe to %s data changes again",
+                           len(failed))
+            try:
+                next(iter(failed.values())).check()
+            except Exception as ex:
+                self.show_error(ex)
 
 
 class Window(QMainWindow):
@@ -201,6 +728,10 @@ class Window(QMainWindow):
         self.tabifyDockWidget(self.ui.evDockWidget, self.ui.subDockWidget)
         self.tabifyDockWidget(self.ui.subDockWidget, self.ui.refDockWidget)
         self.tabifyDockWidget(self.ui.refDockWidget, self.ui.graphDockWidget)
+        self.tabifyDockWidget(self.ui.graphDockWidget,
+                              self.ui.compareDockWidget)
+        self.tabifyDockWidget(self.ui.compareDockWidget,
+                              self.ui.explorerDockWidget)
 
         # we only show statusbar in case of errors
         self.ui.statusBar.hide()
@@ -223,17 +754,42 @@ class Window(QMainWindow):
 
         self.uaclient: UaClient = UaClient()
 
-        self.tree_ui: TreeWidget = TreeWidget(self.ui.treeView)
+        self.tree_ui: TreeWidget = TreeWidget(
+            self.ui.treeView, display_names=self.uaclient.display_names,
+            reference_index=self.uaclient.reference_index)
         self.setup_context_menu_tree()
         self.ui.treeView.selectionModel().currentChanged.connect(
             self.update_actions_state)
 
-        self._refs_ui = RefsWidget(self.ui.refView)
+        self._refs_ui = RefsWidget(
+            self.ui.refView, display_names=self.uaclient.display_names,
+            reference_index=self.uaclient.reference_index)
         self._refs_ui.error.connect(self.show_error)
-        self._attrs_ui = AttributeWidget(self.ui.attrView)
+        self._attrs_ui = AttributeWidget(self.ui.attrView,
+                                         data_types=self.uaclient.data_types)
+        self._attr_handler = AttributeHandler()
+        self._attr_handler.attribute_changed.connect(
+            self._attrs_ui.update_attribute, type=Qt.QueuedConnection)
         self._datachange_ui = DataChangeUI(self, self.uaclient)
         self._event_ui = EventUI(self, self.uaclient)
         self._graph_ui = GraphUI(self, self.uaclient)
+        self._compare_ui = CompareUI(self, self.uaclient)
+        self._explorer_ui = ExplorerUI(self, self.uaclient)
+        self.uaclient.type_loader.loaded.connect(
+            self._type_definitions_loaded)
+
+        # watches the connection and reconnects in the background once it
+        # was lost, backing off after failed attempts, the subscriptions
+        # survive with their rows shown as stale meanwhile
+        interval = int(self._settings.value("reconnect_interval", 2000))
+        self._watchdog = QTimer(self)
+        self._watchdog.setInterval(interval)
+        self._watchdog.timeout.connect(self._check_connection)
+        self._reconnector = Reconnector(
+            self.uaclient, interval,
+            int(self._settings.value("reconnect_max_interval", 60000)))
+        self._reconnector.reconnected.connect(self._reconnected)
+        self._reconnector.failed.connect(self._reconnect_failed)
 
         self.ui.addrComboBox.currentTextChanged.connect(self._uri_changed)
         # force update for current value at startup
@@ -248,6 +804,16 @@ class Window(QMainWindow):
         self.ui.treeView.selectionModel().selectionChanged.connect(
             self.on_node_selection)
         self.ui.attrRefreshButton.clicked.connect(self.show_attributes)
+        self.ui.attrLiveCheckBox.toggled.connect(self.update_live_attributes)
+
+        self.ui.treeRefTypeComboBox.activated.connect(
+            self._tree_filter_changed)
+        self.ui.treeSubtypesCheckBox.toggled.connect(
+            self._tree_filter_changed)
+        self.ui.refsRefTypeComboBox.activated.connect(
+            self._refs_filter_changed)
+        self.ui.refsSubtypesCheckBox.toggled.connect(
+            self._refs_filter_changed)
 
         self._restore_states()
 
@@ -303,12 +869,36 @@ class Window(QMainWindow):
     def on_node_selection(self, _: QItemSelection, __: QItemSelection) -> None:
         """Handle a change in the TreeView's selection."""
         self.show_attributes()
+        self.update_live_attributes()
 
     @pyqtSlot(name="show_attributes")
     def show_attributes(self) -> None:
         """Show the attributes for the current Node in the AttributeWidget."""
         self._attrs_ui.show_attributes(self.get_current_node())
 
+    @pyqtSlot(int, name="_type_definitions_loaded")
+    def _type_definitions_loaded(self, count: int) -> None:
+        """Show the current Node again to decode custom structures."""
+        logging.debug("%s custom structures are available", count)
+        if count and self.ui.treeView.currentIndex().isValid():
+            self.show_attributes()
+
+    @pyqtSlot(name="update_live_attributes")
+    def update_live_attributes(self) -> None:
+        """Monitor the current Node's attributes if the view is live."""
+        if self.uaclient.client is None:
+            return
+        node = self.get_current_node()
+        try:
+            if self.ui.attrLiveCheckBox.isChecked() and node:
+                self.uaclient.subscribe_attributes(
+                    node, self._attrs_ui.get_live_attributes(),
+                    self._attr_handler)
+            else:
+                self.uaclient.unsubscribe_attributes()
+        except Exception as ex:
+            self.show_error(ex)
+
     @pyqtSlot(Exception, name="show_error")
     def show_error(self, msg: Exception) -> None:
         """Show an error message in the status bar based on an Exception."""
@@ -320,6 +910,39 @@ class Window(QMainWindow):
         self.ui.statusBar.show()
         QTimer.singleShot(8000, self.ui.statusBar.hide)
 
+    def _load_reference_types(self) -> None:
+        """Offer the ReferenceTypes of the server as filters."""
+        try:
+            tree = self.uaclient.reference_types.get_tree()
+        except Exception as ex:
+            logger.warning("Could not load the ReferenceTypes: %s", ex)
+            tree = [(ua.NodeId(ua.ObjectIds.References), "References", 0)]
+        defaults = [(self.ui.treeRefTypeComboBox,
+                     ua.NodeId(ua.ObjectIds.HierarchicalReferences)),
+                    (self.ui.refsRefTypeComboBox,
+                     ua.NodeId(ua.ObjectIds.References))]
+        for combo, default in defaults:
+            combo.clear()
+            for nodeid, name, depth in tree:
+                combo.addItem("  " * depth + name, nodeid)
+            combo.setCurrentIndex(max(combo.findData(default), 0))
+        self._tree_filter_changed()
+        self._refs_filter_changed()
+
+    def _tree_filter_changed(self) -> None:
+        """Browse the tree with the chosen ReferenceType."""
+        reftype = self.ui.treeRefTypeComboBox.currentData()
+        if reftype is not None:
+            self.tree_ui.set_reference_filter(
+                reftype, self.ui.treeSubtypesCheckBox.isChecked())
+
+    def _refs_filter_changed(self) -> None:
+        """Browse the references with the chosen ReferenceType."""
+        reftype = self.ui.refsRefTypeComboBox.currentData()
+        if reftype is not None:
+            self._refs_ui.set_reference_filter(
+                reftype, self.ui.refsSubtypesCheckBox.isChecked())
+
     def get_current_node(self) -> Optional[Node]:
         """Return the Node currently shown in the TreeWidget"""
         return self.tree_ui.get_current_node()
@@ -334,11 +957,35 @@ class Window(QMainWindow):
             self.show_error(ex)
 
         self._update_address_list(uri)
+        self._reconnector.reset()
+        self._watchdog.start()
+        self._load_reference_types()
         self.tree_ui.set_root_node(self.uaclient.client.nodes.root)
         self.ui.treeView.setFocus()
         # Todo: This doesn't work yet
         # self.load_current_node()
 
+    def _check_connection(self) -> None:
+        """Reconnect if the connection to the server was lost."""
+        if self._reconnector.isRunning() \
+                or not self.uaclient.is_connection_lost():
+            return
+        self._datachange_ui.connection_lost()
+        if self._reconnector.is_due():
+            self._reconnector.start()
+
+    def _reconnected(self, failed) -> None:
+        """Show the subscriptions as live again."""
+        logger.info("Reconnected to %s", self.uaclient.endpoint)
+        self._datachange_ui.reconnected(failed)
+
+    def _reconnect_failed(self, ex: Exception) -> None:
+        """Show the failed attempt and when the next one is made."""
+        self.show_error(ConnectionError(
+            "Could not reconnect to {}, retrying in {:.0f} s: {}".format(
+                self.uaclient.endpoint,
+                self._reconnector.get_delay() / 1000, ex)))
+
     def _update_address_list(self, uri: str) -> None:
         if uri == self._address_list[0]:
             return
@@ -351,6 +998,10 @@ class Window(QMainWindow):
     @pyqtSlot(name="disconnect")
     def disconnect(self) -> None:
         """Disconnect from the server currently connected to."""
+        self._watchdog.stop()
+        # an attempt to reconnect ends with the timeout of the client
+        self._reconnector.wait()
+        self._datachange_ui.save_last_session()
         try:
             self.uaclient.disconnect()
         except Exception as ex:
@@ -362,6 +1013,10 @@ class Window(QMainWindow):
             self._attrs_ui.clear()
             self._datachange_ui.clear()
             self._event_ui.clear()
+            self._compare_ui.clear()
+            self._explorer_ui.clear()
+            self.ui.treeRefTypeComboBox.clear()
+            self.ui.refsRefTypeComboBox.clear()
 
     @pyqtSlot(QCloseEvent, name="closeEvent")
     def closeEvent(self, event: QCloseEvent) -> None:
@@ -410,7 +1065,8 @@ class Window(QMainWindow):
     def call_method(self) -> None:
         """Show the CallMethodDialog."""
         node = self.get_current_node()
-        dia = CallMethodDialog(self, self.uaclient.client, node)
+        dia = CallMethodDialog(self, self.uaclient.client, node,
+                               self.uaclient.data_types)
         dia.show()
 
 
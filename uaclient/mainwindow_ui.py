@@ -31,7 +31,29 @@ class Ui_MainWindow(object):
         self.splitter.setSizePolicy(sizePolicy)
         self.splitter.setOrientation(QtCore.Qt.Horizontal)
         self.splitter.setObjectName("splitter")
-        self.treeView = QtWidgets.QTreeView(self.splitter)
+        self.treeContainer = QtWidgets.QWidget(self.splitter)
+        self.treeContainer.setObjectName("treeContainer")
+        self.treeLayout = QtWidgets.QVBoxLayout(self.treeContainer)
+        self.treeLayout.setContentsMargins(0, 0, 0, 0)
+        self.treeLayout.setSpacing(6)
+        self.treeLayout.setObjectName("treeLayout")
+        self.treeFilterLayout = QtWidgets.QHBoxLayout()
+        self.treeFilterLayout.setSpacing(6)
+        self.treeFilterLayout.setObjectName("treeFilterLayout")
+        self.treeRefTypeComboBox = QtWidgets.QComboBox(self.treeContainer)
+        sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Fixed)
+        sizePolicy.setHorizontalStretch(0)
+        sizePolicy.setVerticalStretch(0)
+        sizePolicy.setHeightForWidth(self.treeRefTypeComboBox.sizePolicy().hasHeightForWidth())
+        self.treeRefTypeComboBox.setSizePolicy(sizePolicy)
+        self.treeRefTypeComboBox.setObjectName("treeRefTypeComboBox")
+        self.treeFilterLayout.addWidget(self.treeRefTypeComboBox)
+        self.treeSubtypesCheckBox = QtWidgets.QCheckBox(self.treeContainer)
+        self.treeSubtypesCheckBox.setChecked(True)
+        self.treeSubtypesCheckBox.setObjectName("treeSubtypesCheckBox")
+        self.treeFilterLayout.addWidget(self.treeSubtypesCheckBox)
+        self.treeLayout.addLayout(self.treeFilterLayout)
+        self.treeView = QtWidgets.QTreeView(self.treeContainer)
         sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Fixed, QtWidgets.QSizePolicy.Expanding)
         sizePolicy.setHorizontalStretch(0)
         sizePolicy.setVerticalStretch(0)
@@ -41,7 +63,9 @@ class Ui_MainWindow(object):
         self.treeView.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
         self.treeView.setDragEnabled(True)
         self.treeView.setDragDropMode(QtWidgets.QAbstractItemView.DragOnly)
+        self.treeView.setSelectionMode(QtWidgets.QAbstractItemView.ExtendedSelection)
         self.treeView.setObjectName("treeView")
+        self.treeLayout.addWidget(self.treeView)
         self.gridLayout_2.addWidget(self.splitter, 0, 0, 1, 1)
         MainWindow.setCentralWidget(self.centralWidget)
         self.menuBar = QtWidgets.QMenuBar(MainWindow)
@@ -83,12 +107,15 @@ class Ui_MainWindow(object):
         self.attrView.setSortingEnabled(True)
         self.attrView.setWordWrap(True)
         self.attrView.setObjectName("attrView")
-        self.gridLayout_4.addWidget(self.attrView, 0, 0, 1, 2)
+        self.gridLayout_4.addWidget(self.attrView, 0, 0, 1, 3)
+        self.attrLiveCheckBox = QtWidgets.QCheckBox(self.dockWidgetContents)
+        self.attrLiveCheckBox.setObjectName("attrLiveCheckBox")
+        self.gridLayout_4.addWidget(self.attrLiveCheckBox, 1, 0, 1, 1)
         spacerItem = QtWidgets.QSpacerItem(40, 20, QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Minimum)
-        self.gridLayout_4.addItem(spacerItem, 1, 0, 1, 1)
+        self.gridLayout_4.addItem(spacerItem, 1, 1, 1, 1)
         self.attrRefreshButton = QtWidgets.QPushButton(self.dockWidgetContents)
         self.attrRefreshButton.setObjectName("attrRefreshButton")
-        self.gridLayout_4.addWidget(self.attrRefreshButton, 1, 1, 1, 1)
+        self.gridLayout_4.addWidget(self.attrRefreshButton, 1, 2, 1, 1)
         self.attrDockWidget.setWidget(self.dockWidgetContents)
         MainWindow.addDockWidget(QtCore.Qt.DockWidgetArea(2), self.attrDockWidget)
         self.addrDockWidget = QtWidgets.QDockWidget(MainWindow)
@@ -153,7 +180,7 @@ class Ui_MainWindow(object):
         self.subView = QtWidgets.QTableView(self.dockWidgetContents_3)
         self.subView.setAcceptDrops(True)
         self.subView.setSizeAdjustPolicy(QtWidgets.QAbstractScrollArea.AdjustToContents)
-        self.subView.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
+        self.subView.setEditTriggers(QtWidgets.QAbstractItemView.DoubleClicked|QtWidgets.QAbstractItemView.EditKeyPressed)
         self.subView.setDragDropOverwriteMode(False)
         self.subView.setDragDropMode(QtWidgets.QAbstractItemView.DropOnly)
         self.subView.setObjectName("subView")
@@ -178,6 +205,22 @@ class Ui_MainWindow(object):
         self.verticalLayout_2.setContentsMargins(11, 11, 11, 11)
         self.verticalLayout_2.setSpacing(6)
         self.verticalLayout_2.setObjectName("verticalLayout_2")
+        self.refsFilterLayout = QtWidgets.QHBoxLayout()
+        self.refsFilterLayout.setSpacing(6)
+        self.refsFilterLayout.setObjectName("refsFilterLayout")
+        self.refsRefTypeComboBox = QtWidgets.QComboBox(self.dockWidgetContents_4)
+        sizePolicy = QtWidgets.QSizePolicy(QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Fixed)
+        sizePolicy.setHorizontalStretch(0)
+        sizePolicy.setVerticalStretch(0)
+        sizePolicy.setHeightForWidth(self.refsRefTypeComboBox.sizePolicy().hasHeightForWidth())
+        self.refsRefTypeComboBox.setSizePolicy(sizePolicy)
+        self.refsRefTypeComboBox.setObjectName("refsRefTypeComboBox")
+        self.refsFilterLayout.addWidget(self.refsRefTypeComboBox)
+        self.refsSubtypesCheckBox = QtWidgets.QCheckBox(self.dockWidgetContents_4)
+        self.refsSubtypesCheckBox.setChecked(True)
+        self.refsSubtypesCheckBox.setObjectName("refsSubtypesCheckBox")
+        self.refsFilterLayout.addWidget(self.refsSubtypesCheckBox)
+        self.verticalLayout_2.addLayout(self.refsFilterLayout)
         self.refView = QtWidgets.QTableView(self.dockWidgetContents_4)
         self.refView.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
         self.refView.setObjectName("refView")
@@ -257,14 +300,101 @@ class Ui_MainWindow(object):
         self.gridLayout_7.addLayout(self.graphLayout, 0, 0, 1, 1)
         self.graphDockWidget.setWidget(self.dockWidgetContents_6)
         MainWindow.addDockWidget(QtCore.Qt.DockWidgetArea(2), self.graphDockWidget)
+        self.compareDockWidget = QtWidgets.QDockWidget(MainWindow)
+        self.compareDockWidget.setObjectName("compareDockWidget")
+        self.dockWidgetContents_8 = QtWidgets.QWidget()
+        self.dockWidgetContents_8.setObjectName("dockWidgetContents_8")
+        self.compareLayout = QtWidgets.QVBoxLayout(self.dockWidgetContents_8)
+        self.compareLayout.setContentsMargins(11, 11, 11, 11)
+        self.compareLayout.setSpacing(6)
+        self.compareLayout.setObjectName("compareLayout")
+        self.horizontalLayout_2 = QtWidgets.QHBoxLayout()
+        self.horizontalLayout_2.setSpacing(6)
+        self.horizontalLayout_2.setObjectName("horizontalLayout_2")
+        self.compareAttrsButton = QtWidgets.QToolButton(self.dockWidgetContents_8)
+        self.compareAttrsButton.setPopupMode(QtWidgets.QToolButton.InstantPopup)
+        self.compareAttrsButton.setObjectName("compareAttrsButton")
+        self.horizontalLayout_2.addWidget(self.compareAttrsButton)
+        spacerItem1 = QtWidgets.QSpacerItem(40, 20, QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Minimum)
+        self.horizontalLayout_2.addItem(spacerItem1)
+        self.compareLiveCheckBox = QtWidgets.QCheckBox(self.dockWidgetContents_8)
+        self.compareLiveCheckBox.setObjectName("compareLiveCheckBox")
+        self.horizontalLayout_2.addWidget(self.compareLiveCheckBox)
+        self.compareRefreshButton = QtWidgets.QPushButton(self.dockWidgetContents_8)
+        self.compareRefreshButton.setObjectName("compareRefreshButton")
+        self.horizontalLayout_2.addWidget(self.compareRefreshButton)
+        self.compareClearButton = QtWidgets.QPushButton(self.dockWidgetContents_8)
+        self.compareClearButton.setObjectName("compareClearButton")
+        self.horizontalLayout_2.addWidget(self.compareClearButton)
+        self.compareLayout.addLayout(self.horizontalLayout_2)
+        self.compareView = QtWidgets.QTableView(self.dockWidgetContents_8)
+        self.compareView.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
+        self.compareView.setSelectionBehavior(QtWidgets.QAbstractItemView.SelectRows)
+        self.compareView.setObjectName("compareView")
+        self.compareLayout.addWidget(self.compareView)
+        self.compareDockWidget.setWidget(self.dockWidgetContents_8)
+        MainWindow.addDockWidget(QtCore.Qt.DockWidgetArea(2), self.compareDockWidget)
+        self.explorerDockWidget = QtWidgets.QDockWidget(MainWindow)
+        self.explorerDockWidget.setObjectName("explorerDockWidget")
+        self.dockWidgetContents_9 = QtWidgets.QWidget()
+        self.dockWidgetContents_9.setObjectName("dockWidgetContents_9")
+        self.explorerLayout = QtWidgets.QVBoxLayout(self.dockWidgetContents_9)
+        self.explorerLayout.setContentsMargins(11, 11, 11, 11)
+        self.explorerLayout.setSpacing(6)
+        self.explorerLayout.setObjectName("explorerLayout")
+        self.horizontalLayout_3 = QtWidgets.QHBoxLayout()
+        self.horizontalLayout_3.setSpacing(6)
+        self.horizontalLayout_3.setObjectName("horizontalLayout_3")
+        self.labelHops = QtWidgets.QLabel(self.dockWidgetContents_9)
+        self.labelHops.setObjectName("labelHops")
+        self.horizontalLayout_3.addWidget(self.labelHops)
+        self.explorerHopsSpinBox = QtWidgets.QSpinBox(self.dockWidgetContents_9)
+        self.explorerHopsSpinBox.setMinimum(1)
+        self.explorerHopsSpinBox.setMaximum(6)
+        self.explorerHopsSpinBox.setProperty("value", 2)
+        self.explorerHopsSpinBox.setObjectName("explorerHopsSpinBox")
+        self.horizontalLayout_3.addWidget(self.explorerHopsSpinBox)
+        self.explorerExpandButton = QtWidgets.QPushButton(self.dockWidgetContents_9)
+        self.explorerExpandButton.setObjectName("explorerExpandButton")
+        self.horizontalLayout_3.addWidget(self.explorerExpandButton)
+        spacerItem2 = QtWidgets.QSpacerItem(40, 20, QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Minimum)
+        self.horizontalLayout_3.addItem(spacerItem2)
+        self.explorerPathButton = QtWidgets.QPushButton(self.dockWidgetContents_9)
+        self.explorerPathButton.setObjectName("explorerPathButton")
+        self.horizontalLayout_3.addWidget(self.explorerPathButton)
+        self.explorerLayout.addLayout(self.horizontalLayout_3)
+        self.explorerView = QtWidgets.QTreeView(self.dockWidgetContents_9)
+        self.explorerView.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
+        self.explorerView.setObjectName("explorerView")
+        self.explorerLayout.addWidget(self.explorerView)
+        self.explorerDockWidget.setWidget(self.dockWidgetContents_9)
+        MainWindow.addDockWidget(QtCore.Qt.DockWidgetArea(2), self.explorerDockWidget)
         self.actionConnect = QtWidgets.QAction(MainWindow)
         self.actionConnect.setObjectName("actionConnect")
         self.actionDisconnect = QtWidgets.QAction(MainWindow)
         self.actionDisconnect.setObjectName("actionDisconnect")
         self.actionSubscribeDataChange = QtWidgets.QAction(MainWindow)
         self.actionSubscribeDataChange.setObjectName("actionSubscribeDataChange")
+        self.actionSubscribeRecursive = QtWidgets.QAction(MainWindow)
+        self.actionSubscribeRecursive.setObjectName("actionSubscribeRecursive")
         self.actionUnsubscribeDataChange = QtWidgets.QAction(MainWindow)
         self.actionUnsubscribeDataChange.setObjectName("actionUnsubscribeDataChange")
+        self.actionUnsubscribeSelected = QtWidgets.QAction(MainWindow)
+        self.actionUnsubscribeSelected.setObjectName("actionUnsubscribeSelected")
+        self.actionUnsubscribeAll = QtWidgets.QAction(MainWindow)
+        self.actionUnsubscribeAll.setObjectName("actionUnsubscribeAll")
+        self.actionSubscriptionGroups = QtWidgets.QAction(MainWindow)
+        self.actionSubscriptionGroups.setObjectName("actionSubscriptionGroups")
+        self.actionLinkTrigger = QtWidgets.QAction(MainWindow)
+        self.actionLinkTrigger.setObjectName("actionLinkTrigger")
+        self.actionUnlinkTrigger = QtWidgets.QAction(MainWindow)
+        self.actionUnlinkTrigger.setObjectName("actionUnlinkTrigger")
+        self.actionSaveWatchList = QtWidgets.QAction(MainWindow)
+        self.actionSaveWatchList.setObjectName("actionSaveWatchList")
+        self.actionLoadWatchList = QtWidgets.QAction(MainWindow)
+        self.actionLoadWatchList.setObjectName("actionLoadWatchList")
+        self.actionRemoveWatchList = QtWidgets.QAction(MainWindow)
+        self.actionRemoveWatchList.setObjectName("actionRemoveWatchList")
         self.actionSubscribeEvent = QtWidgets.QAction(MainWindow)
         self.actionSubscribeEvent.setObjectName("actionSubscribeEvent")
         self.actionUnsubscribeEvents = QtWidgets.QAction(MainWindow)
@@ -277,6 +407,12 @@ class Ui_MainWindow(object):
         self.actionAddToGraph.setObjectName("actionAddToGraph")
         self.actionRemoveFromGraph = QtWidgets.QAction(MainWindow)
         self.actionRemoveFromGraph.setObjectName("actionRemoveFromGraph")
+        self.actionAddToCompare = QtWidgets.QAction(MainWindow)
+        self.actionAddToCompare.setObjectName("actionAddToCompare")
+        self.actionRemoveFromCompare = QtWidgets.QAction(MainWindow)
+        self.actionRemoveFromCompare.setObjectName("actionRemoveFromCompare")
+        self.actionSetPathStart = QtWidgets.QAction(MainWindow)
+        self.actionSetPathStart.setObjectName("actionSetPathStart")
         self.actionCall = QtWidgets.QAction(MainWindow)
         self.actionCall.setObjectName("actionCall")
         self.menuOPC_UA_Client.addAction(self.actionConnect)
@@ -284,7 +420,16 @@ class Ui_MainWindow(object):
         self.menuOPC_UA_Client.addAction(self.actionCopyPath)
         self.menuOPC_UA_Client.addAction(self.actionCopyNodeId)
         self.menuOPC_UA_Client.addAction(self.actionSubscribeDataChange)
+        self.menuOPC_UA_Client.addAction(self.actionSubscribeRecursive)
         self.menuOPC_UA_Client.addAction(self.actionUnsubscribeDataChange)
+        self.menuOPC_UA_Client.addAction(self.actionUnsubscribeSelected)
+        self.menuOPC_UA_Client.addAction(self.actionUnsubscribeAll)
+        self.menuOPC_UA_Client.addAction(self.actionSubscriptionGroups)
+        self.menuOPC_UA_Client.addAction(self.actionLinkTrigger)
+        self.menuOPC_UA_Client.addAction(self.actionUnlinkTrigger)
+        self.menuOPC_UA_Client.addAction(self.actionSaveWatchList)
+        self.menuOPC_UA_Client.addAction(self.actionLoadWatchList)
+        self.menuOPC_UA_Client.addAction(self.actionRemoveWatchList)
         self.menuOPC_UA_Client.addAction(self.actionSubscribeEvent)
         self.menuOPC_UA_Client.addAction(self.actionUnsubscribeEvents)
         self.menuBar.addAction(self.menuOPC_UA_Client.menuAction())
@@ -295,30 +440,68 @@ class Ui_MainWindow(object):
     def retranslateUi(self, MainWindow):
         _translate = QtCore.QCoreApplication.translate
         MainWindow.setWindowTitle(_translate("MainWindow", "FreeOpcUa Client"))
+        self.treeRefTypeComboBox.setToolTip(_translate("MainWindow", "References followed to the children in the tree"))
+        self.treeSubtypesCheckBox.setToolTip(_translate("MainWindow", "Include the subtypes of the reference type"))
+        self.treeSubtypesCheckBox.setText(_translate("MainWindow", "Subtypes"))
         self.menuOPC_UA_Client.setTitle(_translate("MainWindow", "Act&ions"))
         self.attrDockWidget.setWindowTitle(_translate("MainWindow", "&Attributes"))
+        self.attrLiveCheckBox.setToolTip(_translate("MainWindow", "Monitor the attributes of the selected node and update them in place"))
+        self.attrLiveCheckBox.setText(_translate("MainWindow", "Live"))
         self.attrRefreshButton.setText(_translate("MainWindow", "Refresh"))
         self.connectButton.setText(_translate("MainWindow", "Connect"))
         self.disconnectButton.setText(_translate("MainWindow", "Disconnect"))
         self.connectOptionButton.setText(_translate("MainWindow", "Connect options"))
         self.subDockWidget.setWindowTitle(_translate("MainWindow", "S&ubscriptions"))
         self.refDockWidget.setWindowTitle(_translate("MainWindow", "&References"))
+        self.refsRefTypeComboBox.setToolTip(_translate("MainWindow", "References requested from the server"))
+        self.refsSubtypesCheckBox.setToolTip(_translate("MainWindow", "Include the subtypes of the reference type"))
+        self.refsSubtypesCheckBox.setText(_translate("MainWindow", "Subtypes"))
         self.evDockWidget.setWindowTitle(_translate("MainWindow", "&Events"))
         self.graphDockWidget.setWindowTitle(_translate("MainWindow", "&Graph"))
         self.labelNumberOfPoints.setText(_translate("MainWindow", "Number of Points"))
         self.labelIntervall.setText(_translate("MainWindow", "Intervall [s]"))
         self.buttonApply.setText(_translate("MainWindow", "Apply"))
+        self.compareDockWidget.setWindowTitle(_translate("MainWindow", "C&ompare"))
+        self.compareAttrsButton.setText(_translate("MainWindow", "Attributes"))
+        self.compareLiveCheckBox.setToolTip(_translate("MainWindow", "Read the compared attributes periodically"))
+        self.compareLiveCheckBox.setText(_translate("MainWindow", "Live"))
+        self.compareRefreshButton.setText(_translate("MainWindow", "Refresh"))
+        self.compareClearButton.setText(_translate("MainWindow", "Clear"))
+        self.explorerDockWidget.setWindowTitle(_translate("MainWindow", "E&xplorer"))
+        self.labelHops.setText(_translate("MainWindow", "Hops"))
+        self.explorerExpandButton.setToolTip(_translate("MainWindow", "Show the references around the current node"))
+        self.explorerExpandButton.setText(_translate("MainWindow", "Expand"))
+        self.explorerPathButton.setToolTip(_translate("MainWindow", "Find a path from the path start to the current node"))
+        self.explorerPathButton.setText(_translate("MainWindow", "Find Path"))
         self.actionConnect.setText(_translate("MainWindow", "&Connect"))
         self.actionDisconnect.setText(_translate("MainWindow", "&Disconnect"))
         self.actionDisconnect.setToolTip(_translate("MainWindow", "Disconnect from server"))
         self.actionSubscribeDataChange.setText(_translate("MainWindow", "&Subscribe to data change"))
         self.actionSubscribeDataChange.setToolTip(_translate("MainWindow", "Subscribe to data change from selected node"))
+        self.actionSubscribeRecursive.setText(_translate("MainWindow", "Subscribe to &all variables below"))
+        self.actionSubscribeRecursive.setToolTip(_translate("MainWindow", "Subscribe to data change of all variables below the selected nodes"))
         self.actionUnsubscribeDataChange.setText(_translate("MainWindow", "&Unsubscribe to DataChange"))
-        self.actionUnsubscribeDataChange.setToolTip(_translate("MainWindow", "Unsubscribe to DataChange for current node"))
+        self.actionUnsubscribeDataChange.setToolTip(_translate("MainWindow", "Unsubscribe to DataChange for selected nodes"))
+        self.actionUnsubscribeSelected.setText(_translate("MainWindow", "Unsubscribe Selecte&d Rows"))
+        self.actionUnsubscribeSelected.setToolTip(_translate("MainWindow", "Unsubscribe to DataChange for the rows selected in the subscription view"))
+        self.actionUnsubscribeAll.setText(_translate("MainWindow", "Unsubscribe &All"))
+        self.actionUnsubscribeAll.setToolTip(_translate("MainWindow", "Unsubscribe to DataChange for all watched nodes"))
+        self.actionSubscriptionGroups.setText(_translate("MainWindow", "Subscription &Groups..."))
+        self.actionSubscriptionGroups.setToolTip(_translate("MainWindow", "Edit the named subscriptions data changes are grouped into"))
+        self.actionLinkTrigger.setText(_translate("MainWindow", "Lin&k to Trigger..."))
+        self.actionLinkTrigger.setToolTip(_translate("MainWindow", "Report the selected data changes only with a change of a chosen trigger item"))
+        self.actionUnlinkTrigger.setText(_translate("MainWindow", "Unlink &from Trigger"))
+        self.actionUnlinkTrigger.setToolTip(_translate("MainWindow", "Report the selected data changes on their own again"))
+        self.actionSaveWatchList.setText(_translate("MainWindow", "Sa&ve Watch List..."))
+        self.actionSaveWatchList.setToolTip(_translate("MainWindow", "Save the watched nodes as a named watch list of this endpoint"))
+        self.actionLoadWatchList.setText(_translate("MainWindow", "&Load Watch List..."))
+        self.actionLoadWatchList.setToolTip(_translate("MainWindow", "Subscribe to the nodes of a saved watch list"))
+        self.actionRemoveWatchList.setText(_translate("MainWindow", "Re&move Watch List..."))
+        self.actionRemoveWatchList.setToolTip(_translate("MainWindow", "Remove a saved watch list of this endpoint"))
         self.actionSubscribeEvent.setText(_translate("MainWindow", "Subscribe to &events"))
         self.actionSubscribeEvent.setToolTip(_translate("MainWindow", "Subscribe to events from selected node"))
         self.actionUnsubscribeEvents.setText(_translate("MainWindow", "U&nsubscribe to Events"))
-        self.actionUnsubscribeEvents.setToolTip(_translate("MainWindow", "Unsubscribe to Events from current node"))
+        self.actionUnsubscribeEvents.setToolTip(_translate("MainWindow", "Unsubscribe to Events from selected nodes"))
         self.actionCopyPath.setText(_translate("MainWindow", "Copy &Path"))
         self.actionCopyPath.setToolTip(_translate("MainWindow", "Copy path to node to clipboard"))
         self.actionCopyNodeId.setText(_translate("MainWindow", "C&opy NodeId"))
@@ -329,5 +512,13 @@ class Ui_MainWindow(object):
         self.actionRemoveFromGraph.setText(_translate("MainWindow", "Remove from Graph"))
         self.actionRemoveFromGraph.setToolTip(_translate("MainWindow", "Remove this node from the graph"))
         self.actionRemoveFromGraph.setShortcut(_translate("MainWindow", "Ctrl+Shift+G"))
+        self.actionAddToCompare.setText(_translate("MainWindow", "Add to C&ompare"))
+        self.actionAddToCompare.setToolTip(_translate("MainWindow", "Compare the attributes of the selected nodes"))
+        self.actionAddToCompare.setShortcut(_translate("MainWindow", "Ctrl+K"))
+        self.actionRemoveFromCompare.setText(_translate("MainWindow", "Remove from Compare"))
+        self.actionRemoveFromCompare.setToolTip(_translate("MainWindow", "Remove the selected nodes from the comparison"))
+        self.actionRemoveFromCompare.setShortcut(_translate("MainWindow", "Ctrl+Shift+K"))
+        self.actionSetPathStart.setText(_translate("MainWindow", "Set as Path &Start"))
+        self.actionSetPathStart.setToolTip(_translate("MainWindow", "Use this node as start of the paths found in the explorer"))
         self.actionCall.setText(_translate("MainWindow", "Call"))
         self.actionCall.setToolTip(_translate("MainWindow", "Call Ua Method"))
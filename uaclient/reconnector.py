@@ -0,0 +1,64 @@
+"""Background reconnection after the connection to a server was lost."""
+import logging
+import time
+from typing import TYPE_CHECKING
+
+from PyQt5.QtCore import QThread, pyqtSignal
+
+if TYPE_CHECKING:
+    from uaclient.uaclient import UaClient
+
+
+class Reconnector(QThread):
+    """
+    Reconnect a UaClient in the background, so a server that cannot be
+    reached does not block the GUI for the timeout of every attempt.
+
+    Every failed attempt doubles the time until the next one is due, up
+    to max_interval milliseconds. A successful attempt starts over.
+    """
+
+    reconnected = pyqtSignal(object)
+    failed = pyqtSignal(Exception)
+
+    def __init__(self, uaclient: "UaClient", interval: int = 2000,
+                 max_interval: int = 60000) -> None:
+        """Create a new Reconnector for the given UaClient."""
+        super(Reconnector, self).__init__()
+        self._uaclient = uaclient
+        self.interval = interval
+        self.max_interval = max_interval
+        self._failures = 0
+        # monotonic time the next attempt is due at
+        self._next_attempt = 0.0
+
+    def is_due(self) -> bool:
+        """Return if no attempt is running and the next one is due."""
+        return not self.isRunning() \
+            and time.monotonic() >= self._next_attempt
+
+    def get_delay(self) -> int:
+        """Return the milliseconds to wait after the failed attempts."""
+        if not self._failures:
+            return 0
+        return min(self.interval * 2 ** (self._failures - 1),
+                   self.max_interval)
+
+    def reset(self) -> None:
+        """Forget the failed attempts."""
+        self._failures = 0
+        self._next_attempt = 0.0
+
+    def run(self) -> None:
+        """Make one attempt to reconnect."""
+        try:
+            failed = self._uaclient.reconnect()
+        except Exception as ex:
+            self._failures += 1
+            self._next_attempt = time.monotonic() + self.get_delay() / 1000
+            logging.warning("Could not reconnect, retrying in %s ms: %s",
+                            self.get_delay(), ex)
+            self.failed.emit(ex)
+        else:
+            self.reset()
+            self.reconnected.emit(failed)
@@ -0,0 +1,527 @@
+"""Headless recording of data changes to columnar files."""
+import argparse
+import json
+import logging
+import os
+import queue
+import struct
+import sys
+import threading
+import time
+from array import array
+from datetime import datetime, timedelta
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+from asyncua.sync import ua
+from asyncua.ua import NodeId
+
+from uaclient.handler import DataChangeHandler
+from uaclient.uaclient import UaClient
+from uaclient.subscription_groups import SubscriptionGroup, DEFAULT_GROUP
+from uaclient.variable_crawler import VariableCrawler
+
+use_parquet = True
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    use_parquet = False
+
+logger = logging.getLogger(__name__)
+
+# magic bytes starting a file of the built-in format
+MAGIC = b"UAREC\x02"
+# marks every chunk of the built-in format
+CHUNK_MAGIC = b"CHNK"
+# stored for missing timestamps
+NO_TIMESTAMP = -2 ** 63
+
+EPOCH = datetime(1970, 1, 1)
+
+# kinds of recorded values, telling the column holding them
+KIND_NULL = 0
+KIND_DOUBLE = 1
+KIND_INTEGER = 2
+# UInt64 values above the range of Int64, stored wrapped around
+KIND_UNSIGNED = 3
+KIND_BOOLEAN = 4
+KIND_TEXT = 5
+
+INT64_MIN = -2 ** 63
+INT64_MAX = 2 ** 63 - 1
+
+# a recorded notification: NodeId, source and server timestamp, StatusCode
+# and value
+Record = Tuple[str, Optional[datetime], Optional[datetime], int, Any]
+
+
+class Columns:
+    """
+    A batch of notifications stored column by column.
+
+    The kind of every value tells the column holding it: floats are kept
+    as doubles, integers and booleans as 64-bit integers and all other
+    values as text. The columns not holding the value are zero or empty,
+    Null values are in none of them.
+    """
+
+    def __init__(self) -> None:
+        self.nodes = array("I")
+        self.source_timestamps = array("q")
+        self.server_timestamps = array("q")
+        self.status_codes = array("I")
+        self.kinds = array("B")
+        self.numbers = array("d")
+        self.integers = array("q")
+        self.texts: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def append(self, node: int, value: ua.DataValue) -> None:
+        """Add the notification of the node with the given index."""
+        self.nodes.append(node)
+        self.source_timestamps.append(_to_microseconds(value.SourceTimestamp))
+        self.server_timestamps.append(_to_microseconds(value.ServerTimestamp))
+        self.status_codes.append(
+            value.StatusCode.value if value.StatusCode is not None else 0)
+        val = value.Value.Value if value.Value is not None else None
+        number = 0.0
+        integer = 0
+        text = ""
+        if val is None:
+            kind = KIND_NULL
+        elif isinstance(val, bool):
+            kind = KIND_BOOLEAN
+            integer = int(val)
+        elif isinstance(val, int) and INT64_MIN <= val <= INT64_MAX:
+            kind = KIND_INTEGER
+            integer = val
+        elif isinstance(val, int) and INT64_MAX < val < 2 ** 64:
+            kind = KIND_UNSIGNED
+            integer = val - 2 ** 64
+        elif isinstance(val, float):
+            kind = KIND_DOUBLE
+            number = val
+        else:
+            kind = KIND_TEXT
+            text = str(val)
+        self.kinds.append(kind)
+        self.numbers.append(number)
+        self.integers.append(integer)
+        self.texts.append(text)
+
+
+def _get_value(kind: int, number: float, integer: int, text: str) -> Any:
+    """Return a recorded value from its kind and columns."""
+    if kind == KIND_DOUBLE:
+        return number
+    if kind == KIND_INTEGER:
+        return integer
+    if kind == KIND_UNSIGNED:
+        return integer + 2 ** 64
+    if kind == KIND_BOOLEAN:
+        return bool(integer)
+    if kind == KIND_TEXT:
+        return text
+    return None
+
+
+def _to_microseconds(timestamp: Optional[datetime]) -> int:
+    """Return a timestamp as microseconds since the epoch."""
+    if timestamp is None:
+        return NO_TIMESTAMP
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.replace(tzinfo=None) - timestamp.utcoffset()
+    return (timestamp - EPOCH) // timedelta(microseconds=1)
+
+
+def _from_microseconds(microseconds: int) -> Optional[datetime]:
+    """Return the timestamp of microseconds since the epoch."""
+    if microseconds == NO_TIMESTAMP:
+        return None
+    return EPOCH + timedelta(microseconds=microseconds)
+
+
+class BinaryRecordWriter:
+    """
+    Write batches in the built-in chunked, columnar layout.
+
+    The file starts with MAGIC and a JSON header listing the recorded
+    NodeIds. Every batch becomes a chunk of CHUNK_MAGIC, the number of
+    rows and the length of the texts, followed by the columns as little
+    endian arrays: node indexes, source and server timestamps in
+    microseconds, StatusCodes, value kinds, doubles, 64-bit integers, the
+    end offsets of the texts and the UTF-8 encoded texts.
+    """
+
+    extension = ".uarec"
+
+    def __init__(self, path: str, nodeids: List[str]) -> None:
+        """Create the file and write its header."""
+        self.path = path
+        self._file: BinaryIO = open(path, "wb")
+        header = json.dumps({"nodes": nodeids,
+                             "created": datetime.utcnow().isoformat()})
+        data = header.encode("utf-8")
+        self._file.write(MAGIC + struct.pack("<I", len(data)) + data)
+
+    def write(self, columns: Columns) -> None:
+        """Append a batch as a chunk."""
+        encoded = [text.encode("utf-8") for text in columns.texts]
+        texts = b"".join(encoded)
+        offsets = array("I")
+        end = 0
+        for text in encoded:
+            end += len(text)
+            offsets.append(end)
+        self._file.write(CHUNK_MAGIC + struct.pack("<II", len(columns),
+                                                   len(texts)))
+        for column in (columns.nodes, columns.source_timestamps,
+                       columns.server_timestamps, columns.status_codes,
+                       columns.kinds, columns.numbers, columns.integers,
+                       offsets):
+            if sys.byteorder == "big":
+                column = array(column.typecode, column)
+                column.byteswap()
+            self._file.write(column.tobytes())
+        self._file.write(texts)
+        self._file.flush()
+
+    def tell(self) -> int:
+        """Return the size of the file written so far."""
+        return self._file.tell()
+
+    def close(self) -> None:
+        """Close the file."""
+        self._file.close()
+
+
+class ParquetRecordWriter:
+    """
+    Write batches as row groups of a Parquet file using pyarrow.
+
+    Every value is stored in the number, integer or text column named by
+    its kind, the other columns are null.
+    """
+
+    extension = ".parquet"
+
+    def __init__(self, path: str, nodeids: List[str]) -> None:
+        """Create the file."""
+        if not use_parquet:
+            raise ValueError("pyarrow is not installed, Parquet files "
+                             "cannot be written")
+        self.path = path
+        self._nodeids = pyarrow.array(nodeids, pyarrow.string())
+        self._schema = pyarrow.schema([
+            ("nodeid", pyarrow.dictionary(pyarrow.uint32(),
+                                          pyarrow.string())),
+            ("source_timestamp", pyarrow.timestamp("us")),
+            ("server_timestamp", pyarrow.timestamp("us")),
+            ("status_code", pyarrow.uint32()),
+            ("kind", pyarrow.uint8()),
+            ("number", pyarrow.float64()),
+            ("integer", pyarrow.int64()),
+            ("text", pyarrow.string())])
+        self._writer = pyarrow.parquet.ParquetWriter(path, self._schema)
+
+    def write(self, columns: Columns) -> None:
+        """Append a batch as a row group."""
+        def timestamps(column: array) -> Any:
+            return pyarrow.array(
+                [None if value == NO_TIMESTAMP else value
+                 for value in column], pyarrow.timestamp("us"))
+
+        def values(column: Any, kinds: Tuple[int, ...], type_: Any) -> Any:
+            return pyarrow.array(
+                [value if kind in kinds else None
+                 for kind, value in zip(columns.kinds, column)], type_)
+
+        table = pyarrow.Table.from_arrays([
+            pyarrow.DictionaryArray.from_arrays(
+                pyarrow.array(columns.nodes, pyarrow.uint32()),
+                self._nodeids),
+            timestamps(columns.source_timestamps),
+            timestamps(columns.server_timestamps),
+            pyarrow.array(columns.status_codes, pyarrow.uint32()),
+            pyarrow.array(columns.kinds, pyarrow.uint8()),
+            values(columns.numbers, (KIND_DOUBLE,), pyarrow.float64()),
+            values(columns.integers,
+                   (KIND_INTEGER, KIND_UNSIGNED, KIND_BOOLEAN),
+                   pyarrow.int64()),
+            values(columns.texts, (KIND_TEXT,), pyarrow.string())],
+            schema=self._schema)
+        self._writer.write_table(table)
+
+    def tell(self) -> int:
+        """Return the size of the file written so far."""
+        return os.path.getsize(self.path)
+
+    def close(self) -> None:
+        """Close the file."""
+        self._writer.close()
+
+
+WRITERS = {"binary": BinaryRecordWriter, "parquet": ParquetRecordWriter}
+
+
+def read_recording(path: str) -> Iterator[Record]:
+    """Return the notifications of a file of the built-in format."""
+    with open(path, "rb") as file:
+        if file.read(len(MAGIC)) != MAGIC:
+            raise ValueError("{} is not a recording".format(path))
+        length, = struct.unpack("<I", file.read(4))
+        nodeids = json.loads(file.read(length).decode("utf-8"))["nodes"]
+        while True:
+            magic = file.read(len(CHUNK_MAGIC))
+            if not magic:
+                return
+            if magic != CHUNK_MAGIC:
+                raise ValueError("Corrupt chunk in {}".format(path))
+            rows, text_length = struct.unpack("<II", file.read(8))
+            columns = []
+            for typecode in "IqqIBdqI":
+                column = array(typecode)
+                column.frombytes(file.read(rows * column.itemsize))
+                if sys.byteorder == "big":
+                    column.byteswap()
+                columns.append(column)
+            nodes, sources, servers, status_codes, kinds, numbers, \
+                integers, offsets = columns
+            texts = file.read(text_length)
+            start = 0
+            for row in range(rows):
+                end = offsets[row]
+                text = texts[start:end].decode("utf-8") \
+                    if kinds[row] == KIND_TEXT else ""
+                start = end
+                yield (nodeids[nodes[row]], _from_microseconds(sources[row]),
+                       _from_microseconds(servers[row]), status_codes[row],
+                       _get_value(kinds[row], numbers[row], integers[row],
+                                  text))
+
+
+class RecordingHandler(DataChangeHandler):
+    """
+    Queue every notification for the writer thread instead of keeping
+    the latest value. Notifications arriving while the queue is full are
+    dropped and counted, so memory stays bounded and the client thread
+    never blocks.
+    """
+
+    def __init__(self, max_queue: int) -> None:
+        DataChangeHandler.__init__(self)
+        self.queue: "queue.Queue[Optional[Tuple[int, ua.DataValue]]]" = \
+            queue.Queue(max_queue)
+        # maps the recorded NodeIds to their index in the files
+        self.indexes: Dict[NodeId, int] = {}
+        self.dropped = 0
+
+    def datachange_notification(self, node, val, data):
+        try:
+            self.queue.put_nowait((self.indexes[node.nodeid],
+                                   data.monitored_item.Value))
+        except queue.Full:
+            self.dropped += 1
+        else:
+            self.notifications += 1
+
+
+class Recorder:
+    """
+    Record the data changes of nodes with a dedicated writer thread.
+
+    The writer collects notifications into batches of at most batch_size
+    rows or flush_interval seconds and appends each batch as one chunk.
+    A new file is started once a file exceeds rotate_bytes or is older
+    than rotate_seconds.
+    """
+
+    def __init__(self, uaclient: UaClient, directory: str,
+                 file_format: str = "binary", prefix: str = "recording",
+                 batch_size: int = 10000, flush_interval: float = 1.0,
+                 max_queue: int = 100000,
+                 rotate_bytes: int = 256 * 1024 * 1024,
+                 rotate_seconds: float = 3600) -> None:
+        """Create a new Recorder writing into directory."""
+        if file_format not in WRITERS:
+            raise ValueError("Unknown file format {}".format(file_format))
+        if file_format == "parquet" and not use_parquet:
+            raise ValueError("pyarrow is not installed, Parquet files "
+                             "cannot be written")
+        self._uaclient = uaclient
+        self.directory = directory
+        self.file_format = file_format
+        self.prefix = prefix
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.rotate_bytes = rotate_bytes
+        self.rotate_seconds = rotate_seconds
+        self.handler = RecordingHandler(max_queue)
+        # paths of the files written so far
+        self.files: List[str] = []
+        # number of notifications written
+        self.recorded = 0
+        self._nodeids: List[str] = []
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self, nodeids: List[NodeId], group: str = DEFAULT_GROUP)\
+            -> Dict[NodeId, ua.StatusCode]:
+        """
+        Subscribe to the nodes in bulk and start writing, return the
+        StatusCodes of the nodes the server rejected.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        self._nodeids = [nodeid.to_string() for nodeid in nodeids]
+        self.handler.indexes = {nodeid: idx
+                                for idx, nodeid in enumerate(nodeids)}
+        self._thread = threading.Thread(target=self._run,
+                                        name="RecordWriter", daemon=True)
+        self._thread.start()
+        results = self._uaclient.subscribe_datachanges(
+            [self._uaclient.get_node(nodeid) for nodeid in nodeids],
+            self.handler, group)
+        return {nodeid: result for nodeid, result in results.items()
+                if isinstance(result, ua.StatusCode)}
+
+    def stop(self) -> None:
+        """Write the queued notifications and close the file."""
+        if self._thread is None:
+            return
+        # waits for room, the writer keeps draining the queue
+        self.handler.queue.put(None)
+        self._thread.join()
+        self._thread = None
+
+    def _open(self) -> Any:
+        """Start a new file."""
+        name = "{}-{}-{}{}".format(
+            self.prefix, datetime.utcnow().strftime("%Y%m%d-%H%M%S"),
+            len(self.files), WRITERS[self.file_format].extension)
+        writer = WRITERS[self.file_format](
+            os.path.join(self.directory, name), self._nodeids)
+        self.files.append(writer.path)
+        logger.info("Recording to %s", writer.path)
+        return writer
+
+    def _run(self) -> None:
+        """Write batches until stopped."""
+        writer = None
+        opened = 0.0
+        running = True
+        while running:
+            columns = Columns()
+            deadline = time.monotonic() + self.flush_interval
+            while len(columns) < self.batch_size:
+                timeout = deadline - time.monotonic()
+                try:
+                    item = self.handler.queue.get(timeout=max(timeout, 0))
+                except queue.Empty:
+                    break
+                if item is None:
+                    running = False
+                    break
+                columns.append(*item)
+            if not len(columns):
+                continue
+            try:
+                if writer is not None and (
+                        writer.tell() >= self.rotate_bytes
+                        or time.monotonic() - opened >= self.rotate_seconds):
+                    writer.close()
+                    writer = None
+                if writer is None:
+                    writer = self._open()
+                    opened = time.monotonic()
+                writer.write(columns)
+            except (OSError, ValueError) as ex:
+                logger.error("Could not write %s notifications: %s",
+                             len(columns), ex)
+                continue
+            self.recorded += len(columns)
+        if writer is not None:
+            writer.close()
+
+
+def main() -> None:
+    """Entry point of the headless recorder."""
+    parser = argparse.ArgumentParser(
+        description="Record data changes of an OPC-UA server to files")
+    parser.add_argument("url", help="URL of the server")
+    parser.add_argument("-n", "--node", action="append", default=[],
+                        help="NodeId of a variable to record, may be "
+                             "repeated")
+    parser.add_argument("-b", "--below", action="append", default=[],
+                        help="record all variables below this NodeId, may "
+                             "be repeated")
+    parser.add_argument("-o", "--output", default="recordings",
+                        help="directory of the files (default: %(default)s)")
+    parser.add_argument("-f", "--format", choices=sorted(WRITERS),
+                        default="binary", help="file format "
+                                               "(default: %(default)s)")
+    parser.add_argument("-i", "--interval", type=float, default=100,
+                        help="publishing interval in ms "
+                             "(default: %(default)s)")
+    parser.add_argument("-d", "--duration", type=float, default=0,
+                        help="seconds to record, 0 records until "
+                             "interrupted")
+    parser.add_argument("--rotate-mb", type=float, default=256,
+                        help="start a new file after this many MB "
+                             "(default: %(default)s)")
+    parser.add_argument("--rotate-minutes", type=float, default=60,
+                        help="start a new file after this many minutes "
+                             "(default: %(default)s)")
+    parser.add_argument("--max-queue", type=int, default=100000,
+                        help="notifications kept in memory before dropping "
+                             "(default: %(default)s)")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    logging.getLogger("asyncua").setLevel(logging.WARNING)
+    if not args.node and not args.below:
+        parser.error("choose nodes with --node or --below")
+
+    uaclient = UaClient()
+    try:
+        recorder = Recorder(uaclient, args.output, args.format,
+                            max_queue=args.max_queue,
+                            rotate_bytes=int(args.rotate_mb * 1024 * 1024),
+                            rotate_seconds=args.rotate_minutes * 60)
+    except ValueError as ex:
+        parser.error(str(ex))
+    uaclient.connect(args.url)
+    try:
+        nodeids = [ua.NodeId.from_string(nodeid) for nodeid in args.node]
+        if args.below:
+            crawler = VariableCrawler(uaclient, limit=1000000)
+            nodeids.extend(crawler.crawl(
+                [ua.NodeId.from_string(nodeid) for nodeid in args.below]))
+        nodeids = list(dict.fromkeys(nodeids))
+        # a group of its own, so the GUI settings are left alone
+        uaclient.subscription_groups["Recorder"] = SubscriptionGroup(
+            "Recorder", publishing_interval=args.interval)
+        failed = recorder.start(nodeids, "Recorder")
+        for nodeid, status in failed.items():
+            logger.warning("Could not record %s: %s", nodeid.to_string(),
+                           status.name)
+        logger.info("Recording %s nodes", len(nodeids) - len(failed))
+        start = time.monotonic()
+        try:
+            while not args.duration \
+                    or time.monotonic() - start < args.duration:
+                remaining = args.duration - (time.monotonic() - start)
+                time.sleep(min(10.0, remaining) if args.duration else 10.0)
+                logger.info("%s notifications written, %s dropped",
+                            recorder.recorded, recorder.handler.dropped)
+        except KeyboardInterrupt:
+            pass
+    finally:
+        uaclient.disconnect()
+        recorder.stop()
+    logger.info("%s notifications written to %s files, %s dropped",
+                recorder.recorded, len(recorder.files),
+                recorder.handler.dropped)
+
+
+if __name__ == "__main__":
+    main()
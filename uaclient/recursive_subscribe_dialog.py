@@ -0,0 +1,55 @@
+from PyQt5.QtCore import QSettings
+from PyQt5.QtWidgets import QDialog, QFormLayout, QComboBox, QSpinBox, \
+    QDialogButtonBox
+
+from asyncua.sync import ua
+
+from uaclient.variable_crawler import VariableCrawler
+
+
+class RecursiveSubscribeDialog(QDialog):
+    """Choose which variables below the selected nodes are subscribed."""
+
+    def __init__(self, parent, uaclient):
+        QDialog.__init__(self, parent)
+        self.setWindowTitle("Subscribe to All Variables Below")
+        self.uaclient = uaclient
+
+        layout = QFormLayout(self)
+        self.namespaceComboBox = QComboBox(self)
+        self.namespaceComboBox.addItem("All", None)
+        value = self.uaclient.read_attributes(
+            [ua.NodeId(ua.ObjectIds.Server_NamespaceArray)])[0]
+        namespaces = value.Value.Value if value.StatusCode.is_good() else []
+        for idx, uri in enumerate(namespaces):
+            self.namespaceComboBox.addItem("{}: {}".format(idx, uri), idx)
+        layout.addRow("Namespace", self.namespaceComboBox)
+
+        self.dataTypeComboBox = QComboBox(self)
+        self.dataTypeComboBox.addItem("Any", None)
+        types = self.uaclient.data_types.get_known_types()
+        for nodeid, name in sorted(types.items(), key=lambda item: item[1]):
+            self.dataTypeComboBox.addItem(name, nodeid)
+        layout.addRow("DataType", self.dataTypeComboBox)
+
+        self.limitSpinBox = QSpinBox(self)
+        self.limitSpinBox.setRange(1, 1000000)
+        self.limitSpinBox.setValue(
+            int(QSettings().value("subscribe_recursive_limit", 20000)))
+        layout.addRow("At most", self.limitSpinBox)
+
+        buttons = QDialogButtonBox(
+            QDialogButtonBox.Ok | QDialogButtonBox.Cancel, parent=self)
+        buttons.accepted.connect(self.accept)
+        buttons.rejected.connect(self.reject)
+        layout.addRow(buttons)
+
+    def get_crawler(self):
+        QSettings().setValue("subscribe_recursive_limit",
+                             self.limitSpinBox.value())
+        namespace = self.namespaceComboBox.currentData()
+        data_type = self.dataTypeComboBox.currentData()
+        return VariableCrawler(
+            self.uaclient, limit=self.limitSpinBox.value(),
+            namespaces=None if namespace is None else {namespace},
+            data_types=None if data_type is None else [data_type])
@@ -0,0 +1,119 @@
+"""Local index of the references between the nodes of a server."""
+import logging
+from collections import deque
+from typing import Dict, List, Optional, Set, Tuple, TYPE_CHECKING
+
+from asyncua.sync import ua
+from asyncua.ua import NodeId, ReferenceDescription
+
+if TYPE_CHECKING:
+    from uaclient.uaclient import UaClient
+
+# a reference leaving a node: ReferenceTypeId, IsForward and target NodeId
+Edge = Tuple[NodeId, bool, NodeId]
+
+
+class ReferenceIndex:
+    """
+    Adjacency index of all references seen in Browse results.
+
+    Every reference is stored for both of its ends, so paths can be
+    searched in memory in both directions. Neighbourhoods are expanded
+    with one multi-node Browse per hop, skipping nodes whose references
+    are already completely known.
+    """
+
+    def __init__(self, uaclient: "UaClient") -> None:
+        """Create a new ReferenceIndex using the given UaClient."""
+        self._uaclient = uaclient
+
+        # maps NodeIds to the references leaving or entering them
+        self._edges: Dict[NodeId, Set[Edge]] = {}
+
+        # NodeIds browsed for all references in both directions
+        self._complete: Set[NodeId] = set()
+
+        # maximum number of nodes reached by a single expand
+        self.max_nodes: int = 10000
+
+    def clear(self) -> None:
+        """Forget all references of the session."""
+        self._edges.clear()
+        self._complete.clear()
+
+    def __len__(self) -> int:
+        """Return the number of indexed nodes."""
+        return len(self._edges)
+
+    def add(self, nodeid: NodeId, refs: List[ReferenceDescription],
+            complete: bool = False) -> None:
+        """Index the references of a node as returned by Browse."""
+        edges = self._edges.setdefault(nodeid, set())
+        for ref in refs:
+            edges.add((ref.ReferenceTypeId, ref.IsForward, ref.NodeId))
+            self._edges.setdefault(ref.NodeId, set()).add(
+                (ref.ReferenceTypeId, not ref.IsForward, nodeid))
+            if ref.DisplayName.Text:
+                self._uaclient.display_names.set_name(ref.NodeId,
+                                                      ref.DisplayName.Text)
+        if complete:
+            self._complete.add(nodeid)
+
+    def get_edges(self, nodeid: NodeId) -> List[Edge]:
+        """Return the known references of a node."""
+        return sorted(self._edges.get(nodeid, ()), key=str)
+
+    def expand(self, nodeids: List[NodeId], hops: int) -> Dict[NodeId, int]:
+        """
+        Browse the nodes reachable within hops references and return
+        them mapped to their distance.
+        """
+        distances = {nodeid: 0 for nodeid in nodeids}
+        frontier = list(nodeids)
+        for hop in range(1, hops + 1):
+            unknown = [nodeid for nodeid in frontier
+                       if nodeid not in self._complete]
+            if unknown:
+                # the UaClient adds the results to this index
+                self._uaclient.browse(unknown, ua.ObjectIds.References,
+                                      ua.BrowseDirection.Both)
+            next_frontier = []
+            for nodeid in frontier:
+                for _, _, target in self._edges.get(nodeid, ()):
+                    if target in distances:
+                        continue
+                    if len(distances) >= self.max_nodes:
+                        logging.warning("Stopped expanding at %s nodes",
+                                        self.max_nodes)
+                        return distances
+                    distances[target] = hop
+                    next_frontier.append(target)
+            frontier = next_frontier
+        return distances
+
+    def find_path(self, source: NodeId, target: NodeId,
+                  reftypes: Optional[Set[NodeId]] = None)\
+            -> Optional[List[Tuple[NodeId, Edge]]]:
+        """
+        Return the shortest known path from source to target as a list of
+        (NodeId, Edge) steps, or None if the index knows no path.
+        """
+        parents: Dict[NodeId, Optional[Tuple[NodeId, Edge]]] = {source: None}
+        queue = deque([source])
+        while queue:
+            nodeid = queue.popleft()
+            if nodeid == target:
+                path = []
+                step = parents[nodeid]
+                while step is not None:
+                    path.append(step)
+                    step = parents[step[0]]
+                path.reverse()
+                return path
+            for edge in self._edges.get(nodeid, ()):
+                if reftypes is not None and edge[0] not in reftypes:
+                    continue
+                if edge[2] not in parents:
+                    parents[edge[2]] = (nodeid, edge)
+                    queue.append(edge[2])
+        return None
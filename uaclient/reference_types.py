@@ -0,0 +1,94 @@
+"""Per session hierarchy of the ReferenceTypes known by the server."""
+import logging
+from typing import Dict, List, Optional, Set, Tuple, TYPE_CHECKING
+
+from asyncua.sync import ua
+from asyncua.ua import NodeId
+
+if TYPE_CHECKING:
+    from uaclient.uaclient import UaClient
+
+
+class ReferenceTypeHierarchy:
+    """
+    Names and subtypes of all ReferenceTypes of the server.
+
+    The hierarchy is loaded once per session with one Browse request per
+    level below References, so the ReferenceTypeId and IncludeSubtypes of
+    later Browse requests can be chosen from it without asking again.
+    """
+
+    def __init__(self, uaclient: "UaClient") -> None:
+        """Create a new ReferenceTypeHierarchy using the given UaClient."""
+        self._uaclient = uaclient
+
+        # maps ReferenceType NodeIds to their BrowseName
+        self._names: Dict[NodeId, str] = {}
+
+        # maps ReferenceType NodeIds to the NodeIds of their direct subtypes
+        self._subtypes: Dict[NodeId, List[NodeId]] = {}
+
+    def clear(self) -> None:
+        """Forget the hierarchy of the session."""
+        self._names.clear()
+        self._subtypes.clear()
+
+    def _load(self) -> None:
+        """Load the hierarchy unless it is already known."""
+        if self._names:
+            return
+        base = NodeId(ua.ObjectIds.References)
+        self._names[base] = "References"
+        self._subtypes[base] = []
+        level = [base]
+        while level:
+            results = self._uaclient.browse(
+                level, ua.ObjectIds.HasSubtype,
+                nodeclass_mask=ua.NodeClass.ReferenceType)
+            next_level = []
+            for parent, refs in zip(level, results):
+                for ref in refs:
+                    if ref.NodeId in self._names:
+                        continue
+                    self._names[ref.NodeId] = ref.BrowseName.Name
+                    self._subtypes[ref.NodeId] = []
+                    self._subtypes[parent].append(ref.NodeId)
+                    next_level.append(ref.NodeId)
+            level = next_level
+        logging.debug("Loaded %s ReferenceTypes", len(self._names))
+
+    def get_name(self, nodeid: NodeId) -> str:
+        """Return the name of a ReferenceType."""
+        self._load()
+        return self._names.get(nodeid) or nodeid.to_string()
+
+    def get_subtypes(self, nodeid: NodeId) -> Set[NodeId]:
+        """Return a ReferenceType and all of its subtypes."""
+        self._load()
+        subtypes = set()
+        stack = [nodeid]
+        while stack:
+            current = stack.pop()
+            if current not in subtypes:
+                subtypes.add(current)
+                stack.extend(self._subtypes.get(current, ()))
+        return subtypes
+
+    def get_tree(self, nodeid: Optional[NodeId] = None)\
+            -> List[Tuple[NodeId, str, int]]:
+        """
+        Return the ReferenceTypes below nodeid, References by default, as
+        (NodeId, name, depth) in depth first order sorted by name.
+        """
+        self._load()
+        if nodeid is None:
+            nodeid = NodeId(ua.ObjectIds.References)
+        tree = []
+        stack = [(nodeid, 0)]
+        while stack:
+            current, depth = stack.pop()
+            tree.append((current, self.get_name(current), depth))
+            children = sorted(self._subtypes.get(current, ()),
+                              key=self.get_name, reverse=True)
+            stack.extend((child, depth + 1) for child in children)
+        return tree
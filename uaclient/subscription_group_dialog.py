@@ -0,0 +1,90 @@
+from PyQt5.QtWidgets import QDialog, QFormLayout, QComboBox, QSpinBox, \
+    QDoubleSpinBox, QDialogButtonBox
+
+from uaclient.subscription_groups import SubscriptionGroup, DEFAULT_GROUP
+
+
+class SubscriptionGroupDialog(QDialog):
+    """Add, change and remove the subscription groups of the UaClient."""
+
+    def __init__(self, parent, uaclient):
+        QDialog.__init__(self, parent)
+        self.setWindowTitle("Subscription Groups")
+        self.parent = parent
+        self.uaclient = uaclient
+
+        layout = QFormLayout(self)
+        self.nameComboBox = QComboBox(self)
+        self.nameComboBox.setEditable(True)
+        self.nameComboBox.currentTextChanged.connect(self._show_group)
+        layout.addRow("Name", self.nameComboBox)
+        self.intervalSpinBox = QDoubleSpinBox(self)
+        self.intervalSpinBox.setRange(0, 3600000)
+        self.intervalSpinBox.setSuffix(" ms")
+        layout.addRow("Publishing Interval", self.intervalSpinBox)
+        self.keepAliveSpinBox = QSpinBox(self)
+        self.keepAliveSpinBox.setRange(1, 2 ** 31 - 1)
+        layout.addRow("Max Keep Alive Count", self.keepAliveSpinBox)
+        self.lifetimeSpinBox = QSpinBox(self)
+        self.lifetimeSpinBox.setRange(3, 2 ** 31 - 1)
+        layout.addRow("Lifetime Count", self.lifetimeSpinBox)
+        self.prioritySpinBox = QSpinBox(self)
+        self.prioritySpinBox.setRange(0, 255)
+        layout.addRow("Priority", self.prioritySpinBox)
+
+        buttons = QDialogButtonBox(self)
+        buttons.addButton(QDialogButtonBox.Save).clicked.connect(self.save)
+        self.removeButton = buttons.addButton("Remove",
+                                              QDialogButtonBox.DestructiveRole)
+        self.removeButton.clicked.connect(self.remove)
+        buttons.addButton(QDialogButtonBox.Close).clicked.connect(self.accept)
+        layout.addRow(buttons)
+
+        self._update_names(DEFAULT_GROUP)
+
+    def _update_names(self, current):
+        self.nameComboBox.blockSignals(True)
+        self.nameComboBox.clear()
+        self.nameComboBox.addItems(sorted(self.uaclient.subscription_groups))
+        self.nameComboBox.blockSignals(False)
+        self.nameComboBox.setCurrentText(current)
+        self._show_group(current)
+
+    def _show_group(self, name):
+        group = self.uaclient.subscription_groups.get(name)
+        if group is None:
+            # a new group starts with the settings of the default group
+            group = self.uaclient.subscription_groups[DEFAULT_GROUP]
+        self.intervalSpinBox.setValue(group.publishing_interval)
+        self.keepAliveSpinBox.setValue(group.keep_alive_count)
+        self.lifetimeSpinBox.setValue(group.lifetime_count)
+        self.prioritySpinBox.setValue(group.priority)
+        self.removeButton.setEnabled(name in self.uaclient.subscription_groups
+                                     and name != DEFAULT_GROUP)
+
+    def get_group(self):
+        return SubscriptionGroup(self.nameComboBox.currentText().strip(),
+                                 self.intervalSpinBox.value(),
+                                 self.keepAliveSpinBox.value(),
+                                 self.lifetimeSpinBox.value(),
+                                 self.prioritySpinBox.value())
+
+    def save(self):
+        group = self.get_group()
+        if not group.name:
+            return
+        try:
+            self.uaclient.set_subscription_group(group)
+        except Exception as ex:
+            self.parent.show_error(ex)
+            return
+        self._update_names(group.name)
+
+    def remove(self):
+        try:
+            self.uaclient.remove_subscription_group(
+                self.nameComboBox.currentText())
+        except Exception as ex:
+            self.parent.show_error(ex)
+            return
+        self._update_names(DEFAULT_GROUP)
@@ -0,0 +1,91 @@
+"""Named Subscriptions grouping the monitored items of data changes."""
+import json
+import logging
+from typing import Any, Dict, Optional
+
+from PyQt5.QtCore import QSettings
+
+from asyncua.sync import ua, Subscription
+from asyncua.ua import NodeId
+
+from uaclient.handler import DataChangeHandler
+
+# name of the group used when no other group is chosen
+DEFAULT_GROUP = "Default"
+
+
+class SubscriptionGroup:
+    """
+    A named Subscription with its own publishing parameters.
+
+    The Subscription is created on the server for the first item of the
+    group, the group maps the NodeIds of its items to their handles.
+    """
+
+    def __init__(self, name: str, publishing_interval: float = 500,
+                 keep_alive_count: int = 3000, lifetime_count: int = 10000,
+                 priority: int = 0) -> None:
+        """Create a new SubscriptionGroup without a Subscription."""
+        self.name = name
+        self.publishing_interval = publishing_interval
+        self.keep_alive_count = keep_alive_count
+        self.lifetime_count = lifetime_count
+        self.priority = priority
+
+        # holds the Subscription once the group has items
+        self.subscription: Optional[Subscription] = None
+
+        # receives the notifications of the Subscription
+        self.handler: Optional[DataChangeHandler] = None
+
+        # maps the NodeIds of the monitored items to their handles
+        self.handles: Dict[NodeId, int] = {}
+
+    def __repr__(self) -> str:
+        return "SubscriptionGroup({!r}, {} ms)".format(
+            self.name, self.publishing_interval)
+
+    def reset(self) -> None:
+        """Forget the Subscription of a closed session."""
+        self.subscription = None
+        self.handler = None
+        self.handles.clear()
+
+    def get_parameters(self) -> ua.CreateSubscriptionParameters:
+        """Return the parameters requested for the Subscription."""
+        params = ua.CreateSubscriptionParameters()
+        params.RequestedPublishingInterval = self.publishing_interval
+        params.RequestedLifetimeCount = self.lifetime_count
+        params.RequestedMaxKeepAliveCount = self.keep_alive_count
+        params.MaxNotificationsPerPublish = 10000
+        params.PublishingEnabled = True
+        params.Priority = self.priority
+        return params
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the settings of the group."""
+        return {"name": self.name,
+                "publishing_interval": self.publishing_interval,
+                "keep_alive_count": self.keep_alive_count,
+                "lifetime_count": self.lifetime_count,
+                "priority": self.priority}
+
+
+def load_subscription_groups() -> Dict[str, SubscriptionGroup]:
+    """Load the groups from QSettings, always including the default."""
+    groups = {DEFAULT_GROUP: SubscriptionGroup(DEFAULT_GROUP)}
+    try:
+        settings = json.loads(
+            QSettings().value("subscription_groups", "[]"))
+        for values in settings:
+            group = SubscriptionGroup(**values)
+            groups[group.name] = group
+    except (TypeError, ValueError) as ex:
+        logging.warning("Could not load the subscription groups: %s", ex)
+    return groups
+
+
+def save_subscription_groups(groups: Dict[str, SubscriptionGroup]) -> None:
+    """Save the groups to QSettings."""
+    QSettings().setValue("subscription_groups", json.dumps(
+        [group.to_dict() for group in groups.values()]))
@@ -0,0 +1,551 @@
+"""Table model of the nodes watched by the data change subscription."""
+from copy import copy
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from PyQt5.QtCore import QAbstractTableModel, QModelIndex, Qt, QObject, \
+    QPointF, pyqtSignal
+from PyQt5.QtGui import QBrush, QPainter, QPolygonF
+from PyQt5.QtWidgets import QStyledItemDelegate, QComboBox, QWidget, \
+    QStyleOptionViewItem, QAbstractItemView, QStyle
+
+from asyncua.sync import ua, Node
+from asyncua.ua import NodeId
+
+from uaclient.handler import ItemStatistics
+from uaclient.value_history import HistoryStore
+
+# a buffered data change: node, DataValue, notification count and the
+# statistics of the node
+DataChange = Tuple[Node, ua.DataValue, int, ItemStatistics]
+
+# text shown for a row without data yet
+NO_DATA = "No Data yet"
+
+# role returning the ValueHistory of a row in the HISTORY_COLUMN
+HISTORY_ROLE = Qt.UserRole + 1
+
+
+class SubscriptionModel(QAbstractTableModel):
+    """
+    Hold the latest value of every watched node.
+
+    Rows are looked up by NodeId in constant time and keep the latest
+    DataValue as received. Its texts are only formatted when a view asks
+    for them and cached until the next value arrives, so values of rows
+    that are not visible are never formatted. A batch of data changes is
+    announced by a single dataChanged covering all rows it touched.
+
+    The subscription group and the monitoring parameters of the rows are
+    editable, edited rows are collected until they are taken to be sent
+    to the server together. The statistics columns show the ItemStatistics
+    of the rows, followed by the trigger item a row is linked to and the
+    recent values of a HistoryStore. Rows are greyed out as stale from
+    losing the connection until their next value arrives.
+    """
+
+    # emitted when groups or monitoring parameters were edited
+    parameters_edited = pyqtSignal()
+
+    HEADER_LABELS = ["DisplayName", "Value", "Status", "Source Timestamp",
+                     "Server Timestamp", "Count", "Subscription",
+                     "Sampling Interval", "Queue Size", "Discard Oldest",
+                     "Deadband Type", "Deadband", "Rate (1/s)",
+                     "Source Latency (ms)", "Server Latency (ms)",
+                     "Overflows", "Coalesced", "Triggered By",
+                     "History"]
+    # stable names of the columns, used to save which ones are hidden
+    COLUMN_KEYS = ["display_name", "value", "status", "source_timestamp",
+                   "server_timestamp", "count", "subscription",
+                   "sampling_interval", "queue_size", "discard_oldest",
+                   "deadband_type", "deadband", "rate", "source_latency",
+                   "server_latency", "overflows", "coalesced",
+                   "triggered_by", "history"]
+    COUNT_COLUMN = 5
+    # columns after COUNT_COLUMN show the group and MonitoringParameters
+    GROUP_COLUMN = 6
+    SAMPLING_COLUMN = 7
+    QUEUE_SIZE_COLUMN = 8
+    DISCARD_COLUMN = 9
+    DEADBAND_TYPE_COLUMN = 10
+    DEADBAND_COLUMN = 11
+    # columns from STATISTICS_COLUMN up to TRIGGER_COLUMN, which is not one
+    # of them, show the ItemStatistics
+    STATISTICS_COLUMN = 12
+    # shows the trigger item the row is linked to
+    TRIGGER_COLUMN = 17
+    # painted by a SparklineDelegate from the history of the row
+    HISTORY_COLUMN = 18
+
+    def __init__(self, parent: Optional[QObject] = None,
+                 history: Optional[HistoryStore] = None) -> None:
+        """
+        Create a new, empty SubscriptionModel, the history column stays
+        empty without a HistoryStore.
+        """
+        QAbstractTableModel.__init__(self, parent)
+        self._history = history
+        self._nodes: List[Node] = []
+        self._names: List[str] = []
+        self._values: List[Optional[ua.DataValue]] = []
+        self._counts: List[int] = []
+        # texts of the value, status and timestamps of the rows, None
+        # until they are shown after a new value
+        self._texts: List[Optional[List[str]]] = []
+        self._statistics: List[Optional[ItemStatistics]] = []
+        # if the rows did not receive a value since the connection was lost
+        self._stale: List[bool] = []
+        self._parameters: List[ua.MonitoringParameters] = []
+        # names of the subscription groups of the rows
+        self._groups: List[str] = []
+        # NodeIds of the trigger items the rows are linked to
+        self._triggers: List[Optional[NodeId]] = []
+        # maps the NodeIds of the watched nodes to their row
+        self._rows: Dict[NodeId, int] = {}
+        # NodeIds of the rows with edited parameters not yet taken
+        self._edited: Set[NodeId] = set()
+        # NodeIds of the rows moved to another group not yet taken
+        self._moved: Set[NodeId] = set()
+
+    # pylint: disable=invalid-name
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:  # nopep8
+        """Return the number of watched nodes."""
+        return 0 if parent.isValid() else len(self._nodes)
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:  # nopep8
+        """Return the number of columns."""
+        return 0 if parent.isValid() else len(self.HEADER_LABELS)
+
+    def headerData(self, section: int, orientation: Qt.Orientation,  # nopep8
+                   role: int = Qt.DisplayRole) -> Any:
+        """Return the column labels and the row numbers."""
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return self.HEADER_LABELS[section]
+        return section + 1
+
+    def flags(self, idx: QModelIndex) -> Qt.ItemFlags:
+        """Return the flags of droppable cells, parameters are editable."""
+        flags = Qt.ItemIsEnabled | Qt.ItemIsSelectable | Qt.ItemIsDropEnabled
+        if self.COUNT_COLUMN < idx.column() < self.STATISTICS_COLUMN:
+            flags |= Qt.ItemIsEditable
+        return flags
+
+    def supportedDropActions(self) -> Qt.DropActions:  # nopep8
+        """Accept nodes dropped from the tree."""
+        return Qt.CopyAction | Qt.MoveAction
+
+    def mimeTypes(self) -> List[str]:  # nopep8
+        """Accept the NodeIds dropped as text."""
+        return ["text/plain"]
+
+    def data(self, idx: QModelIndex, role: int = Qt.DisplayRole) -> Any:
+        """Return the text of a cell or the node of a row."""
+        if not idx.isValid():
+            return None
+        if idx.column() == self.GROUP_COLUMN \
+                and role in (Qt.DisplayRole, Qt.EditRole):
+            return self._groups[idx.row()]
+        if idx.column() == self.HISTORY_COLUMN:
+            if role == HISTORY_ROLE and self._history is not None:
+                return self._history.get(self._nodes[idx.row()].nodeid)
+            return None
+        if idx.column() == self.TRIGGER_COLUMN:
+            trigger = self._triggers[idx.row()]
+            if role == Qt.DisplayRole and trigger in self._rows:
+                return self._names[self._rows[trigger]]
+            return None
+        if idx.column() >= self.STATISTICS_COLUMN:
+            if role == Qt.DisplayRole:
+                return self._get_statistic(idx.row(), idx.column())
+            return None
+        if idx.column() > self.COUNT_COLUMN \
+                and role in (Qt.DisplayRole, Qt.EditRole):
+            value = self._get_parameter(self._parameters[idx.row()],
+                                        idx.column())
+            return value if role == Qt.EditRole else str(value)
+        if role == Qt.DisplayRole:
+            row = idx.row()
+            if idx.column() == 0:
+                return self._names[row]
+            if idx.column() == self.COUNT_COLUMN:
+                return str(self._counts[row])
+            return self._get_texts(row)[idx.column() - 1]
+        if role == Qt.UserRole:
+            return self._nodes[idx.row()]
+        if role == Qt.ForegroundRole and self._stale[idx.row()]:
+            return QBrush(Qt.gray)
+        if role == Qt.ToolTipRole and self._stale[idx.row()]:
+            return "No value received since the connection was lost"
+        return None
+
+    def _get_texts(self, row: int) -> List[str]:
+        """Return the cached texts of the value columns of a row."""
+        texts = self._texts[row]
+        if texts is None:
+            value = self._values[row]
+            if value is None:
+                texts = [NO_DATA, "", "", ""]
+            else:
+                texts = [str(value.Value.Value), value.StatusCode.name,
+                         self._timestamp_to_string(value.SourceTimestamp),
+                         self._timestamp_to_string(value.ServerTimestamp)]
+            self._texts[row] = texts
+        return texts
+
+    def _get_statistic(self, row: int, column: int) -> str:
+        """Return the text of a statistics column of a row."""
+        statistics = self._statistics[row]
+        if statistics is None:
+            return ""
+        column -= self.STATISTICS_COLUMN
+        if column == 0:
+            return "{:.1f}".format(statistics.rate)
+        if column in (1, 2):
+            latency = statistics.source_latency if column == 1 \
+                else statistics.server_latency
+            return "" if latency is None else "{:.0f}".format(latency)
+        if column == 3:
+            return str(statistics.overflows)
+        return str(statistics.coalesced)
+
+    def _get_parameter(self, params: ua.MonitoringParameters,
+                       column: int) -> Any:
+        """Return the value of a monitoring parameter column."""
+        if column == self.SAMPLING_COLUMN:
+            return params.SamplingInterval
+        if column == self.QUEUE_SIZE_COLUMN:
+            return params.QueueSize
+        if column == self.DISCARD_COLUMN:
+            return params.DiscardOldest
+        deadband = params.Filter \
+            if isinstance(params.Filter, ua.DataChangeFilter) \
+            else ua.DataChangeFilter()
+        if column == self.DEADBAND_TYPE_COLUMN:
+            return ua.DeadbandType(deadband.DeadbandType).name
+        return deadband.DeadbandValue
+
+    def setData(self, idx: QModelIndex, value: Any,  # nopep8
+                role: int = Qt.EditRole) -> bool:
+        """Edit a monitoring parameter of a row."""
+        if not idx.isValid() or role != Qt.EditRole \
+                or not self.flags(idx) & Qt.ItemIsEditable:
+            return False
+        row = idx.row()
+        if idx.column() == self.GROUP_COLUMN:
+            if not value or value == self._groups[row]:
+                return False
+            self._groups[row] = value
+            self._moved.add(self._nodes[row].nodeid)
+            self.dataChanged.emit(idx, idx)
+            self.parameters_edited.emit()
+            return True
+        params = copy(self._parameters[row])
+        try:
+            self._set_parameter(params, idx.column(), value)
+        except (ValueError, KeyError):
+            return False
+        self._parameters[row] = params
+        self._edited.add(self._nodes[row].nodeid)
+        self.dataChanged.emit(idx, idx)
+        self.parameters_edited.emit()
+        return True
+
+    def _set_parameter(self, params: ua.MonitoringParameters, column: int,
+                       value: Any) -> None:
+        """Set the value of a monitoring parameter column."""
+        if column == self.SAMPLING_COLUMN:
+            params.SamplingInterval = float(value)
+        elif column == self.QUEUE_SIZE_COLUMN:
+            params.QueueSize = max(int(value), 0)
+        elif column == self.DISCARD_COLUMN:
+            params.DiscardOldest = bool(value)
+        else:
+            deadband = copy(params.Filter) \
+                if isinstance(params.Filter, ua.DataChangeFilter) \
+                else ua.DataChangeFilter()
+            deadband.Trigger = ua.DataChangeTrigger.StatusValue
+            if column == self.DEADBAND_TYPE_COLUMN:
+                deadband.DeadbandType = ua.DeadbandType[value]
+            else:
+                deadband.DeadbandValue = float(value)
+            params.Filter = deadband
+
+    def take_edited(self) -> Dict[NodeId, ua.MonitoringParameters]:
+        """Return the parameters of the edited rows and forget the edits."""
+        edited = {nodeid: self._parameters[self._rows[nodeid]]
+                  for nodeid in self._edited if nodeid in self._rows}
+        self._edited.clear()
+        return edited
+
+    def take_moved(self) -> Dict[NodeId, str]:
+        """Return the groups of the moved rows and forget the moves."""
+        moved = {nodeid: self._groups[self._rows[nodeid]]
+                 for nodeid in self._moved if nodeid in self._rows}
+        self._moved.clear()
+        return moved
+
+    def get_value(self, nodeid: NodeId) -> Optional[ua.DataValue]:
+        """Return the latest DataValue of a node, None without data."""
+        return self._values[self._rows[nodeid]]
+
+    def get_parameters(self, nodeid: NodeId) -> ua.MonitoringParameters:
+        """Return the monitoring parameters of a node."""
+        return self._parameters[self._rows[nodeid]]
+
+    def set_parameters(self, nodeid: NodeId,
+                       params: ua.MonitoringParameters) -> None:
+        """Show the parameters a node was subscribed with again."""
+        row = self._rows.get(nodeid)
+        if row is None:
+            return
+        self._parameters[row] = params
+        self.dataChanged.emit(self.index(row, self.SAMPLING_COLUMN),
+                              self.index(row, self.DEADBAND_COLUMN))
+
+    def set_group(self, nodeid: NodeId, group: str) -> None:
+        """Show the group a node is subscribed in."""
+        row = self._rows[nodeid]
+        self._groups[row] = group
+        idx = self.index(row, self.GROUP_COLUMN)
+        self.dataChanged.emit(idx, idx)
+
+    def set_revised(self, nodeid: NodeId,
+                    result: ua.MonitoredItemModifyResult) -> None:
+        """Show the parameters as revised by the server."""
+        row = self._rows.get(nodeid)
+        if row is None:
+            return
+        params = copy(self._parameters[row])
+        params.SamplingInterval = result.RevisedSamplingInterval
+        params.QueueSize = result.RevisedQueueSize
+        self._parameters[row] = params
+        self.dataChanged.emit(self.index(row, self.SAMPLING_COLUMN),
+                              self.index(row, self.QUEUE_SIZE_COLUMN))
+
+    def get_trigger(self, nodeid: NodeId) -> Optional[NodeId]:
+        """Return the trigger item a node is linked to, if any."""
+        return self._triggers[self._rows[nodeid]]
+
+    def set_triggers(self, triggers: Dict[NodeId, Optional[NodeId]]) -> None:
+        """Show the trigger items nodes are linked to."""
+        rows = []
+        for nodeid, trigger in triggers.items():
+            row = self._rows.get(nodeid)
+            if row is not None:
+                self._triggers[row] = trigger
+                rows.append(row)
+        if rows:
+            self.dataChanged.emit(
+                self.index(min(rows), self.TRIGGER_COLUMN),
+                self.index(max(rows), self.TRIGGER_COLUMN))
+
+    def clear(self) -> None:
+        """Remove all nodes."""
+        self.beginResetModel()
+        self._nodes = []
+        self._names = []
+        self._values = []
+        self._counts = []
+        self._texts = []
+        self._statistics = []
+        self._stale = []
+        self._parameters = []
+        self._groups = []
+        self._triggers = []
+        self._rows.clear()
+        self._edited.clear()
+        self._moved.clear()
+        self.endResetModel()
+
+    def has_node(self, nodeid: NodeId) -> bool:
+        """Return if the node is watched."""
+        return nodeid in self._rows
+
+    def get_node(self, row: int) -> Node:
+        """Return the node shown in a row."""
+        return self._nodes[row]
+
+    def get_rows(self)\
+            -> List[Tuple[Node, str, str, ua.MonitoringParameters]]:
+        """Return the node, name, group and parameters of every row."""
+        return list(zip(self._nodes, self._names, self._groups,
+                        self._parameters))
+
+    def add_node(self, node: Node, name: str,
+                 parameters: ua.MonitoringParameters, group: str) -> None:
+        """Append a row for a node without data yet."""
+        self.add_nodes([node], [name], parameters, group)
+
+    def add_nodes(self, nodes: List[Node], names: List[str],
+                  parameters: ua.MonitoringParameters, group: str) -> None:
+        """Append rows for nodes without data yet in one insertion."""
+        if not nodes:
+            return
+        first = len(self._nodes)
+        self.beginInsertRows(QModelIndex(), first, first + len(nodes) - 1)
+        for row, (node, name) in enumerate(zip(nodes, names), first):
+            self._rows[node.nodeid] = row
+            self._nodes.append(node)
+            self._names.append(name)
+            self._values.append(None)
+            self._counts.append(0)
+            self._texts.append(None)
+            self._statistics.append(None)
+            self._stale.append(False)
+            # edits replace the parameters, so the rows can share them
+            self._parameters.append(parameters)
+            self._groups.append(group)
+            self._triggers.append(None)
+        self.endInsertRows()
+
+    def remove_node(self, nodeid: NodeId) -> None:
+        """Remove the row of a node."""
+        self.remove_nodes([nodeid])
+
+    def remove_nodes(self, nodeids: List[NodeId]) -> None:
+        """
+        Remove the rows of nodes, every contiguous range of rows with a
+        single removal. The row index is rebuilt once afterwards.
+        """
+        rows = sorted(self._rows.pop(nodeid) for nodeid in set(nodeids)
+                      if nodeid in self._rows)
+        if not rows:
+            return
+        if len(rows) == len(self._nodes):
+            self.clear()
+            return
+        ranges = []
+        for row in rows:
+            if ranges and ranges[-1][1] == row - 1:
+                ranges[-1][1] = row
+            else:
+                ranges.append([row, row])
+        # removing from the bottom keeps the ranges above valid
+        for first, last in reversed(ranges):
+            self.beginRemoveRows(QModelIndex(), first, last)
+            for column in (self._nodes, self._names, self._values,
+                           self._counts, self._texts, self._statistics,
+                           self._stale, self._parameters, self._groups,
+                           self._triggers):
+                del column[first:last + 1]
+            self.endRemoveRows()
+        self._rows = {node.nodeid: row
+                      for row, node in enumerate(self._nodes)}
+        removed = set(nodeids)
+        self._edited -= removed
+        self._moved -= removed
+        # the links to removed trigger items are gone with them
+        self.set_triggers({self._nodes[row].nodeid: None
+                           for row, trigger in enumerate(self._triggers)
+                           if trigger in removed})
+
+    def update(self, changes: List[DataChange]) -> None:
+        """Show a batch of data changes with one dataChanged signal."""
+        first = len(self._nodes)
+        last = -1
+        for node, value, count, statistics in changes:
+            row = self._rows.get(node.nodeid)
+            if row is None:
+                # notification arrived after unsubscribing
+                continue
+            self._values[row] = value
+            self._texts[row] = None
+            self._counts[row] += count
+            self._statistics[row] = statistics
+            self._stale[row] = False
+            first = min(first, row)
+            last = max(last, row)
+        if last >= 0:
+            self.dataChanged.emit(self.index(first, 0),
+                                  self.index(last, self.columnCount() - 1),
+                                  [Qt.DisplayRole, Qt.ForegroundRole,
+                                   Qt.ToolTipRole])
+
+    def set_stale(self) -> None:
+        """Mark all rows as stale until their next value arrives."""
+        if not self._nodes:
+            return
+        self._stale = [True] * len(self._nodes)
+        self.dataChanged.emit(self.index(0, 0),
+                              self.index(len(self._nodes) - 1,
+                                         self.columnCount() - 1),
+                              [Qt.ForegroundRole, Qt.ToolTipRole])
+
+    def get_stale_count(self) -> int:
+        """Return the number of stale rows."""
+        return sum(self._stale)
+
+    @staticmethod
+    def _timestamp_to_string(timestamp: Any) -> str:
+        """Return the text shown for an optional timestamp."""
+        return "" if timestamp is None else timestamp.isoformat()
+
+
+class SparklineDelegate(QStyledItemDelegate):
+    """
+    Paint the recent values of a row as a line, scaled to the range of
+    the values held in its history.
+    """
+
+    def paint(self, painter: QPainter, option: QStyleOptionViewItem,
+              idx: QModelIndex) -> None:
+        """Paint the background and the line of the values."""
+        QStyledItemDelegate.paint(self, painter, option, idx)
+        history = idx.data(HISTORY_ROLE)
+        if history is None or history.count < 2:
+            return
+        rect = option.rect.adjusted(2, 2, -2, -2)
+        xs, ys = history.scale(rect.width(), rect.height())
+        line = QPolygonF([QPointF(rect.left() + x, rect.top() + y)
+                          for x, y in zip(xs.tolist(), ys.tolist())])
+        painter.save()
+        painter.setRenderHint(QPainter.Antialiasing)
+        selected = option.state & QStyle.State_Selected
+        palette = option.palette if option.widget is None \
+            else option.widget.palette()
+        painter.setPen(palette.highlightedText().color() if selected
+                       else palette.text().color())
+        painter.drawPolyline(line)
+        painter.restore()
+
+
+class MonitoringDelegate(QStyledItemDelegate):
+    """
+    Edit the monitoring parameters of all selected rows at once, so they
+    are modified on the server with a single request.
+    """
+
+    def __init__(self, view: QAbstractItemView,
+                 get_groups: Callable[[], List[str]]) -> None:
+        """
+        Create a new MonitoringDelegate for the given view, get_groups
+        returns the names of the subscription groups to choose from.
+        """
+        QStyledItemDelegate.__init__(self, view)
+        self._view = view
+        self._get_groups = get_groups
+
+    def createEditor(self, parent: QWidget,  # nopep8
+                     option: QStyleOptionViewItem, idx: QModelIndex)\
+            -> QWidget:
+        """Offer the groups and DeadbandTypes in a combo box."""
+        if idx.column() == SubscriptionModel.GROUP_COLUMN:
+            editor = QComboBox(parent)
+            editor.addItems(self._get_groups())
+            return editor
+        if idx.column() == SubscriptionModel.DEADBAND_TYPE_COLUMN:
+            editor = QComboBox(parent)
+            editor.addItems([member.name for member in ua.DeadbandType])
+            return editor
+        return QStyledItemDelegate.createEditor(self, parent, option, idx)
+
+    def setModelData(self, editor: QWidget,  # nopep8
+                     model: QAbstractTableModel, idx: QModelIndex) -> None:
+        """Set the edited value for every selected row."""
+        QStyledItemDelegate.setModelData(self, editor, model, idx)
+        value = idx.data(Qt.EditRole)
+        for selected in self._view.selectionModel().selectedIndexes():
+            if selected.column() == idx.column() \
+                    and selected.row() != idx.row():
+                model.setData(selected, value)
@@ -0,0 +1,222 @@
+"""Background loading and disk caching of custom structure definitions."""
+import hashlib
+import logging
+import os
+from typing import Dict, List, Optional, TYPE_CHECKING
+
+from PyQt5.QtCore import QThread, QStandardPaths, pyqtSignal
+
+from asyncua.sync import ua
+from asyncua.common.structures import StructGenerator, Struct, EnumType
+
+if TYPE_CHECKING:
+    from uaclient.uaclient import UaClient
+
+
+CODE_HEADER = """'''
+THIS FILE IS AUTOGENERATED FROM THE TYPE DICTIONARIES OF A SERVER
+'''
+
+from datetime import datetime
+from enum import IntEnum
+import uuid
+
+from asyncua import ua
+"""
+
+# properties identifying the contents of a DataTypeDictionary
+DICTIONARY_PROPERTIES = ["NamespaceUri", "DictionaryVersion"]
+
+
+class TypeDefinitionLoader(QThread):
+    """
+    Load the custom structure definitions of a server in the background.
+
+    The generated classes are cached on disk per endpoint, namespaces and
+    versions of the DataTypeDictionaries, so that later connections only
+    need to read a few properties to register them again. Loading from
+    the server is interrupted between dictionaries when the loader is
+    stopped. The cached code is only executed if it matches the hash
+    stored next to it.
+    """
+
+    loaded = pyqtSignal(int)
+    failed = pyqtSignal(Exception)
+
+    def __init__(self, uaclient: "UaClient") -> None:
+        """Create a new TypeDefinitionLoader for the given UaClient."""
+        super(TypeDefinitionLoader, self).__init__()
+        self._uaclient = uaclient
+        self._uri: Optional[str] = None
+        self.cache_dir = self.get_cache_dir()
+
+    def load(self, uri: str) -> None:
+        """Start loading the definitions of the server at uri."""
+        self.stop()
+        self._uri = uri
+        self.start()
+
+    def stop(self) -> None:
+        """Interrupt a running load and wait for it to end."""
+        if self.isRunning():
+            self.requestInterruption()
+            self.wait()
+
+    @staticmethod
+    def get_cache_dir() -> str:
+        """Return the directory holding the cached definitions."""
+        location = QStandardPaths.writableLocation(
+            QStandardPaths.CacheLocation)
+        return os.path.join(location, "type_definitions")
+
+    def run(self) -> None:
+        """Load the definitions from the cache or from the server."""
+        try:
+            nodeids = self._get_dictionaries()
+            path = os.path.join(self.cache_dir,
+                                self._get_cache_key(nodeids) + ".py")
+            if self.isInterruptionRequested():
+                return
+            count = self._load_cached(path)
+            if count is None:
+                count = self._load_from_server(nodeids, path)
+                if count is None:
+                    return
+        except Exception as ex:
+            logging.warning("Could not load type definitions: %s", ex)
+            self.failed.emit(ex)
+        else:
+            logging.info("Loaded %s type definitions", count)
+            self.loaded.emit(count)
+
+    def _get_dictionaries(self) -> List[ua.NodeId]:
+        """Return the DataTypeDictionaries except the standard one."""
+        # browsed without indexing, the index belongs to the GUI thread
+        references = self._uaclient.browse(
+            [ua.NodeId(ua.ObjectIds.OPCBinarySchema_TypeSystem)],
+            index=False)[0]
+        return [ref.NodeId for ref in references
+                if ref.BrowseName != ua.QualifiedName("Opc.Ua")]
+
+    def _get_cache_key(self, nodeids: List[ua.NodeId]) -> str:
+        """
+        Return a key for the endpoint, its namespaces and dictionaries.
+
+        Dictionaries are identified by their NamespaceUri and
+        DictionaryVersion properties, only the contents of those without
+        both are read.
+        """
+        assert self._uri
+        digest = hashlib.sha1(self._uri.encode("utf-8"))
+        namespaces = self._uaclient.read_attributes(
+            [ua.NodeId(ua.ObjectIds.Server_NamespaceArray)])[0]
+        for uri in namespaces.Value.Value or []:
+            digest.update(uri.encode("utf-8"))
+        properties = self._get_properties(nodeids)
+        unversioned = [nodeid for nodeid in nodeids
+                       if not all(properties[nodeid])]
+        contents = dict(zip(unversioned,
+                            self._uaclient.read_attributes(unversioned)))
+        for nodeid in nodeids:
+            digest.update(nodeid.to_string().encode("utf-8"))
+            if nodeid in contents:
+                dictionary = contents[nodeid].Value.Value or b""
+                if isinstance(dictionary, str):
+                    dictionary = dictionary.encode("utf-8")
+                digest.update(dictionary)
+            else:
+                for value in properties[nodeid]:
+                    digest.update(value.encode("utf-8"))
+        return digest.hexdigest()
+
+    def _get_properties(self, nodeids: List[ua.NodeId])\
+            -> Dict[ua.NodeId, List[str]]:
+        """
+        Return the NamespaceUri and DictionaryVersion of dictionaries,
+        empty strings for missing properties.
+        """
+        properties = {nodeid: [""] * len(DICTIONARY_PROPERTIES)
+                      for nodeid in nodeids}
+        positions = []
+        for nodeid, references in zip(nodeids, self._uaclient.browse(
+                nodeids, ua.ObjectIds.HasProperty, index=False)):
+            # servers add the properties in their own namespace as well
+            positions.extend(
+                (nodeid, DICTIONARY_PROPERTIES.index(ref.BrowseName.Name),
+                 ref.NodeId) for ref in references
+                if ref.BrowseName.Name in DICTIONARY_PROPERTIES)
+        values = self._uaclient.read_attributes(
+            [prop for _, _, prop in positions])
+        for (nodeid, idx, _), value in zip(positions, values):
+            if value.StatusCode.is_good() and value.Value.Value:
+                properties[nodeid][idx] = str(value.Value.Value)
+        return properties
+
+    @staticmethod
+    def _load_cached(path: str) -> Optional[int]:
+        """
+        Execute cached generated code, registering its classes. Returns
+        None if the code is not cached or does not match its hash.
+        """
+        try:
+            with open(path, "rb") as source:
+                code = source.read()
+            with open(path + ".sha256", "r") as checksum:
+                expected = checksum.read().strip()
+        except FileNotFoundError:
+            return None
+        if hashlib.sha256(code).hexdigest() != expected:
+            logging.warning("Ignoring type definitions %s not matching "
+                            "their hash", path)
+            return None
+        logging.info("Loading type definitions from %s", path)
+        env: Dict[str, object] = {}
+        exec(compile(code, path, "exec"), env)
+        return sum(1 for value in env.values()
+                   if isinstance(value, type) and hasattr(value, "ua_types"))
+
+    def _load_from_server(self, nodeids: List[ua.NodeId],
+                          path: str) -> Optional[int]:
+        """
+        Load the definitions from the server and cache the code, return
+        None if interrupted.
+        """
+        client = self._uaclient.client
+        assert client
+        generators: List[StructGenerator] = []
+        for nodeid in nodeids:
+            if self.isInterruptionRequested():
+                return None
+            loaded, _ = client.load_type_definitions(
+                [client.aio_obj.get_node(nodeid)])
+            generators.extend(loaded)
+        structs = [element for generator in generators
+                   for element in generator.model
+                   if isinstance(element, Struct)]
+        if generators:
+            code = self._make_code(generators).encode("utf-8")
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "wb") as target:
+                target.write(code)
+            # the code is only executed again if it matches the hash
+            with open(path + ".sha256", "w") as checksum:
+                checksum.write(hashlib.sha256(code).hexdigest())
+        return len(structs)
+
+    @staticmethod
+    def _make_code(generators: List[StructGenerator]) -> str:
+        """Return code defining and registering the generated classes."""
+        code = CODE_HEADER
+        registration = "\n\n"
+        for generator in generators:
+            for element in generator.model:
+                code += element.get_code()
+                if isinstance(element, EnumType):
+                    registration += "setattr(ua, '{0}', {0})\n".format(
+                        element.name)
+                elif element.typeid is not None:
+                    registration += \
+                        "ua.register_extension_object('{0}', " \
+                        "ua.NodeId.from_string('{1}'), {0})\n".format(
+                            element.name, element.typeid)
+        return code + registration
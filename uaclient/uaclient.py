@@ -1,6 +1,10 @@
 """UaClient definition for usage in GUI application."""
 import logging
-from typing import Optional, Dict, List
+import threading
+from copy import copy
+from functools import wraps
+from typing import Optional, Dict, List, Iterator, Any, Union, Tuple, \
+    Set, Callable, TypeVar, cast
 
 from PyQt5.QtCore import QSettings
 
@@ -9,9 +13,39 @@ from asyncua.sync import Client
 from asyncua.sync import Node
 from asyncua import crypto
 from asyncua.tools import endpoint_to_strings
-from asyncua.ua import NodeId, EndpointDescription
+from asyncua.ua import NodeId, EndpointDescription, DataValue, \
+    ReferenceDescription
+from asyncua.ua.ua_binary import struct_from_binary
 
-from uaclient.handler import DataChangeHandler, EventHandler
+from uaclient.handler import DataChangeHandler, EventHandler, \
+    AttributeHandler
+from uaclient.data_types import DataTypeRegistry
+from uaclient.display_names import DisplayNameCache
+from uaclient.reference_index import ReferenceIndex
+from uaclient.reference_types import ReferenceTypeHierarchy
+from uaclient.subscription_groups import SubscriptionGroup, DEFAULT_GROUP, \
+    load_subscription_groups, save_subscription_groups
+from uaclient.type_definitions import TypeDefinitionLoader
+
+
+# operation limits of the server honoured when splitting requests
+OPERATION_LIMITS = ["MaxNodesPerRead", "MaxNodesPerBrowse",
+                    "MaxMonitoredItemsPerCall",
+                    "MaxNodesPerNodeManagement"]
+
+# publishing interval of the Subscriptions in milliseconds
+PUBLISHING_INTERVAL = 500
+
+_Method = TypeVar("_Method", bound=Callable[..., Any])
+
+
+def _locked(method: _Method) -> _Method:
+    """Run a method of the UaClient while holding its lock."""
+    @wraps(method)
+    def wrapper(self: "UaClient", *args: Any, **kwargs: Any) -> Any:
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return cast(_Method, wrapper)
 
 
 class UaClient:
@@ -29,19 +63,70 @@ class UaClient:
         # stores the current connection state
         self._connected: bool = False
 
-        # Todo: Check if we really need two Subscriptions
-        # holds the Subscription for data changes if connected
-        self._datachange_sub: Optional[Subscription] = None
+        # guards the session and the subscriptions, which are restored by
+        # reconnect in the background while the GUI changes them
+        self._lock = threading.RLock()
+
+        # URI of the endpoint connected to
+        self.endpoint: Optional[str] = None
+
+        # named Subscriptions the data changes are grouped into, each with
+        # its own publishing interval
+        self.subscription_groups: Dict[str, SubscriptionGroup] = \
+            load_subscription_groups()
 
         # holds the Subscription for events if connected
         self._event_sub: Optional[Subscription] = None
 
-        # holds all the datachange subscriptions
-        self._subs_dc: Dict[NodeId, int] = {}
+        # holds the group of every datachange subscription
+        self._subs_dc: Dict[NodeId, SubscriptionGroup] = {}
+
+        # holds the datachanges not monitored with the default parameters,
+        # they are requested again when the items have to be recreated
+        self._dc_parameters: Dict[NodeId, ua.MonitoringParameters] = {}
+
+        # maps the datachanges only sampled to the trigger item of the same
+        # Subscription reporting them through SetTriggering
+        self._dc_triggers: Dict[NodeId, NodeId] = {}
 
         # holds all the event subscriptions
         self._subs_ev: Dict[NodeId, int] = {}
 
+        # receives the notifications of the event Subscription
+        self._event_handler: Optional[EventHandler] = None
+
+        # holds the private Subscription of the live attribute view
+        self._attribute_sub: Optional[Subscription] = None
+
+        # holds the handles of the currently monitored attributes
+        self._attribute_handles: List[int] = []
+
+        # holds the node, attributes and handler of the live attribute view
+        self._attribute_request: Optional[
+            Tuple[Node, List[ua.AttributeIds], AttributeHandler]] = None
+
+        # number of nodes sent in a single Read or Browse request
+        self.max_nodes_per_request: int = 1000
+
+        # operation limits announced by the connected server
+        self._operation_limits: Dict[str, int] = {}
+
+        # resolves the DataTypes of the connected server
+        self.data_types: DataTypeRegistry = DataTypeRegistry(self)
+
+        # resolves the names of non standard nodes of the connected server
+        self.display_names: DisplayNameCache = DisplayNameCache(self)
+
+        # indexes the references of all Browse results of the session
+        self.reference_index: ReferenceIndex = ReferenceIndex(self)
+
+        # resolves the ReferenceTypes of the connected server
+        self.reference_types: ReferenceTypeHierarchy\
+            = ReferenceTypeHierarchy(self)
+
+        # loads the custom structures of the server after connecting
+        self.type_loader: TypeDefinitionLoader = TypeDefinitionLoader(self)
+
         self.security_mode: Optional[str] = None
         self.security_policy: Optional[str] = None
         self.certificate_path: Optional[str] = None
@@ -51,10 +136,23 @@ class UaClient:
         """Reset the UaClient"""
         self.client = None
         self._connected = False
-        self._datachange_sub = None
+        self.endpoint = None
+        for group in self.subscription_groups.values():
+            group.reset()
         self._event_sub = None
         self._subs_dc.clear()
+        self._dc_parameters.clear()
+        self._dc_triggers.clear()
         self._subs_ev.clear()
+        self._event_handler = None
+        self._attribute_sub = None
+        self._attribute_handles.clear()
+        self._attribute_request = None
+        self._operation_limits.clear()
+        self.data_types.clear()
+        self.display_names.clear()
+        self.reference_index.clear()
+        self.reference_types.clear()
 
     @staticmethod
     def get_endpoints(uri: str) -> List[EndpointDescription]:
@@ -97,6 +195,110 @@ class UaClient:
         assert self.client
         return self.client.get_node(nodeid)
 
+    def _service(self, name: str, parameters: Any) -> Any:
+        """Call a service of the low level client and return its result."""
+        assert self.client
+        service = getattr(self.client.aio_obj.uaclient, name)
+        return self.client.tloop.post(service(parameters))
+
+    def _chunks(self, items: List[Any], limit: str)\
+            -> Iterator[List[Any]]:
+        """Split the items into chunks fitting into a single request."""
+        size = min(self.max_nodes_per_request,
+                   self._operation_limits.get(limit,
+                                              self.max_nodes_per_request))
+        for start in range(0, len(items), size):
+            yield items[start:start + size]
+
+    def read(self, nodes_to_read: List[ua.ReadValueId]) -> List[DataValue]:
+        """Read the given ReadValueIds with as few requests as possible."""
+        results: List[DataValue] = []
+        for chunk in self._chunks(nodes_to_read, "MaxNodesPerRead"):
+            params = ua.ReadParameters()
+            params.TimestampsToReturn = ua.TimestampsToReturn.Both
+            params.NodesToRead = chunk
+            results.extend(self._service("read", params))
+        return results
+
+    def read_attributes(self, nodeids: List[NodeId],
+                        attr: ua.AttributeIds = ua.AttributeIds.Value)\
+            -> List[DataValue]:
+        """Read one attribute of many nodes in bulk."""
+        nodes_to_read = []
+        for nodeid in nodeids:
+            rvi = ua.ReadValueId()
+            rvi.NodeId = nodeid
+            rvi.AttributeId = attr
+            nodes_to_read.append(rvi)
+        return self.read(nodes_to_read)
+
+    def browse(self, nodeids: List[NodeId],
+               refs: Union[int, NodeId] =
+               ua.ObjectIds.HierarchicalReferences,
+               direction: ua.BrowseDirection = ua.BrowseDirection.Forward,
+               include_subtypes: bool = True,
+               nodeclass_mask: int = 0, index: bool = True)\
+            -> List[List[ReferenceDescription]]:
+        """
+        Browse many nodes in bulk, following continuation points. The
+        results are added to the reference index unless index is False,
+        which threads other than the GUI thread must use.
+        """
+        results: List[List[ReferenceDescription]] = []
+        complete = refs in (ua.ObjectIds.References,
+                            ua.NodeId(ua.ObjectIds.References)) \
+            and direction == ua.BrowseDirection.Both \
+            and include_subtypes and not nodeclass_mask
+        for chunk in self._chunks(nodeids, "MaxNodesPerBrowse"):
+            params = ua.BrowseParameters()
+            params.RequestedMaxReferencesPerNode = 0
+            for nodeid in chunk:
+                desc = ua.BrowseDescription()
+                desc.NodeId = nodeid
+                desc.BrowseDirection = direction
+                desc.ReferenceTypeId = ua.NodeId(refs) \
+                    if isinstance(refs, int) else refs
+                desc.IncludeSubtypes = include_subtypes
+                desc.NodeClassMask = nodeclass_mask
+                desc.ResultMask = ua.BrowseResultMask.All
+                params.NodesToBrowse.append(desc)
+            for nodeid, result in zip(chunk,
+                                      self._service("browse", params)):
+                references = list(result.References)
+                continuation_point = result.ContinuationPoint
+                while continuation_point:
+                    next_result = self.browse_next(continuation_point)
+                    references.extend(next_result.References)
+                    continuation_point = next_result.ContinuationPoint
+                if index:
+                    self.reference_index.add(
+                        nodeid, references,
+                        complete and result.StatusCode.is_good())
+                results.append(references)
+        return results
+
+    def browse_next(self, continuation_point: bytes,
+                    release: bool = False) -> ua.BrowseResult:
+        """Continue a Browse or release its continuation point."""
+        params = ua.BrowseNextParameters()
+        params.ReleaseContinuationPoints = release
+        params.ContinuationPoints = [continuation_point]
+        return self._service("browse_next", params)[0]
+
+    def _load_operation_limits(self) -> None:
+        """Read the operation limits of the server, 0 means no limit."""
+        self._operation_limits.clear()
+        nodeids = [ua.NodeId(getattr(
+            ua.ObjectIds,
+            "Server_ServerCapabilities_OperationLimits_" + name))
+                   for name in OPERATION_LIMITS]
+        for name, value in zip(OPERATION_LIMITS,
+                               self.read_attributes(nodeids)):
+            if value.StatusCode.is_good() and value.Value.Value:
+                self._operation_limits[name] = value.Value.Value
+        logging.debug("Operation limits: %s", self._operation_limits)
+
+    @_locked
     def connect(self, uri: str) -> None:
         """Connect to the given URI."""
         self.disconnect()
@@ -116,45 +318,618 @@ class UaClient:
             )
         self.client.connect()
         self._connected = True
+        self.endpoint = uri
         self.save_security_settings(uri)
+        try:
+            self._load_operation_limits()
+        except ua.UaError as ex:
+            logging.warning("Could not read the operation limits: %s", ex)
+        try:
+            self.data_types.preload()
+        except ua.UaError as ex:
+            logging.warning("Could not preload the DataTypes: %s", ex)
+        self.type_loader.load(uri)
 
+    @_locked
     def disconnect(self) -> None:
         """Disconnect from the server."""
         if self._connected:
             print("Disconnecting from server")
+            self.type_loader.stop()
             try:
                 # client must be available
                 assert self.client
-                self.client.disconnect()
+                if self.is_connection_lost():
+                    # the session cannot be closed, only its tasks stopped
+                    self.client.tloop.post(self._stop_session_tasks())
+                    if self.client.close_tloop:
+                        self.client.tloop.stop()
+                else:
+                    self.client.disconnect()
             finally:
                 self._reset()
 
-    def subscribe_datachange(self, node: Node, handler: DataChangeHandler)\
-            -> int:
-        """Subscribe to a datachange."""
+    @_locked
+    def set_subscription_group(self, group: SubscriptionGroup) -> None:
+        """Add a group or replace the settings of a group not in use."""
+        current = self.subscription_groups.get(group.name)
+        if current is not None and current.subscription is not None:
+            raise ValueError("Subscription group {} is in use".format(
+                group.name))
+        self.subscription_groups[group.name] = group
+        save_subscription_groups(self.subscription_groups)
+
+    @_locked
+    def remove_subscription_group(self, name: str) -> None:
+        """Remove a group that is not in use."""
+        group = self.subscription_groups[name]
+        if name == DEFAULT_GROUP or group.handles:
+            raise ValueError("Subscription group {} is in use".format(name))
+        if group.subscription is not None:
+            group.subscription.delete()
+        del self.subscription_groups[name]
+        save_subscription_groups(self.subscription_groups)
+
+    def _get_subscription(self, group: SubscriptionGroup,
+                          handler: DataChangeHandler) -> Subscription:
+        """Return the Subscription of a group, created when missing."""
         assert self.client
-        if not self._datachange_sub:
-            self._datachange_sub = \
-                self.client.create_subscription(500, handler)
-        handle: int = self._datachange_sub.subscribe_data_change(node)
-        self._subs_dc[node.nodeid] = handle
-        return handle
+        if group.subscription is None:
+            group.subscription = self.client.create_subscription(
+                group.get_parameters(), handler)
+            group.handler = handler
+        return group.subscription
+
+    @_locked
+    def subscribe_datachange(self, node: Node, handler: DataChangeHandler,
+                             group: str = DEFAULT_GROUP) -> int:
+        """Subscribe to a datachange within the Subscription of a group."""
+        result = self.subscribe_datachanges([node], handler, group)[
+            node.nodeid]
+        if isinstance(result, ua.StatusCode):
+            result.check()
+        return result
+
+    @_locked
+    def subscribe_datachanges(
+            self, nodes: List[Node], handler: DataChangeHandler,
+            group: str = DEFAULT_GROUP,
+            parameters: Optional[Dict[NodeId, ua.MonitoringParameters]]
+            = None) -> Dict[NodeId, Union[int, ua.StatusCode]]:
+        """
+        Subscribe to the datachanges of many nodes with as few
+        CreateMonitoredItems requests as possible and return the handles,
+        or the StatusCodes of the rejected nodes. Nodes missing from the
+        optional parameters are monitored with the defaults.
+        """
+        subscription_group = self.subscription_groups[group]
+        subscription = self._get_subscription(subscription_group, handler)
+        aio_sub = subscription.aio_obj
+        results: Dict[NodeId, Union[int, ua.StatusCode]] = {}
+        for chunk in self._chunks(nodes, "MaxMonitoredItemsPerCall"):
+            requests = [aio_sub._make_monitored_item_request(
+                node, ua.AttributeIds.Value, None, 0) for node in chunk]
+            if parameters:
+                for request in requests:
+                    params = parameters.get(request.ItemToMonitor.NodeId)
+                    if params is not None:
+                        # notifications are dispatched by the client handle
+                        params = copy(params)
+                        params.ClientHandle = \
+                            request.RequestedParameters.ClientHandle
+                        request.RequestedParameters = params
+            for node, result in zip(
+                    chunk, subscription.create_monitored_items(requests)):
+                results[node.nodeid] = result
+                if isinstance(result, int):
+                    subscription_group.handles[node.nodeid] = result
+                    self._subs_dc[node.nodeid] = subscription_group
+                    if parameters and node.nodeid in parameters:
+                        self._dc_parameters[node.nodeid] = \
+                            parameters[node.nodeid]
+        return results
 
+    @_locked
     def unsubscribe_datachange(self, node: Node) -> None:
         """Unsubscribe from a datachange."""
-        assert self._datachange_sub
-        self._datachange_sub.unsubscribe(self._subs_dc[node.nodeid])
+        self.unsubscribe_datachanges([node.nodeid])[node.nodeid].check()
 
+    @_locked
+    def unsubscribe_datachanges(self, nodeids: List[NodeId])\
+            -> Dict[NodeId, ua.StatusCode]:
+        """
+        Unsubscribe from many datachanges with as few DeleteMonitoredItems
+        requests as possible and return the StatusCodes of the deletions.
+        """
+        # rows whose items could not be created again have no handle
+        results: Dict[NodeId, ua.StatusCode] = {
+            nodeid: ua.StatusCode(ua.StatusCodes.BadMonitoredItemIdInvalid)
+            for nodeid in nodeids if nodeid not in self._subs_dc}
+        nodeids = [nodeid for nodeid in dict.fromkeys(nodeids)
+                   if nodeid not in results]
+        self._unlink_datachanges(nodeids)
+        # every Subscription needs requests of its own
+        groups: Dict[str, List[NodeId]] = {}
+        for nodeid in nodeids:
+            groups.setdefault(self._subs_dc.pop(nodeid).name,
+                              []).append(nodeid)
+            self._dc_parameters.pop(nodeid, None)
+        for name, members in groups.items():
+            group = self.subscription_groups[name]
+            assert group.subscription
+            results.update(zip(members, self._delete_monitored_items(
+                group.subscription,
+                [group.handles.pop(nodeid) for nodeid in members])))
+        return results
+
+    def _delete_monitored_items(self, subscription: Subscription,
+                                handles: List[int]) -> List[ua.StatusCode]:
+        """Delete monitored items of a Subscription in chunks."""
+        aio_sub = subscription.aio_obj
+        results: List[ua.StatusCode] = []
+        for chunk in self._chunks(handles, "MaxMonitoredItemsPerCall"):
+            params = ua.DeleteMonitoredItemsParameters()
+            params.SubscriptionId = aio_sub.subscription_id
+            params.MonitoredItemIds = chunk
+            results.extend(self._service("delete_monitored_items", params))
+        # notifications are no longer dispatched to the deleted items
+        deleted = set(handles)
+        for client_handle, item in list(aio_sub._monitored_items.items()):
+            if item.server_handle in deleted:
+                del aio_sub._monitored_items[client_handle]
+        return results
+
+    @_locked
+    def move_datachanges(
+            self, nodes: List[Node], handler: DataChangeHandler, group: str,
+            parameters: Optional[Dict[NodeId, ua.MonitoringParameters]]
+            = None) -> Dict[NodeId, Union[int, ua.StatusCode]]:
+        """
+        Subscribe to datachanges in another group in bulk and delete
+        their items in the old groups. Returns the new handles, or the
+        StatusCodes of the nodes that stay in their old group. Nodes
+        missing from the optional parameters keep their current ones.
+        """
+        new_group = self.subscription_groups[group]
+        results: Dict[NodeId, Union[int, ua.StatusCode]] = {}
+        old_groups: Dict[NodeId, SubscriptionGroup] = {}
+        for node in nodes:
+            old_group = self._subs_dc.get(node.nodeid)
+            if old_group is None:
+                results[node.nodeid] = ua.StatusCode(
+                    ua.StatusCodes.BadMonitoredItemIdInvalid)
+            elif old_group is new_group:
+                results[node.nodeid] = old_group.handles[node.nodeid]
+            else:
+                old_groups[node.nodeid] = old_group
+        if not old_groups:
+            return results
+        params = {nodeid: self._dc_parameters[nodeid]
+                  for nodeid in old_groups if nodeid in self._dc_parameters}
+        if parameters:
+            params.update((nodeid, parameters[nodeid]) for nodeid
+                          in old_groups if nodeid in parameters)
+        # links only exist within a Subscription
+        self._unlink_datachanges(list(old_groups))
+        created = self.subscribe_datachanges(
+            [node for node in nodes if node.nodeid in old_groups], handler,
+            group, params)
+        results.update(created)
+        # the old items of the rejected nodes keep reporting
+        moved: Dict[str, List[NodeId]] = {}
+        for nodeid, result in created.items():
+            if isinstance(result, int):
+                moved.setdefault(old_groups[nodeid].name, []).append(nodeid)
+        for name, nodeids in moved.items():
+            old_group = self.subscription_groups[name]
+            assert old_group.subscription
+            handles = [old_group.handles.pop(nodeid) for nodeid in nodeids]
+            for nodeid, result in zip(nodeids, self._delete_monitored_items(
+                    old_group.subscription, handles)):
+                if not result.is_good():
+                    logging.warning("Could not delete the old item of %s: "
+                                    "%s", nodeid, result)
+        return results
+
+    @_locked
+    def get_datachange_group(self, nodeid: NodeId) -> str:
+        """Return the name of the group a datachange is subscribed in."""
+        return self._subs_dc[nodeid].name
+
+    def get_default_monitoring_parameters(self, group: str = DEFAULT_GROUP)\
+            -> ua.MonitoringParameters:
+        """Return the parameters requested for new datachange items."""
+        params = ua.MonitoringParameters()
+        # the Subscription samples with its publishing interval
+        params.SamplingInterval = \
+            self.subscription_groups[group].publishing_interval
+        params.DiscardOldest = True
+        return params
+
+    @_locked
+    def modify_datachange(self,
+                          parameters: Dict[NodeId, ua.MonitoringParameters])\
+            -> Dict[NodeId, ua.MonitoredItemModifyResult]:
+        """
+        Change the monitoring parameters of subscribed datachanges with as
+        few ModifyMonitoredItems requests as possible and return the
+        results with the parameters revised by the server.
+        """
+        # every Subscription needs requests of its own
+        groups: Dict[str, List[NodeId]] = {}
+        for nodeid in parameters:
+            groups.setdefault(self._subs_dc[nodeid].name, []).append(nodeid)
+        results: Dict[NodeId, ua.MonitoredItemModifyResult] = {}
+        for name, nodeids in groups.items():
+            group = self.subscription_groups[name]
+            assert group.subscription
+            subscription = group.subscription.aio_obj
+            # the client handles must not change, the notifications are
+            # dispatched by them
+            client_handles = {
+                item.server_handle: item.client_handle
+                for item in subscription._monitored_items.values()}
+            items = []
+            for nodeid in nodeids:
+                request = ua.MonitoredItemModifyRequest()
+                request.MonitoredItemId = group.handles[nodeid]
+                request.RequestedParameters = copy(parameters[nodeid])
+                request.RequestedParameters.ClientHandle = \
+                    client_handles[request.MonitoredItemId]
+                items.append((nodeid, request))
+            for chunk in self._chunks(items, "MaxMonitoredItemsPerCall"):
+                params = ua.ModifyMonitoredItemsParameters()
+                params.SubscriptionId = subscription.subscription_id
+                params.TimestampsToReturn = ua.TimestampsToReturn.Both
+                params.ItemsToModify = [request for _, request in chunk]
+                for (nodeid, _), result in zip(chunk, self._service(
+                        "modify_monitored_items", params)):
+                    results[nodeid] = result
+                    if result.StatusCode.is_good():
+                        self._dc_parameters[nodeid] = parameters[nodeid]
+        return results
+
+    @_locked
+    def get_datachange_trigger(self, nodeid: NodeId) -> Optional[NodeId]:
+        """Return the trigger item a datachange is linked to, if any."""
+        return self._dc_triggers.get(nodeid)
+
+    @_locked
+    def set_triggering(self, trigger: NodeId, nodeids: List[NodeId])\
+            -> Dict[NodeId, ua.StatusCode]:
+        """
+        Link datachanges to a trigger item of the same group with as few
+        SetTriggering and SetMonitoringMode requests as possible and
+        return the StatusCodes of the links.
+
+        Linked items are switched to sampling, the server only reports
+        them together with a change of the trigger item. An item is
+        linked to one trigger at a time, a link to another one is removed.
+        """
+        group = self._subs_dc[trigger]
+        assert group.subscription
+        results: Dict[NodeId, ua.StatusCode] = {}
+        links = []
+        for nodeid in nodeids:
+            if nodeid == trigger or self._subs_dc.get(nodeid) is not group:
+                results[nodeid] = ua.StatusCode(
+                    ua.StatusCodes.BadMonitoredItemIdInvalid)
+            elif self._dc_triggers.get(nodeid) != trigger:
+                links.append(nodeid)
+            else:
+                results[nodeid] = ua.StatusCode()
+        self.remove_triggering([nodeid for nodeid in links
+                                if nodeid in self._dc_triggers])
+        for chunk in self._chunks(links, "MaxMonitoredItemsPerCall"):
+            request = ua.SetTriggeringRequest()
+            request.Parameters.SubscriptionId = \
+                group.subscription.aio_obj.subscription_id
+            request.Parameters.TriggeringItemId = group.handles[trigger]
+            request.Parameters.LinksToAdd = [group.handles[nodeid]
+                                             for nodeid in chunk]
+            response = self._send_request(request, ua.SetTriggeringResponse)
+            for nodeid, result in zip(chunk,
+                                      response.Parameters.AddResults):
+                results[nodeid] = result
+                if result.is_good():
+                    self._dc_triggers[nodeid] = trigger
+        # items are only switched to sampling once they are linked, so
+        # they keep reporting if the server rejects the link
+        self._set_monitoring_mode(
+            group, [nodeid for nodeid in links if results[nodeid].is_good()],
+            ua.MonitoringMode.Sampling)
+        return results
+
+    @_locked
+    def remove_triggering(self, nodeids: List[NodeId])\
+            -> Dict[NodeId, ua.StatusCode]:
+        """
+        Remove the links of datachanges to their trigger items in bulk
+        and report them on their own again. Returns the StatusCodes of
+        the removed links.
+        """
+        triggers: Dict[NodeId, List[NodeId]] = {}
+        for nodeid in nodeids:
+            trigger = self._dc_triggers.pop(nodeid, None)
+            if trigger is not None:
+                triggers.setdefault(trigger, []).append(nodeid)
+        results: Dict[NodeId, ua.StatusCode] = {}
+        for trigger, linked in triggers.items():
+            group = self._subs_dc[trigger]
+            assert group.subscription
+            # reporting first so no value is missed in between
+            self._set_monitoring_mode(group, linked,
+                                      ua.MonitoringMode.Reporting)
+            for chunk in self._chunks(linked, "MaxMonitoredItemsPerCall"):
+                request = ua.SetTriggeringRequest()
+                request.Parameters.SubscriptionId = \
+                    group.subscription.aio_obj.subscription_id
+                request.Parameters.TriggeringItemId = group.handles[trigger]
+                request.Parameters.LinksToRemove = [group.handles[nodeid]
+                                                    for nodeid in chunk]
+                response = self._send_request(request,
+                                              ua.SetTriggeringResponse)
+                results.update(zip(chunk, response.Parameters.RemoveResults))
+        return results
+
+    def _unlink_datachanges(self, nodeids: List[NodeId]) -> None:
+        """Forget the links of datachanges about to be deleted."""
+        deleted = set(nodeids)
+        for nodeid in nodeids:
+            self._dc_triggers.pop(nodeid, None)
+        linked = [other for other, trigger in self._dc_triggers.items()
+                  if trigger in deleted]
+        if linked:
+            try:
+                self.remove_triggering(linked)
+            except ua.UaError as ex:
+                logging.warning("Could not remove the links of %s data "
+                                "changes: %s", len(linked), ex)
+
+    def _set_monitoring_mode(self, group: SubscriptionGroup,
+                             nodeids: List[NodeId],
+                             mode: ua.MonitoringMode) -> None:
+        """Set the MonitoringMode of datachanges of a group in bulk."""
+        assert group.subscription
+        for chunk in self._chunks(nodeids, "MaxMonitoredItemsPerCall"):
+            request = ua.SetMonitoringModeRequest()
+            request.Parameters.SubscriptionId = \
+                group.subscription.aio_obj.subscription_id
+            request.Parameters.MonitoringMode = mode
+            request.Parameters.MonitoredItemIds = [group.handles[nodeid]
+                                                   for nodeid in chunk]
+            response = self._send_request(request,
+                                          ua.SetMonitoringModeResponse)
+            for nodeid, result in zip(chunk, response.Parameters.Results):
+                if not result.is_good():
+                    logging.warning("Could not set the monitoring mode of "
+                                    "%s to %s: %s", nodeid, mode.name,
+                                    result)
+
+    @_locked
     def subscribe_events(self, node: Node, handler: EventHandler) -> int:
         """Subscribe to an event."""
         assert self.client
         if not self._event_sub:
-            self._event_sub = self.client.create_subscription(500, handler)
+            self._event_sub = \
+                self.client.create_subscription(PUBLISHING_INTERVAL, handler)
+            self._event_handler = handler
         handle: int = self._event_sub.subscribe_events(node)
         self._subs_ev[node.nodeid] = handle
         return handle
 
-    def unsubscribe_events(self, node: Node) -> None:
-        """Unsubscribe from an event."""
+    @_locked
+    def unsubscribe_events(self, nodes: Union[Node, List[Node]])\
+            -> Dict[NodeId, ua.StatusCode]:
+        """
+        Unsubscribe from the events of one or many nodes with as few
+        DeleteMonitoredItems requests as possible and return the
+        StatusCodes of the deletions.
+        """
         assert self._event_sub
-        self._event_sub.unsubscribe(self._subs_ev[node.nodeid])
+        if isinstance(nodes, Node):
+            nodes = [nodes]
+        nodeids = [node.nodeid for node in nodes]
+        return dict(zip(nodeids, self._delete_monitored_items(
+            self._event_sub,
+            [self._subs_ev.pop(nodeid) for nodeid in nodeids])))
+
+    @_locked
+    def subscribe_attributes(self, node: Node,
+                             attrs: List[ua.AttributeIds],
+                             handler: AttributeHandler) -> None:
+        """Monitor the attributes of a node, replacing the previous ones."""
+        assert self.client
+        self.unsubscribe_attributes()
+        if not self._attribute_sub:
+            self._attribute_sub = \
+                self.client.create_subscription(PUBLISHING_INTERVAL, handler)
+        aio_sub = self._attribute_sub.aio_obj
+        requests = [aio_sub._make_monitored_item_request(node, attr, None, 0)
+                    for attr in attrs]
+        results = self._attribute_sub.create_monitored_items(requests)
+        # attributes the node does not support are rejected by the server
+        self._attribute_handles = [result for result in results
+                                   if isinstance(result, int)]
+        self._attribute_request = (node, attrs, handler)
+
+    @_locked
+    def unsubscribe_attributes(self) -> None:
+        """Stop monitoring the attributes of the live attribute view."""
+        self._attribute_request = None
+        if self._attribute_sub and self._attribute_handles:
+            handles = self._attribute_handles
+            self._attribute_handles = []
+            self._attribute_sub.unsubscribe(handles)
+
+    def is_connection_lost(self) -> bool:
+        """Return if the connection broke without disconnecting."""
+        if not self._connected:
+            return False
+        assert self.client
+        aio_client = self.client.aio_obj
+        protocol = aio_client.uaclient.protocol
+        renew_task = aio_client._renew_channel_task
+        # a channel that could not be renewed is lost as well
+        return protocol is None or protocol.state == protocol.CLOSED \
+            or renew_task is None or renew_task.done()
+
+    @_locked
+    def reconnect(self) -> Dict[NodeId, ua.StatusCode]:
+        """
+        Open a new session after the connection was lost, keeping all
+        subscriptions and handles.
+
+        The Subscriptions of the old session are transferred to the new
+        one and their unacknowledged notifications are republished. The
+        Subscriptions the server cannot transfer are created again with
+        all their monitored items in bulk. Returns the StatusCodes of the
+        datachanges that could not be created again.
+        """
+        assert self.client
+        self.client.tloop.post(self._stop_session_tasks())
+        self.client.connect()
+        subscriptions = [self._event_sub, self._attribute_sub]
+        subscriptions.extend(group.subscription
+                             for group in self.subscription_groups.values())
+        subscriptions = [subscription for subscription in subscriptions
+                         if subscription is not None]
+        if not subscriptions:
+            return {}
+        try:
+            results = self._transfer_subscriptions(
+                [subscription.aio_obj.subscription_id
+                 for subscription in subscriptions])
+        except ua.UaError as ex:
+            logging.warning("Could not transfer the subscriptions: %s", ex)
+            results = [None] * len(subscriptions)
+        lost = set()
+        for subscription, result in zip(subscriptions, results):
+            if result is not None and result.StatusCode.is_good():
+                self._republish(subscription,
+                                result.AvailableSequenceNumbers)
+            else:
+                lost.add(subscription)
+        if len(lost) < len(subscriptions):
+            self.client.tloop.post(self._start_publishing())
+        logging.info("Transferred %s of %s subscriptions",
+                     len(subscriptions) - len(lost), len(subscriptions))
+        return self._recreate_subscriptions(lost)
+
+    async def _stop_session_tasks(self) -> None:
+        """Stop the publishing and channel renewal of the lost session."""
+        assert self.client
+        aio_client = self.client.aio_obj
+        for task in (aio_client._renew_channel_task,
+                     aio_client.uaclient._publish_task):
+            if task is not None and not task.done():
+                task.cancel()
+
+    async def _start_publishing(self) -> None:
+        """Send publish requests for the transferred Subscriptions."""
+        assert self.client
+        uaclient = self.client.aio_obj.uaclient
+        if uaclient._publish_task is None or uaclient._publish_task.done():
+            uaclient._publish_task = uaclient.loop.create_task(
+                uaclient._publish_loop())
+
+    def _send_request(self, request: Any, response_type: Any) -> Any:
+        """Send a request the low level client has no service for."""
+        assert self.client
+        protocol = self.client.aio_obj.uaclient.protocol
+        response = struct_from_binary(response_type, self.client.tloop.post(
+            protocol.send_request(request)))
+        response.ResponseHeader.ServiceResult.check()
+        return response
+
+    def _transfer_subscriptions(self, subscription_ids: List[int])\
+            -> List[ua.TransferResult]:
+        """Transfer Subscriptions of the lost session to the current one."""
+        request = ua.TransferSubscriptionsRequest()
+        request.Parameters.SubscriptionIds = subscription_ids
+        request.Parameters.SendInitialValues = True
+        response = self._send_request(request,
+                                      ua.TransferSubscriptionsResponse)
+        results: List[ua.TransferResult] = response.Parameters.Results
+        return results
+
+    def _republish(self, subscription: Subscription,
+                   sequence_numbers: List[int]) -> None:
+        """Dispatch the notifications the lost session did not deliver."""
+        assert self.client
+        aio_sub = subscription.aio_obj
+        for sequence_number in sorted(sequence_numbers):
+            request = ua.RepublishRequest()
+            request.Parameters.SubscriptionId = aio_sub.subscription_id
+            request.Parameters.RetransmitSequenceNumber = sequence_number
+            try:
+                response = self._send_request(request, ua.RepublishResponse)
+            except ua.UaError as ex:
+                logging.warning("Could not republish notification %s: %s",
+                                sequence_number, ex)
+                continue
+            result = ua.PublishResult()
+            result.SubscriptionId = aio_sub.subscription_id
+            result.NotificationMessage = response.NotificationMessage
+            self.client.tloop.post(aio_sub.publish_callback(result))
+
+    def _recreate_subscriptions(self, lost: Set[Subscription])\
+            -> Dict[NodeId, ua.StatusCode]:
+        """Create lost Subscriptions again with all their items in bulk."""
+        assert self.client
+        callbacks = self.client.aio_obj.uaclient._subscription_callbacks
+        for subscription in lost:
+            callbacks.pop(subscription.aio_obj.subscription_id, None)
+        # the links of the recreated items are set again once all of them
+        # are subscribed
+        triggers: Dict[NodeId, List[NodeId]] = {}
+        for nodeid, trigger in list(self._dc_triggers.items()):
+            if self._subs_dc[trigger].subscription in lost:
+                del self._dc_triggers[nodeid]
+                triggers.setdefault(trigger, []).append(nodeid)
+        failed: Dict[NodeId, ua.StatusCode] = {}
+        for group in self.subscription_groups.values():
+            if group.subscription not in lost:
+                continue
+            nodeids = list(group.handles)
+            handler = group.handler
+            assert handler
+            group.reset()
+            for nodeid in nodeids:
+                del self._subs_dc[nodeid]
+            results = self.subscribe_datachanges(
+                [self.get_node(nodeid) for nodeid in nodeids], handler,
+                group.name, self._dc_parameters)
+            failed.update((nodeid, result) for nodeid, result
+                          in results.items()
+                          if isinstance(result, ua.StatusCode))
+        for nodeid in failed:
+            self._dc_parameters.pop(nodeid, None)
+        for trigger, linked in triggers.items():
+            linked = [nodeid for nodeid in linked if nodeid in self._subs_dc]
+            if trigger not in self._subs_dc or not linked:
+                continue
+            try:
+                self.set_triggering(trigger, linked)
+            except ua.UaError as ex:
+                logging.warning("Could not link %s data changes to %s "
+                                "again: %s", len(linked), trigger, ex)
+        if self._event_sub in lost:
+            nodeids = list(self._subs_ev)
+            handler = self._event_handler
+            assert handler
+            self._event_sub = None
+            self._subs_ev.clear()
+            for nodeid in nodeids:
+                try:
+                    self.subscribe_events(self.get_node(nodeid), handler)
+                except ua.UaError as ex:
+                    logging.warning("Could not subscribe to the events of "
+                                    "%s again: %s", nodeid, ex)
+        if self._attribute_sub in lost:
+            request = self._attribute_request
+            self._attribute_sub = None
+            self._attribute_handles = []
+            if request is not None:
+                self.subscribe_attributes(*request)
+        return failed
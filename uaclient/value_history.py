@@ -0,0 +1,135 @@
+"""Recent numeric values of the watched nodes kept in ring buffers."""
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional, Tuple
+
+use_numpy = True
+try:
+    import numpy as np
+except ImportError:
+    use_numpy = False
+
+from asyncua.sync import ua
+from asyncua.ua import NodeId
+
+EPOCH = datetime(1970, 1, 1)
+
+# bytes of a point, a double for the value and one for the timestamp
+POINT_SIZE = 16
+
+
+class ValueHistory:
+    """
+    Fixed size ring buffer of the recent values of a node and their
+    timestamps in seconds since the epoch.
+    """
+
+    __slots__ = ("values", "timestamps", "count", "_next")
+
+    def __init__(self, size: int) -> None:
+        self.values = np.zeros(size)
+        self.timestamps = np.zeros(size)
+        # number of points held, at most the size
+        self.count = 0
+        self._next = 0
+
+    def append(self, value: float, timestamp: float) -> None:
+        """Add a point, replacing the oldest once the buffer is full."""
+        self.values[self._next] = value
+        self.timestamps[self._next] = timestamp
+        self._next = (self._next + 1) % len(self.values)
+        self.count = min(self.count + 1, len(self.values))
+
+    def get_points(self) -> Tuple[Any, Any]:
+        """Return the timestamps and values from the oldest point on."""
+        if self.count < len(self.values):
+            return (self.timestamps[:self.count].copy(),
+                    self.values[:self.count].copy())
+        return (np.roll(self.timestamps, -self._next),
+                np.roll(self.values, -self._next))
+
+    def scale(self, width: float, height: float) -> Tuple[Any, Any]:
+        """
+        Return the points scaled to a width and height, the x coordinates
+        from the timestamps and the y coordinates growing downwards.
+        """
+        timestamps, values = self.get_points()
+        span = timestamps[-1] - timestamps[0] if self.count else 0
+        if span > 0:
+            xs = (timestamps - timestamps[0]) * (width / span)
+        else:
+            xs = np.linspace(0, width, self.count)
+        low = values.min() if self.count else 0
+        high = values.max() if self.count else 0
+        if high > low:
+            ys = (high - values) * (height / (high - low))
+        else:
+            ys = np.full(self.count, height / 2)
+        return xs, ys
+
+
+class HistoryStore:
+    """
+    Hold a ValueHistory of size points for every node with numeric
+    values. Buffers are only allocated while the total stays within
+    max_bytes, nodes beyond that have no history.
+    """
+
+    def __init__(self, size: int = 200,
+                 max_bytes: int = 32 * 1024 * 1024) -> None:
+        """Create a new, empty HistoryStore."""
+        self.size = size
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._histories: Dict[NodeId, ValueHistory] = {}
+        # NodeIds not given a buffer because the memory is used up
+        self._refused = set()
+
+    def get(self, nodeid: NodeId) -> Optional[ValueHistory]:
+        """Return the history of a node, None if it has none."""
+        return self._histories.get(nodeid)
+
+    def get_bytes(self) -> int:
+        """Return the memory used by the buffers."""
+        return len(self._histories) * self.size * POINT_SIZE
+
+    def add(self, nodeid: NodeId, value: ua.DataValue) -> None:
+        """Add the value of a notification if it is numeric."""
+        val = value.Value.Value if value.Value is not None else None
+        if not isinstance(val, (int, float)) or isinstance(val, bool):
+            return
+        history = self._histories.get(nodeid)
+        if history is None:
+            if nodeid in self._refused:
+                return
+            with self._lock:
+                if (len(self._histories) + 1) * self.size * POINT_SIZE \
+                        > self.max_bytes:
+                    self._refused.add(nodeid)
+                    return
+                history = self._histories[nodeid] = ValueHistory(self.size)
+        timestamp = value.SourceTimestamp or value.ServerTimestamp
+        history.append(float(val), _to_seconds(timestamp))
+
+    def remove(self, nodeid: NodeId) -> None:
+        """Drop the history of a node, refused nodes may take its memory."""
+        with self._lock:
+            if self._histories.pop(nodeid, None) is not None:
+                self._refused.clear()
+            self._refused.discard(nodeid)
+
+    def clear(self) -> None:
+        """Drop all histories."""
+        with self._lock:
+            self._histories = {}
+            self._refused = set()
+
+
+def _to_seconds(timestamp: Optional[datetime]) -> float:
+    """Return a timestamp in seconds since the epoch, now if missing."""
+    if timestamp is None:
+        return time.time()
+    if timestamp.tzinfo is not None:
+        return timestamp.astimezone(timezone.utc).timestamp()
+    return (timestamp - EPOCH).total_seconds()
@@ -0,0 +1,94 @@
+"""Search of all variables below nodes of a server."""
+import logging
+from typing import Callable, List, Optional, Set, TYPE_CHECKING
+
+from asyncua.sync import ua
+from asyncua.ua import NodeId
+
+if TYPE_CHECKING:
+    from uaclient.uaclient import UaClient
+
+# called with the number of variables found and nodes browsed, returns
+# False to cancel the search
+Progress = Callable[[int, int], bool]
+
+
+class VariableCrawler:
+    """
+    Find the variables below nodes with one Browse per level.
+
+    Objects and variables are followed through hierarchical references,
+    properties are skipped. The variables found can be restricted to
+    namespaces and DataTypes, the DataTypes are read in bulk once the
+    hierarchy is crawled. The search stops at limit variables.
+    """
+
+    def __init__(self, uaclient: "UaClient", limit: int = 20000,
+                 namespaces: Optional[Set[int]] = None,
+                 data_types: Optional[List[NodeId]] = None) -> None:
+        """Create a new VariableCrawler using the given UaClient."""
+        self._uaclient = uaclient
+        self.limit = limit
+        self.namespaces = namespaces
+        self.data_types = data_types
+        # if the last search stopped at the limit with nodes left to browse
+        # or more variables than the limit
+        self.truncated = False
+
+    def crawl(self, nodeids: List[NodeId],
+              progress: Optional[Progress] = None) -> List[NodeId]:
+        """Return the variables below the nodes in browse order."""
+        self.truncated = False
+        variables: List[NodeId] = []
+        visited = set(nodeids)
+        level = list(nodeids)
+        browsed = 0
+        while level:
+            results = self._uaclient.browse(
+                level, ua.ObjectIds.HierarchicalReferences,
+                nodeclass_mask=ua.NodeClass.Object | ua.NodeClass.Variable)
+            browsed += len(level)
+            next_level = []
+            for refs in results:
+                for ref in refs:
+                    if ref.NodeId in visited or ref.ReferenceTypeId == \
+                            ua.NodeId(ua.ObjectIds.HasProperty):
+                        continue
+                    visited.add(ref.NodeId)
+                    next_level.append(ref.NodeId)
+                    if ref.NodeClass == ua.NodeClass.Variable \
+                            and self._accepts_namespace(ref.NodeId):
+                        variables.append(ref.NodeId)
+            if progress is not None \
+                    and not progress(len(variables), browsed):
+                logging.info("Search for variables cancelled")
+                break
+            if len(variables) >= self.limit and not self.data_types:
+                # the nodes of the next level may hold more variables
+                self.truncated = bool(next_level)
+                break
+            level = next_level
+        variables = self._filter_data_types(variables)
+        if len(variables) > self.limit:
+            self.truncated = True
+            del variables[self.limit:]
+        if self.truncated:
+            logging.warning("Stopped the search at %s variables", self.limit)
+        return variables
+
+    def _accepts_namespace(self, nodeid: NodeId) -> bool:
+        """Return if a variable is in one of the chosen namespaces."""
+        return self.namespaces is None \
+            or nodeid.NamespaceIndex in self.namespaces
+
+    def _filter_data_types(self, nodeids: List[NodeId]) -> List[NodeId]:
+        """Return the variables with one of the chosen DataTypes."""
+        if not self.data_types or not nodeids:
+            return nodeids
+        registry = self._uaclient.data_types
+        values = self._uaclient.read_attributes(nodeids,
+                                                ua.AttributeIds.DataType)
+        return [nodeid for nodeid, value in zip(nodeids, values)
+                if value.StatusCode.is_good()
+                and any(registry.is_subtype(value.Value.Value, data_type)
+                        for data_type in self.data_types)]
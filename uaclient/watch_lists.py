@@ -0,0 +1,119 @@
+"""Named lists of watched nodes stored per endpoint."""
+import json
+import logging
+from typing import Any, Dict, List, Optional
+
+from PyQt5.QtCore import QSettings
+
+from asyncua.sync import ua
+
+from uaclient.subscription_groups import DEFAULT_GROUP
+
+# name of the list saving the watched nodes when disconnecting
+LAST_SESSION = "Last session"
+
+
+class WatchedNode:
+    """
+    A node of a watch list with its subscription group, monitoring
+    parameters and the trigger item it is linked to. NodeIds are kept as
+    strings, they are only resolved when the list is restored.
+    """
+
+    def __init__(self, nodeid: str, name: str, group: str = DEFAULT_GROUP,
+                 sampling_interval: float = 500, queue_size: int = 0,
+                 discard_oldest: bool = True, deadband_type: int = 0,
+                 deadband_value: float = 0.0,
+                 trigger: Optional[str] = None) -> None:
+        """Create a new WatchedNode."""
+        self.nodeid = nodeid
+        self.name = name
+        self.group = group
+        self.sampling_interval = sampling_interval
+        self.queue_size = queue_size
+        self.discard_oldest = discard_oldest
+        self.deadband_type = deadband_type
+        self.deadband_value = deadband_value
+        self.trigger = trigger
+
+    def __repr__(self) -> str:
+        return "WatchedNode({!r}, {!r})".format(self.nodeid, self.name)
+
+    @classmethod
+    def from_parameters(cls, nodeid: ua.NodeId, name: str, group: str,
+                        params: ua.MonitoringParameters,
+                        trigger: Optional[ua.NodeId] = None)\
+            -> "WatchedNode":
+        """Return the WatchedNode of a subscribed node."""
+        deadband = params.Filter \
+            if isinstance(params.Filter, ua.DataChangeFilter) \
+            else ua.DataChangeFilter()
+        return cls(nodeid.to_string(), name, group, params.SamplingInterval,
+                   params.QueueSize, params.DiscardOldest,
+                   int(deadband.DeadbandType), deadband.DeadbandValue,
+                   None if trigger is None else trigger.to_string())
+
+    def get_parameters(self) -> ua.MonitoringParameters:
+        """Return the monitoring parameters requested for the node."""
+        params = ua.MonitoringParameters()
+        params.SamplingInterval = self.sampling_interval
+        params.QueueSize = self.queue_size
+        params.DiscardOldest = self.discard_oldest
+        if self.deadband_type:
+            params.Filter = ua.DataChangeFilter()
+            params.Filter.Trigger = ua.DataChangeTrigger.StatusValue
+            params.Filter.DeadbandType = ua.DeadbandType(self.deadband_type)
+            params.Filter.DeadbandValue = self.deadband_value
+        return params
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the settings of the node."""
+        return {"nodeid": self.nodeid, "name": self.name,
+                "group": self.group,
+                "sampling_interval": self.sampling_interval,
+                "queue_size": self.queue_size,
+                "discard_oldest": self.discard_oldest,
+                "deadband_type": self.deadband_type,
+                "deadband_value": self.deadband_value,
+                "trigger": self.trigger}
+
+
+def _load_all() -> Dict[str, Dict[str, List[Dict[str, Any]]]]:
+    """Load the watch lists of all endpoints from QSettings."""
+    try:
+        settings = json.loads(QSettings().value("watch_lists", "{}"))
+        if isinstance(settings, dict):
+            return settings
+    except (TypeError, ValueError) as ex:
+        logging.warning("Could not load the watch lists: %s", ex)
+    return {}
+
+
+def load_watch_lists(endpoint: str) -> Dict[str, List[WatchedNode]]:
+    """Load the watch lists of an endpoint."""
+    watch_lists = {}
+    for name, nodes in _load_all().get(endpoint, {}).items():
+        try:
+            watch_lists[name] = [WatchedNode(**values) for values in nodes]
+        except TypeError as ex:
+            logging.warning("Could not load the watch list %s: %s", name, ex)
+    return watch_lists
+
+
+def save_watch_list(endpoint: str, name: str,
+                    nodes: List[WatchedNode]) -> None:
+    """Save a watch list of an endpoint, replacing one of the same name."""
+    settings = _load_all()
+    settings.setdefault(endpoint, {})[name] = \
+        [node.to_dict() for node in nodes]
+    QSettings().setValue("watch_lists", json.dumps(settings))
+
+
+def remove_watch_list(endpoint: str, name: str) -> None:
+    """Remove a watch list of an endpoint."""
+    settings = _load_all()
+    lists = settings.get(endpoint, {})
+    lists.pop(name, None)
+    if not lists:
+        settings.pop(endpoint, None)
+    QSettings().setValue("watch_lists", json.dumps(settings))
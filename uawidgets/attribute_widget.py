@@ -1,26 +1,40 @@
 """Attribute Widget to control Attribute view and model."""
 import logging
-from typing import Optional, Dict, List
+from typing import Optional, Dict, List, Any
 
-from PyQt5.QtCore import QObject, QSettings, QModelIndex, pyqtSlot, Qt, QPoint
-from PyQt5.QtGui import QStandardItemModel, QStandardItem
+from PyQt5.QtCore import QObject, QSettings, QModelIndex, pyqtSlot, Qt, \
+    QPoint, QPersistentModelIndex
+from PyQt5.QtGui import QStandardItemModel
 from PyQt5.QtWidgets import QTreeView, QHeaderView, QMenu, QApplication
 from asyncua.common.ua_utils import val_to_string
 from asyncua.sync import Node
 from asyncua.ua import DataValue, AttributeIds, VariantType, Argument
 
+from uawidgets.model_merge import RowData, merge_rows, clear_highlights
+
+
+# the name and DataType columns cannot be edited
+READONLY = (0, 2)
+
 
 class AttributeWidget(QObject):
     """Controller for the AttributeView."""
 
     LABELS = ['Attribute', 'Value', 'DataType']
 
-    def __init__(self, view: QTreeView, parent: QObject = None):
+    def __init__(self, view: QTreeView, parent: QObject = None,
+                 data_types: Any = None):
         """Create a new AttributeWidget controller for view and model."""
         super(AttributeWidget, self).__init__(parent)
 
         self._current_node = Optional[Node]
 
+        # optional registry resolving DataType NodeIds to names
+        self._data_types = data_types
+
+        # cells highlighted because they changed during the last refresh
+        self._changed: List[QPersistentModelIndex] = []
+
         self._view = view
         self._model = QStandardItemModel()
         self._model.setHorizontalHeaderLabels(AttributeWidget.LABELS)
@@ -62,6 +76,8 @@ class AttributeWidget(QObject):
     @pyqtSlot(QModelIndex, name="item_expanded")
     def item_expanded(self, index: QModelIndex) -> None:
         """Handle an item being expanded."""
+        if not self._model.hasChildren(index.siblingAtColumn(0)):
+            return
         index = index.siblingAtColumn(1)
         item = self._model.itemFromIndex(index)
         item.setText("")
@@ -76,92 +92,101 @@ class AttributeWidget(QObject):
     def show_attributes(self, node: Node) -> None:
         """Show the attributes for the given Node."""
         logging.debug("Showing attributes for Node: %s", node)
+        if node and node == self._current_node and self._model.rowCount():
+            self._merge_attr_rows(self._get_all_attributes())
+            return
         self.clear()
         self._current_node = node
         if node:
             for attr, value in sorted(self._get_all_attributes().items(),
                                       key=lambda x: x[0].name):
-                self._model.appendRow(self._get_attr_rows(attr, value))
-
-    def _get_attr_rows(self, attr: AttributeIds, value: DataValue)\
-            -> List[QStandardItem]:
-        """Return a row of QStandardItems representing an Attribute."""
+                self._model.appendRow(
+                    self._get_attr_row(attr, value).to_items())
+
+    def update_attribute(self, node: Node, attr: AttributeIds,
+                         value: DataValue) -> None:
+        """Update the cells of a shown attribute in place."""
+        if node != self._current_node:
+            # notification for a node that is no longer shown
+            return
+        self._merge_attr_rows({attr: value}, remove_obsolete=False)
+
+    def _merge_attr_rows(self, attributes: Dict[AttributeIds, DataValue],
+                         remove_obsolete: bool = True) -> None:
+        """Update the shown rows to the given attribute values in place."""
+        clear_highlights(self._changed)
+        rows = [self._get_attr_row(attr, value)
+                for attr, value in attributes.items()]
+        merge_rows(self._view, self._model.invisibleRootItem(), rows,
+                   self._changed, remove_obsolete)
+
+    def get_live_attributes(self) -> List[AttributeIds]:
+        """Return the attributes to monitor while the view is live."""
+        names = QSettings().value("attrs_widget_live_attributes", ["Value"])
+        if isinstance(names, str):
+            names = [names]
+        return [AttributeIds[name] for name in names]
+
+    def _get_attr_row(self, attr: AttributeIds, value: DataValue)\
+            -> RowData:
+        """Return the row representing an Attribute."""
         logging.debug("Generating row for attr %s and value %s", attr, value)
-        name_item = QStandardItem(attr.name)
-        name_item.setEditable(False)
-        if attr == AttributeIds.Value:
-            for row in self._get_value_rows(attr, value):
-                name_item.appendRow(row)
-        value_item = QStandardItem(val_to_string(value))
-        value_item.setData(value.Value.Value, Qt.UserRole)
-        type_item = QStandardItem(value.Value.VariantType.name)
-        type_item.setEditable(False)
-        return [name_item, value_item, type_item]
+        children = self._get_value_rows(attr, value) \
+            if attr == AttributeIds.Value else None
+        return RowData([attr.name, self._value_to_string(attr, value),
+                        value.Value.VariantType.name],
+                       [None, value.Value.Value, None], READONLY, children)
+
+    def _value_to_string(self, attr: AttributeIds, value: DataValue) -> str:
+        """Return the text shown for the value of an attribute."""
+        if attr == AttributeIds.DataType and self._data_types is not None:
+            return self._data_types.get_name(value.Value.Value)
+        return val_to_string(value)
 
     def _get_value_rows(self, attr: AttributeIds, value: DataValue)\
-            -> List[List[QStandardItem]]:
-        """Return a list of rows of QStandardItems representing a Value."""
-        rows = []
-        name_item = QStandardItem(attr.name)
-        name_item.setEditable(False)
+            -> List[RowData]:
+        """Return the rows representing a Value and its timestamps."""
         if isinstance(value.Value.Value, list):
-            for row in self._get_list_rows(value):
-                name_item.appendRow(row)
+            children = self._get_list_rows(value)
         elif value.Value.VariantType == VariantType.ExtensionObject:
-            for row in self._get_extension_rows(value.Value.Value):
-                name_item.appendRow(row)
-        value_item = QStandardItem(val_to_string(value))
-        value_item.setData(value, Qt.UserRole)
-        type_item = QStandardItem(value.Value.VariantType.name)
-        type_item.setEditable(False)
-        rows.append([name_item, value_item, type_item])
-        return [*rows, *self._get_timestamp_rows(value)]
+            children = self._get_extension_rows(value.Value.Value)
+        else:
+            children = None
+        row = RowData([attr.name, val_to_string(value),
+                       value.Value.VariantType.name],
+                      [None, value, None], READONLY, children)
+        return [row, *self._get_timestamp_rows(value)]
 
     @staticmethod
-    def _get_timestamp_rows(value: DataValue) -> List[List[QStandardItem]]:
+    def _get_timestamp_rows(value: DataValue) -> List[RowData]:
         """Return the rows representing server and source timestamp."""
+        return [RowData([name, str(t_value), VariantType.DateTime.name],
+                        readonly=READONLY)
+                for name, t_value in (
+                    ("Server Timestamp", value.ServerTimestamp),
+                    ("Source Timestamp", value.SourceTimestamp))]
+
+    def _get_list_rows(self, value: DataValue) -> List[RowData]:
+        """Return the rows representing the elements of a list."""
         rows = []
-        for name, t_value in (("Server Timestamp", value.ServerTimestamp),
-                              ("Source Timestamp", value.SourceTimestamp)):
-            d_str = VariantType.DateTime.name
-            name_item = QStandardItem(name)
-            name_item.setEditable(False)
-            value_item = QStandardItem(str(t_value))
-            type_item = QStandardItem(d_str)
-            type_item.setEditable(False)
-            rows.append([name_item, value_item, type_item])
-        return rows
-
-    def _get_list_rows(self, value: DataValue)\
-            -> List[List[QStandardItem]]:
-        """Return a list of rows of QStandardItems representing a list."""
-        rows = []
-        for val in value.Value.Value:
-            name_item = QStandardItem(str(value.Value.Value.index(val)))
-            name_item.setEditable(False)
-            if value.Value.VariantType == VariantType.ExtensionObject:
-                for row in self._get_extension_rows(val):
-                    name_item.appendRow(row)
-            value_item = QStandardItem(str(val))
-            value_item.setData(value.Value.Value, Qt.UserRole)
-            type_item = QStandardItem(value.Value.VariantType.name)
-            type_item.setEditable(False)
-            rows.append([name_item, value_item, type_item])
+        for idx, val in enumerate(value.Value.Value):
+            children = self._get_extension_rows(val) \
+                if value.Value.VariantType == VariantType.ExtensionObject \
+                else None
+            rows.append(RowData([str(idx), str(val),
+                                 value.Value.VariantType.name],
+                                [None, value.Value.Value, None], READONLY,
+                                children))
         return rows
 
     @staticmethod
-    def _get_extension_rows(value: Argument)-> List[List[QStandardItem]]:
-        """Return a list of rows of QStandardItems for an ExtensionObject."""
+    def _get_extension_rows(value: Argument) -> List[RowData]:
+        """Return the rows representing the members of an ExtensionObject."""
         rows = []
         for arg_name, arg_type in value.ua_types:
-            name_item = QStandardItem(arg_name)
-            name_item.setEditable(False)
             attr_val = getattr(value, arg_name)
-            value_item = QStandardItem(val_to_string(attr_val))
-            value_item.setData(attr_val, Qt.UserRole)
-            type_item = QStandardItem(arg_type)
-            type_item.setEditable(False)
-            rows.append([name_item, value_item, type_item])
+            rows.append(RowData([arg_name, val_to_string(attr_val), arg_type],
+                                [None, attr_val, None], READONLY))
         return rows
 
     def _get_all_attributes(self) -> Dict[AttributeIds, DataValue]:
@@ -174,7 +199,7 @@ class AttributeWidget(QObject):
 
     def clear(self) -> None:
         """Clear the model data."""
-        # Todo: This is probably not efficient, refactor
+        self._changed.clear()
         self._model.removeRows(0, self._model.rowCount())
 
     def _load_state(self) -> None:
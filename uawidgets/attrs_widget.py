@@ -1,7 +1,8 @@
 import logging
+from functools import lru_cache
 
 from PyQt5.QtCore import pyqtSignal, Qt, QObject, QSettings
-from PyQt5.QtGui import QStandardItemModel, QStandardItem
+from PyQt5.QtGui import QStandardItemModel
 from PyQt5.QtWidgets import QApplication, QMenu, QAction, QStyledItemDelegate, QComboBox, QVBoxLayout, QCheckBox, QDialog, QAbstractItemView
 
 from asyncua.sync import ua
@@ -9,6 +10,7 @@ from asyncua.sync import Node
 from asyncua.common.ua_utils import string_to_val, val_to_string, data_type_to_string
 
 from uawidgets.get_node_dialog import GetNodeButton
+from uawidgets.model_merge import RowData, merge_rows, clear_highlights
 
 
 logger = logging.getLogger(__name__)
@@ -79,10 +81,12 @@ class AttrsWidget(QObject):
     error = pyqtSignal(Exception)
     attr_written = pyqtSignal(ua.AttributeIds, ua.DataValue)
 
-    def __init__(self, view, show_timestamps=True):
+    def __init__(self, view, show_timestamps=True, data_types=None):
         QObject.__init__(self, view)
         self.view = view
         self._timestamps = show_timestamps
+        # optional registry resolving DataType NodeIds without server queries
+        self.data_types = data_types
         delegate = MyDelegate(self.view, self)
         delegate.error.connect(self.error.emit)
         delegate.attr_written.connect(self.attr_written.emit)
@@ -90,6 +94,8 @@ class AttrsWidget(QObject):
         self.view.setItemDelegate(delegate)
         self.model = QStandardItemModel()
         self.model.setHorizontalHeaderLabels(['Attribute', 'Value', 'DataType'])
+        # cells highlighted because they changed during the last reload
+        self._changed = []
         state = self.settings.value("WindowState/attrs_widget_state", None)
         if state is not None:
             self.view.header().restoreState(state)
@@ -142,35 +148,44 @@ class AttrsWidget(QObject):
 
     def clear(self):
         # remove all rows but not header!!
+        self._changed = []
         self.model.removeRows(0, self.model.rowCount())
 
     def reload(self):
-        self.show_attrs(self.current_node)
+        if not self.current_node or not self.model.rowCount():
+            self.show_attrs(self.current_node)
+            return
+        # only apply the differences to the model so expanded arrays and
+        # structures stay expanded
+        clear_highlights(self._changed)
+        merge_rows(self.view, self.model.invisibleRootItem(), self._get_attr_rows(), self._changed)
 
     def show_attrs(self, node):
         self.current_node = node
         self.clear()
         if self.current_node:
-            self._show_attrs()
+            for row in self._get_attr_rows():
+                self.model.appendRow(row.to_items())
         self.view.expandToDepth(0)
 
-    def _show_attrs(self):
+    def _get_attr_rows(self):
+        rows = []
         attrs = self.get_all_attrs()
         for attr, dv in attrs:
             try:
                 # try/except to show as many attributes as possible
                 if attr == ua.AttributeIds.Value:
-                    self._show_value_attr(attr, dv)
+                    rows.append(self._get_value_attr_row(attr, dv))
                 else:
-                    self._show_attr(attr, dv)
+                    rows.append(self._get_attr_row(attr, dv))
             except Exception as ex:
                 logger.exception("Exception while displaying attribute %s with value %s for node %s", attr, dv, self.current_node)
                 self.error.emit(ex)
+        return rows
 
-    def _show_attr(self, attr, dv):
+    def _get_attr_row(self, attr, dv):
         if attr == ua.AttributeIds.DataType:
-            # FIXME: Could query for browsename here, it does not cost much
-            string = data_type_to_string(dv.Value.Value)
+            string = self.data_type_to_string(dv.Value.Value)
         elif attr in (ua.AttributeIds.AccessLevel,
                       ua.AttributeIds.UserAccessLevel,
                       ua.AttributeIds.WriteMask,
@@ -179,67 +194,57 @@ class AttrsWidget(QObject):
             string = enum_to_string(attr, dv.Value.Value)
         else:
             string = val_to_string(dv.Value.Value)
-        name_item = QStandardItem(attr.name)
-        vitem = QStandardItem(string)
-        vitem.setData(AttributeData(attr, dv.Value.Value, dv.Value.VariantType), Qt.UserRole)
-        self.model.appendRow([name_item, vitem, QStandardItem(dv.Value.VariantType.name)])
-
-    def _show_value_attr(self, attr, dv):
-        name_item = QStandardItem("Value")
-        vitem = QStandardItem()
-        items = self._show_val(name_item, None, "Value", dv.Value.Value, dv.Value.VariantType)
-        items[1].setData(AttributeData(attr, dv.Value.Value, dv.Value.VariantType), Qt.UserRole)
-        row = [name_item, vitem, QStandardItem(dv.Value.VariantType.name)]
-        self.model.appendRow(row)
-        self._show_timestamps(name_item, dv)
-
-    def _show_val(self, parent, obj, name, val, vtype):
-        name_item = QStandardItem(name)
-        vitem = QStandardItem()
-        vitem.setText(val_to_string(val))
-        vitem.setData(MemberData(obj, name, val, vtype), Qt.UserRole)
-        row = [name_item, vitem, QStandardItem(vtype.name)]
+        data = AttributeData(attr, dv.Value.Value, dv.Value.VariantType)
+        return RowData([attr.name, string, dv.Value.VariantType.name], [None, data, None])
+
+    def data_type_to_string(self, dtype):
+        if self.data_types is None:
+            return data_type_to_string(dtype)
+        return self.data_types.get_name(dtype)
+
+    def _get_value_attr_row(self, attr, dv):
+        row = self._get_val_row(None, "Value", dv.Value.Value, dv.Value.VariantType)
+        row.data[1] = AttributeData(attr, dv.Value.Value, dv.Value.VariantType)
+        children = [row, *self._get_timestamp_rows(dv)]
+        return RowData(["Value", "", dv.Value.VariantType.name], children=children)
+
+    def _get_val_row(self, obj, name, val, vtype):
+        row = RowData([name, val_to_string(val), vtype.name], [None, MemberData(obj, name, val, vtype), None])
         # if we have a list or extension object we display children
         if isinstance(val, list):
-            row[2].setText("List of " + vtype.name)
-            self._show_list(name_item, val, vtype)
+            row.texts[2] = "List of " + vtype.name
+            row.children = self._get_list_rows(val, vtype)
         elif vtype == ua.VariantType.ExtensionObject:
-            self._show_ext_obj(name_item, val)
-        parent.appendRow(row)
+            self._add_ext_obj_rows(row, val)
         return row
 
-    def _show_list(self, parent, mylist, vtype):
+    def _get_list_rows(self, mylist, vtype):
+        rows = []
         for idx, val in enumerate(mylist):
-            name_item = QStandardItem(str(idx))
-            vitem = QStandardItem()
-            vitem.setText(val_to_string(val))
-            vitem.setData(ListData(mylist, idx, val, vtype), Qt.UserRole)
-            row = [name_item, vitem, QStandardItem(vtype.name)]
-            parent.appendRow(row)
+            row = RowData([str(idx), val_to_string(val), vtype.name], [None, ListData(mylist, idx, val, vtype), None])
             if vtype == ua.VariantType.ExtensionObject:
-                self._show_ext_obj(name_item, val)
-    
+                self._add_ext_obj_rows(row, val)
+            rows.append(row)
+        return rows
+
     def refresh_list(self, parent, mylist, vtype):
         while parent.hasChildren():
             self.model.removeRow(0, parent.index())
-        self._show_list(parent, mylist, vtype)
+        for row in self._get_list_rows(mylist, vtype):
+            parent.appendRow(row.to_items())
 
-    def _show_ext_obj(self, item, val):
-        item.setText(item.text() + ": " + val.__class__.__name__)
+    def _add_ext_obj_rows(self, row, val):
+        row.texts[0] += ": " + val.__class__.__name__
         for att_name, att_type in val.ua_types:
             member_val = getattr(val, att_name)
             if att_type.startswith("ListOf"):
                 att_type = att_type[6:]
             attr = getattr(ua.VariantType, att_type)
-            self._show_val(item, val, att_name, member_val, attr)
+            row.children.append(self._get_val_row(val, att_name, member_val, attr))
 
-    def _show_timestamps(self, item, dv):
-        #while item.hasChildren():
-            #self.model.removeRow(0, item.index())
-        string = val_to_string(dv.ServerTimestamp)
-        item.appendRow([QStandardItem("Server Timestamp"), QStandardItem(string), QStandardItem(ua.VariantType.DateTime.name)])
-        string = val_to_string(dv.SourceTimestamp)
-        item.appendRow([QStandardItem("Source Timestamp"), QStandardItem(string), QStandardItem(ua.VariantType.DateTime.name)])
+    def _get_timestamp_rows(self, dv):
+        return [RowData(["Server Timestamp", val_to_string(dv.ServerTimestamp), ua.VariantType.DateTime.name]),
+                RowData(["Source Timestamp", val_to_string(dv.SourceTimestamp), ua.VariantType.DateTime.name])]
 
 
     def get_all_attrs(self):
@@ -371,7 +376,7 @@ class MyDelegate(QStyledItemDelegate):
             text = editor.currentText()
         elif data.attr == ua.AttributeIds.DataType:
             data.value = editor.get_node().nodeid
-            text = data_type_to_string(data.value)
+            text = self.attrs_widget.data_type_to_string(data.value)
         elif data.attr in (ua.AttributeIds.AccessLevel,
                            ua.AttributeIds.UserAccessLevel,
                            ua.AttributeIds.WriteMask,
@@ -411,6 +416,7 @@ def attr_to_enum(attr):
     return getattr(ua, attr_name)
 
 
+@lru_cache(maxsize=1024)
 def enum_to_string(attr, val):
     attr_enum = attr_to_enum(attr)
     string = ", ".join([e.name for e in attr_enum.parse_bitfield(val)])
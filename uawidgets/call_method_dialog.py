@@ -7,11 +7,13 @@ from asyncua.sync import ua
 
 
 class CallMethodDialog(QDialog):
-    def __init__(self, parent, server, node):
+    def __init__(self, parent, server, node, data_types=None):
         QDialog.__init__(self, parent)
         self.setWindowTitle("UA Method Call")
         self.server = server
         self.node = node
+        # optional registry resolving DataType NodeIds without server queries
+        self.data_types = data_types
 
         self.vlayout = QVBoxLayout(self)
         self.layout = QHBoxLayout()
@@ -23,6 +25,7 @@ class CallMethodDialog(QDialog):
         try:
             inputs = node.get_child("0:InputArguments")
             args = inputs.get_value()
+            self._preload_data_types(args)
             for arg in args:
                 self._add_input(arg)
         except ua.UaError as ex:
@@ -38,6 +41,7 @@ class CallMethodDialog(QDialog):
         try:
             outputs = node.get_child("0:OutputArguments")
             args = outputs.get_value()
+            self._preload_data_types(args)
             for arg in args:
                 self._add_output(arg)
         except ua.UaError as ex:
@@ -63,7 +67,7 @@ class CallMethodDialog(QDialog):
         parent = self.node.get_parent()
         args = []
         for inp in self.inputs:
-            val = string_to_variant(inp.text(), data_type_to_variant_type(inp.data_type))
+            val = string_to_variant(inp.text(), self._data_type_to_variant_type(inp.data_type))
             args.append(val)
 
         result = call_method_full(parent, self.node, *args)
@@ -72,21 +76,36 @@ class CallMethodDialog(QDialog):
         for idx, res in enumerate(result.OutputArguments):
             self.outputs[idx].setText(val_to_string(res))
 
+    def _preload_data_types(self, args):
+        if self.data_types is not None:
+            # resolve the names of all arguments with a single request
+            self.data_types.get_names([arg.DataType for arg in args])
+
+    def _data_type_to_string(self, dtype):
+        if self.data_types is None:
+            return data_type_to_string(dtype)
+        return self.data_types.get_name(dtype)
+
+    def _data_type_to_variant_type(self, dtype):
+        if self.data_types is None:
+            return data_type_to_variant_type(self.server.get_node(dtype))
+        return self.data_types.get_variant_type(dtype)
+
     def _add_input(self, arg):
         layout = QHBoxLayout()
         self.vlayout.addLayout(layout)
         layout.addWidget(QLabel("Name:{}".format(arg.Name), self))
-        layout.addWidget(QLabel("Data type:{}".format(data_type_to_string(arg.DataType)), self))
+        layout.addWidget(QLabel("Data type:{}".format(self._data_type_to_string(arg.DataType)), self))
         layout.addWidget(QLabel("Description:{}".format(arg.Description.Text), self))
         lineedit = QLineEdit(self)
-        lineedit.data_type = self.server.get_node(arg.DataType)
+        lineedit.data_type = arg.DataType
         self.inputs.append(lineedit)
         layout.addWidget(lineedit)
 
     def _add_output(self, arg):
         layout = QHBoxLayout()
         self.vlayout.addLayout(layout)
-        layout.addWidget(QLabel("Data Type: {}".format(data_type_to_string(arg.DataType))))
+        layout.addWidget(QLabel("Data Type: {}".format(self._data_type_to_string(arg.DataType))))
         layout.addWidget(QLabel("Value:"))
         label = QLabel("", self)
         self.outputs.append(label)
@@ -0,0 +1,133 @@
+"""Helpers to update the rows of a QStandardItemModel in place."""
+from typing import Any, Dict, List, Optional, Sequence
+
+from PyQt5.QtCore import Qt, QPersistentModelIndex, QModelIndex
+from PyQt5.QtGui import QStandardItem, QBrush, QColor
+from PyQt5.QtWidgets import QTreeView
+
+
+# background of cells whose text changed during the last merge (tango butter)
+HIGHLIGHT_BRUSH = QBrush(QColor("#fce94f"))
+
+
+class RowData:
+    """
+    Texts and Qt.UserRole data of the cells of a row and its child rows.
+
+    Rows are generated as RowData so merge_rows can compare them with the
+    model without creating QStandardItems, which are only made for rows
+    that are new to the model. Columns listed in readonly are not editable.
+    """
+
+    __slots__ = ("texts", "data", "readonly", "children")
+
+    def __init__(self, texts: List[str], data: Optional[List[Any]] = None,
+                 readonly: Sequence[int] = (),
+                 children: Optional[List["RowData"]] = None) -> None:
+        self.texts = texts
+        self.data = data if data is not None else [None] * len(texts)
+        self.readonly = readonly
+        self.children = children if children is not None else []
+
+    def to_items(self) -> List[QStandardItem]:
+        """Return new QStandardItems for the row and its children."""
+        items = [QStandardItem(text) for text in self.texts]
+        for col, data in enumerate(self.data):
+            if data is not None:
+                items[col].setData(data, Qt.UserRole)
+        for col in self.readonly:
+            items[col].setEditable(False)
+        for child in self.children:
+            items[0].appendRow(child.to_items())
+        return items
+
+
+def clear_highlights(changed: List[QPersistentModelIndex]) -> None:
+    """Remove the highlight of the cells changed by a previous merge."""
+    for index in changed:
+        if index.isValid():
+            index.model().setData(QModelIndex(index), None, Qt.BackgroundRole)
+    changed.clear()
+
+
+def merge_rows(view: QTreeView, parent: QStandardItem, rows: List[RowData],
+               changed: List[QPersistentModelIndex],
+               remove_obsolete: bool = True) -> None:
+    """
+    Merge freshly generated rows into the children of parent.
+
+    Rows are matched by the text of their first column, rows sharing a
+    name in their order, so the existing items and therefore the expansion
+    state and sorting of the view are kept. The Qt.UserRole data of every
+    matched cell is updated, cells whose text differs are also highlighted
+    and their indexes appended to changed. Rows not in the model yet are
+    appended, children of parent missing in rows are removed unless
+    remove_obsolete is False.
+    """
+    count = parent.rowCount()
+    # built on the first row not found at its own position
+    positions: Optional[Dict[str, List[int]]] = None
+    matched = [False] * count
+    for pos, row in enumerate(rows):
+        name = row.texts[0]
+        idx = -1
+        if pos < count and not matched[pos] \
+                and parent.child(pos, 0).text() == name:
+            idx = pos
+        else:
+            if positions is None:
+                positions = {}
+                for other in range(count):
+                    positions.setdefault(
+                        parent.child(other, 0).text(), []).append(other)
+            for other in positions.get(name, ()):
+                if not matched[other]:
+                    idx = other
+                    break
+        if idx < 0:
+            parent.appendRow(row.to_items())
+            continue
+        matched[idx] = True
+        name_item = parent.child(idx, 0)
+        _merge_cells(view, parent, idx, row, changed)
+        if row.children or name_item.hasChildren():
+            merge_rows(view, name_item, row.children, changed)
+    if not remove_obsolete:
+        return
+    # remove the rows left over in contiguous ranges from the end
+    end = count
+    while end > 0:
+        if matched[end - 1]:
+            end -= 1
+            continue
+        start = end - 1
+        while start > 0 and not matched[start - 1]:
+            start -= 1
+        parent.removeRows(start, end - start)
+        end = start
+
+
+def _merge_cells(view: QTreeView, parent: QStandardItem, idx: int,
+                 row: RowData, changed: List[QPersistentModelIndex]) -> None:
+    """Update the cells after the first column of a matched row."""
+    name_item = parent.child(idx, 0)
+    for col in range(1, len(row.texts)):
+        old = parent.child(idx, col)
+        if old is None:
+            old = QStandardItem()
+            parent.setChild(idx, col, old)
+        data = row.data[col]
+        old_data = old.data(Qt.UserRole)
+        # setting data notifies the views, so equal values are skipped
+        if old_data is not data and (type(old_data) is not type(data)
+                                     or old_data != data):
+            old.setData(data, Qt.UserRole)
+        text = row.texts[col]
+        if old.text() == text:
+            continue
+        if col == 1 and row.children and view.isExpanded(name_item.index()):
+            # expanded rows do not show their value, the children do
+            continue
+        old.setText(text)
+        old.setData(HIGHLIGHT_BRUSH, Qt.BackgroundRole)
+        changed.append(QPersistentModelIndex(old.index()))
@@ -1,9 +1,12 @@
+import heapq
 import logging
 from copy import copy
 
-from PyQt5.QtCore import pyqtSignal, QObject, QSettings, Qt
-from PyQt5.QtGui import QStandardItemModel, QStandardItem
-from PyQt5.QtWidgets import QMenu, QAction, QStyledItemDelegate, QAbstractItemView
+from PyQt5.QtCore import pyqtSignal, QObject, QSettings, Qt, \
+    QAbstractTableModel, QModelIndex
+from PyQt5.QtGui import QBrush, QColor, QFont
+from PyQt5.QtWidgets import QMenu, QAction, QStyledItemDelegate, QAbstractItemView, \
+    QActionGroup
 
 from asyncua.sync import ua, Node
 
@@ -12,31 +15,45 @@ from uawidgets.get_node_dialog import GetNodeTextButton
 
 logger = logging.getLogger(__name__)
 
+# background of references that are staged but not yet written (tango chameleon)
+STAGED_BRUSH = QBrush(QColor("#8ae234"))
+
 
 class RefsWidget(QObject):
 
     error = pyqtSignal(Exception)
     reference_changed = pyqtSignal(Node)
 
-    def __init__(self, view):
+    # number of references requested per Browse or BrowseNext
+    PAGE_SIZE = 1000
+
+    def __init__(self, view, display_names=None, reference_index=None):
         self.view = view
         QObject.__init__(self, view)
-        self.model = QStandardItemModel()
+        self.model = RefsModel(self, self._get_name)
+        # optional cache resolving NodeIds to DisplayNames in bulk
+        self._display_names = display_names
+        # optional ReferenceIndex every browsed page is added to
+        self._reference_index = reference_index
 
         delegate = MyDelegate(self.view, self)
         delegate.error.connect(self.error.emit)
-        delegate.reference_changed.connect(self.reference_changed.emit)
         self.view.setEditTriggers(QAbstractItemView.DoubleClicked)
         self.view.setModel(self.model)
         self.view.setItemDelegate(delegate)
         self.settings = QSettings()
-        self.model.setHorizontalHeaderLabels(['ReferenceType', 'NodeId', "BrowseName", "TypeDefinition"])
+        # keep the order of the server until a column is clicked
+        self.view.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)
         state = self.settings.value("WindowState/refs_widget_state", None)
         if state is not None:
             self.view.horizontalHeader().restoreState(state)
+        self.view.setSortingEnabled(True)
         self.view.horizontalHeader().setSectionResizeMode(0)
         self.view.horizontalHeader().setStretchLastSection(True)
         self.node = None
+        # ReferenceTypeId and IncludeSubtypes sent with every Browse
+        self._reftype = ua.NodeId(ua.ObjectIds.References)
+        self._include_subtypes = True
 
         self.reloadAction = QAction("Reload", self.model)
         self.reloadAction.triggered.connect(self.reload)
@@ -44,6 +61,13 @@ class RefsWidget(QObject):
         self.addRefAction.triggered.connect(self.add_ref)
         self.removeRefAction = QAction("Remove Reference", self.model)
         self.removeRefAction.triggered.connect(self.remove_ref)
+        self.batchEditAction = QAction("Batch Edit", self.model)
+        self.batchEditAction.setCheckable(True)
+        self.batchEditAction.toggled.connect(self._batch_edit_toggled)
+        self.applyAction = QAction("Apply Changes", self.model)
+        self.applyAction.triggered.connect(self.apply_changes)
+        self.discardAction = QAction("Discard Changes", self.model)
+        self.discardAction.triggered.connect(self.discard_changes)
 
         self.view.setContextMenuPolicy(Qt.CustomContextMenu)
         self.view.customContextMenuRequested.connect(self.showContextMenu)
@@ -52,6 +76,12 @@ class RefsWidget(QObject):
         self._contextMenu.addSeparator()
         self._contextMenu.addAction(self.addRefAction)
         self._contextMenu.addAction(self.removeRefAction)
+        self._contextMenu.addSeparator()
+        self._contextMenu.addAction(self.batchEditAction)
+        self._contextMenu.addAction(self.applyAction)
+        self._contextMenu.addAction(self.discardAction)
+        self._contextMenu.addSeparator()
+        self._filterMenu = self._contextMenu.addMenu("Show Reference Types")
 
     def showContextMenu(self, position):
         if not self.node:
@@ -60,13 +90,39 @@ class RefsWidget(QObject):
         idx = self.view.currentIndex()
         if idx.isValid():
             self.removeRefAction.setEnabled(True)
+        self.applyAction.setEnabled(self.model.has_changes())
+        self.discardAction.setEnabled(self.model.has_changes())
+        self._update_filter_menu()
         self._contextMenu.exec_(self.view.viewport().mapToGlobal(position))
 
+    def _update_filter_menu(self):
+        """List the reference types of the loaded references to filter by."""
+        self._filterMenu.clear()
+        group = QActionGroup(self._filterMenu)
+        current = self.model.get_type_filter()
+        for reftype in [None, *self.model.get_reference_types()]:
+            name = "All" if reftype is None else self._get_name(reftype)
+            action = self._filterMenu.addAction(name)
+            action.setCheckable(True)
+            action.setChecked(reftype == current)
+            action.setActionGroup(group)
+            action.triggered.connect(
+                lambda _, reftype=reftype: self.model.set_type_filter(reftype))
+
     def clear(self):
-        # remove all rows but not header!!
-        self.model.removeRows(0, self.model.rowCount())
+        if self.model.has_changes():
+            logger.warning("Discarding unapplied reference changes of %s", self.node)
+        self._release_continuation_point()
+        self.model.clear()
         self.node = None
 
+    def set_reference_filter(self, reftype, include_subtypes=True):
+        """Let the server only send references of the given type."""
+        self._reftype = reftype
+        self._include_subtypes = include_subtypes
+        if self.node is not None:
+            self.reload()
+
     def _make_default_ref(self):
         #FIXME: remeber last choosen values or use values that make sense
         ref = ua.ReferenceDescription()
@@ -75,8 +131,9 @@ class RefsWidget(QObject):
     def add_ref(self):
         ref = self._make_default_ref()
         logger.info("Adding ref: %s", ref)
-        self._add_ref_row(ref)
-        idx = self.model.index(self.model.rowCount() - 1, 0)
+        self.model.set_type_filter(None)
+        self.model.stage_add(ref)
+        idx = self.model.index(self.model.get_row(ref), 0)
         self.view.setCurrentIndex(idx)
         #self.view.edit(idx)
 
@@ -89,26 +146,124 @@ class RefsWidget(QObject):
         idx = self.view.currentIndex()
         if not idx.isValid():
             logger.warning("No valid reference selected to remove")
-        idx = idx.sibling(idx.row(), 0)
-        item = self.model.itemFromIndex(idx)
-        ref = item.data(Qt.UserRole)
-        self.do_remove_ref(ref)
-        self.reload()
-    
-    def do_remove_ref(self, ref, check=True):
-        logger.info("Removing: %s", ref)
+            return
+        rows = {index.row() for index in self.view.selectionModel().selectedRows()}
+        rows.add(idx.row())
+        self.model.stage_delete(sorted(rows))
+        self._apply_unless_batch()
+
+    def edit_ref(self, row, ref):
+        """Replace the reference shown in row by an edited copy."""
+        self.model.stage_edit(row, ref)
+        self._apply_unless_batch()
+
+    def _apply_unless_batch(self):
+        if not self.batchEditAction.isChecked():
+            self.apply_changes()
+
+    def _batch_edit_toggled(self, checked):
+        if not checked and self.model.has_changes():
+            self.apply_changes()
+
+    def discard_changes(self):
+        self.model.discard_changes()
+
+    def apply_changes(self):
+        """
+        Write all staged changes with one DeleteReferences and one
+        AddReferences request and patch the affected rows.
+
+        An edit deletes the original reference and adds the edited copy,
+        which is only added once the original is deleted. If adding the
+        copy fails the original is added again, if that fails too the
+        copy stays staged.
+        """
+        added, deleted = self.model.get_changes()
+        incomplete = [ref_idx for ref_idx, ref in added
+                      if ref.NodeId.is_null() or ref.ReferenceTypeId.is_null()]
+        if incomplete:
+            logger.info("Do not save %s references yet. Need NodeId and ReferenceTypeId to be set",
+                        len(incomplete))
+        added = [(ref_idx, ref) for ref_idx, ref in added if ref_idx not in incomplete]
+        errors = []
+        try:
+            deleted_ok = self._write_changes(
+                "delete_references", [self._make_delete_item(ref) for _, ref in deleted],
+                [ref_idx for ref_idx, _ in deleted], errors)
+            # edits whose original is still on the server are not added
+            added = [(ref_idx, ref) for ref_idx, ref in added
+                     if not self.model.is_edited(ref_idx) or ref_idx in deleted_ok]
+            added_ok = self._write_changes(
+                "add_references", [self._make_add_item(ref) for _, ref in added],
+                [ref_idx for ref_idx, _ in added], errors)
+            failed = [ref_idx for ref_idx, _ in added
+                      if self.model.is_edited(ref_idx) and ref_idx not in added_ok]
+            restored = self._write_changes(
+                "add_references",
+                [self._make_add_item(self.model.get_original(ref_idx)) for ref_idx in failed],
+                failed, errors)
+        except Exception as ex:
+            self.error.emit(ex)
+            return
+        lost = [ref_idx for ref_idx in failed if ref_idx not in restored]
+        if lost:
+            logger.error("%s edited references were deleted but neither the edit nor the original "
+                         "could be added, the edits stay staged", len(lost))
+            errors.insert(0, ua.UaError("{} references were deleted and could not be added again".format(
+                len(lost))))
+        self.model.commit_changes(added_ok, deleted_ok, restored)
+        if added_ok or deleted_ok:
+            self.reference_changed.emit(self.node)
+        if errors:
+            self.error.emit(errors[0])
+
+    def _write_changes(self, service, items, ref_idxs, errors):
+        """
+        Send items in a single request, return the succeeded ref_idxs.
+        Without a result per item the whole request counts as failed.
+        """
+        if not items:
+            return []
+        logger.info("Sending %s with %s items", service, len(items))
+        results = self._call_service(service, items)
+        if results is None or len(results) != len(items):
+            logger.warning("%s returned no result per item, assuming all %s failed",
+                           service, len(items))
+            errors.append(ua.UaError("{} returned {} results for {} items".format(
+                service, "no" if results is None else len(results), len(items))))
+            return []
+        succeeded = []
+        failed = 0
+        for ref_idx, item, result in zip(ref_idxs, items, results):
+            try:
+                result.check()
+            except Exception as ex:
+                logger.debug("%s failed for %s: %s", service, item, ex)
+                failed += 1
+                errors.append(ex)
+            else:
+                succeeded.append(ref_idx)
+        if failed:
+            logger.warning("%s failed for %s of %s items", service, failed, len(items))
+        return succeeded
+
+    def _make_delete_item(self, ref):
         it = ua.DeleteReferencesItem()
         it.SourceNodeId = self.node.nodeid
         it.ReferenceTypeId = ref.ReferenceTypeId
         it.IsForward = ref.IsForward
         it.TargetNodeId = ref.NodeId
         it.DeleteBidirectional = False
-        #param = ua.DeleteReferencesParameters()
-        #param.ReferencesToDelete.append(it)
-        results = self.node.server.delete_references([it])
-        logger.info("Remove result: %s", results[0]) 
-        if check:
-            results[0].check()
+        return it
+
+    def _make_add_item(self, ref):
+        it = ua.AddReferencesItem()
+        it.SourceNodeId = self.node.nodeid
+        it.ReferenceTypeId = ref.ReferenceTypeId
+        it.IsForward = ref.IsForward
+        it.TargetNodeId = ref.NodeId
+        it.TargetNodeClass = ref.NodeClass
+        return it
 
     def save_state(self):
         self.settings.setValue("WindowState/refs_widget_state", self.view.horizontalHeader().saveState())
@@ -118,42 +273,396 @@ class RefsWidget(QObject):
         self.node = node
         self._show_refs(node)
 
+    def _call_service(self, name, params):
+        """Call a service of the low level client of the current node."""
+        service = getattr(self.node.aio_obj.server, name)
+        return self.node.tloop.post(service(params))
+
     def _show_refs(self, node):
+        desc = ua.BrowseDescription()
+        desc.NodeId = node.nodeid
+        desc.BrowseDirection = ua.BrowseDirection.Forward
+        desc.ReferenceTypeId = self._reftype
+        desc.IncludeSubtypes = self._include_subtypes
+        desc.ResultMask = ua.BrowseResultMask.All
+        params = ua.BrowseParameters()
+        params.RequestedMaxReferencesPerNode = self.PAGE_SIZE
+        params.NodesToBrowse.append(desc)
         try:
-            refs = node.get_children_descriptions(refs=ua.ObjectIds.References)
+            self._add_page(self._call_service("browse", params)[0])
         except Exception as ex:
             self.error.emit(ex)
             raise
-        for ref in refs:
-            self._add_ref_row(ref)
-
-    def _add_ref_row(self, ref):
-        if ref.ReferenceTypeId.Identifier in ua.ObjectIdNames:
-            typename = ua.ObjectIdNames[ref.ReferenceTypeId.Identifier]
-        else:
-            typename = str(ref.ReferenceTypeId)
-        if ref.NodeId.NamespaceIndex == 0 and ref.NodeId.Identifier in ua.ObjectIdNames:
-            nodeid = ua.ObjectIdNames[ref.NodeId.Identifier]
-        else:
-            nodeid = ref.NodeId.to_string()
-        if ref.TypeDefinition.Identifier in ua.ObjectIdNames:
-            typedef = ua.ObjectIdNames[ref.TypeDefinition.Identifier]
-        else:
-            typedef = ref.TypeDefinition.to_string()
-        titem = QStandardItem(typename)
-        titem.setData(ref, Qt.UserRole)
-        self.model.appendRow([
-            titem,
-            QStandardItem(nodeid),
-            QStandardItem(ref.BrowseName.to_string()),
-            QStandardItem(typedef)
-        ])
+
+    def fetch_more(self):
+        """Load the next page of references of the current node."""
+        params = ua.BrowseNextParameters()
+        params.ContinuationPoints = [self.model.continuation_point]
+        self.model.continuation_point = None
+        try:
+            self._add_page(self._call_service("browse_next", params)[0])
+        except Exception as ex:
+            self.error.emit(ex)
+
+    def _add_page(self, result):
+        result.StatusCode.check()
+        if self._reference_index is not None:
+            self._reference_index.add(self.node.nodeid, result.References)
+        self._resolve_names(result.References)
+        self.model.continuation_point = result.ContinuationPoint or None
+        self.model.append_refs(result.References)
+
+    def _release_continuation_point(self):
+        """Tell the server the remaining references are not needed."""
+        if self.node is None or not self.model.continuation_point:
+            return
+        params = ua.BrowseNextParameters()
+        params.ReleaseContinuationPoints = True
+        params.ContinuationPoints = [self.model.continuation_point]
+        self.model.continuation_point = None
+        try:
+            self._call_service("browse_next", params)
+        except Exception as ex:
+            logger.warning("Could not release continuation point: %s", ex)
+
+    def _resolve_names(self, refs):
+        """Read the names of all types used by refs with one request."""
+        if self._display_names is None:
+            return
+        nodeids = [ref.ReferenceTypeId for ref in refs]
+        nodeids.extend(ref.TypeDefinition for ref in refs)
+        try:
+            self._display_names.get_names(nodeids)
+        except Exception as ex:
+            logger.warning("Could not resolve names of references: %s", ex)
+
+    def _get_name(self, nodeid):
+        if self._display_names is not None:
+            try:
+                return self._display_names.get_name(nodeid)
+            except Exception as ex:
+                logger.warning("Could not resolve name of %s: %s", nodeid, ex)
+        if nodeid.NamespaceIndex == 0 and nodeid.Identifier in ua.ObjectIdNames:
+            return ua.ObjectIdNames[nodeid.Identifier]
+        return nodeid.to_string()
+
+
+
+class RefsModel(QAbstractTableModel):
+    """
+    Table model holding the ReferenceDescriptions of a node.
+
+    Cells are formatted when they are first shown. Rows can be sorted and
+    filtered by reference type without browsing the node again, further
+    pages of a Browse are loaded when the view scrolls to the end.
+    """
+
+    HEADER_LABELS = ['ReferenceType', 'NodeId', "BrowseName", "TypeDefinition"]
+
+    def __init__(self, widget, get_name):
+        QAbstractTableModel.__init__(self, widget)
+        self._widget = widget
+        self._get_name = get_name
+        self._refs = []
+        # indexes into _refs of the shown rows, in their shown order
+        self._rows = []
+        # maps the indexes into _refs of the shown rows to their row
+        self._positions = {}
+        # formatted cells keyed by index into _refs and column
+        self._texts = {}
+        self._type_filter = None
+        self._sort_column = -1
+        self._sort_order = Qt.AscendingOrder
+        # continuation point of the Browse if more pages are available
+        self.continuation_point = None
+        # staged changes: indexes into _refs of references to add or to
+        # delete and the original of edited references, deleted when applied
+        self._added = set()
+        self._deleted = set()
+        self._originals = {}
+
+    def clear(self):
+        self.beginResetModel()
+        self._refs = []
+        self._rows = []
+        self._positions.clear()
+        self._texts.clear()
+        self._type_filter = None
+        self._added.clear()
+        self._deleted.clear()
+        self._originals.clear()
+        self.continuation_point = None
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADER_LABELS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return self.HEADER_LABELS[section]
+        return section + 1
+
+    def flags(self, idx):
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable | Qt.ItemIsEditable
+
+    def data(self, idx, role=Qt.DisplayRole):
+        if not idx.isValid():
+            return None
+        ref_idx = self._rows[idx.row()]
+        if role in (Qt.DisplayRole, Qt.EditRole):
+            return self._get_text(ref_idx, idx.column())
+        if role == Qt.UserRole:
+            return self._refs[ref_idx]
+        if role == Qt.FontRole and ref_idx in self._deleted:
+            font = QFont()
+            font.setStrikeOut(True)
+            return font
+        if role == Qt.BackgroundRole and ref_idx in self._added:
+            return STAGED_BRUSH
+        return None
+
+    def setData(self, idx, value, role=Qt.EditRole):
+        """Replace the ReferenceDescription of a row, texts follow it."""
+        if not idx.isValid() or role != Qt.UserRole:
+            return False
+        ref_idx = self._rows[idx.row()]
+        self._refs[ref_idx] = value
+        self._ref_changed(ref_idx)
+        return True
+
+    def _ref_changed(self, ref_idx):
+        """Forget the texts of a reference and update its row."""
+        for col in range(len(self.HEADER_LABELS)):
+            self._texts.pop((ref_idx, col), None)
+        row = self._positions.get(ref_idx)
+        if row is not None:
+            self.dataChanged.emit(self.index(row, 0),
+                                  self.index(row, len(self.HEADER_LABELS) - 1))
+
+    def has_changes(self):
+        return bool(self._added or self._deleted or self._originals)
+
+    def stage_add(self, ref):
+        self._added.add(len(self._refs))
+        self.append_refs([ref])
+
+    def stage_delete(self, rows):
+        """Mark the references in rows for deletion."""
+        dropped = []
+        for row in rows:
+            ref_idx = self._rows[row]
+            if ref_idx in self._originals:
+                # delete what is on the server, not the edited copy
+                self._refs[ref_idx] = self._originals.pop(ref_idx)
+            elif ref_idx in self._added:
+                # never written, simply forget it
+                dropped.append(ref_idx)
+                continue
+            self._added.discard(ref_idx)
+            self._deleted.add(ref_idx)
+            self._ref_changed(ref_idx)
+        self._added.difference_update(dropped)
+        self._remove_refs(dropped)
+
+    def stage_edit(self, row, ref):
+        """Replace the reference in row by an edited copy."""
+        ref_idx = self._rows[row]
+        if ref_idx not in self._added:
+            self._originals[ref_idx] = self._refs[ref_idx]
+            self._added.add(ref_idx)
+        self._deleted.discard(ref_idx)
+        self._refs[ref_idx] = ref
+        self._ref_changed(ref_idx)
+
+    def get_changes(self):
+        """Return the (ref_idx, ref) pairs to add and to delete."""
+        added = [(ref_idx, self._refs[ref_idx]) for ref_idx in sorted(self._added)]
+        deleted = [(ref_idx, self._refs[ref_idx]) for ref_idx in sorted(self._deleted)]
+        deleted.extend(sorted(self._originals.items()))
+        return added, deleted
+
+    def is_edited(self, ref_idx):
+        """Return if the reference is an edited copy of another one."""
+        return ref_idx in self._originals
+
+    def get_original(self, ref_idx):
+        """Return the reference an edited copy was made from."""
+        return self._originals[ref_idx]
+
+    def commit_changes(self, added, deleted, restored=()):
+        """
+        Apply the successfully written changes to the rows. Edits are done
+        if both the original was deleted and the copy added, edits whose
+        original was restored are undone and the others stay staged as
+        additions of the copy.
+        """
+        removed = []
+        for ref_idx in deleted:
+            if ref_idx in self._originals:
+                original = self._originals.pop(ref_idx)
+                if ref_idx in restored:
+                    self._refs[ref_idx] = original
+                    self._added.discard(ref_idx)
+                    self._ref_changed(ref_idx)
+            elif ref_idx in self._deleted:
+                self._deleted.discard(ref_idx)
+                removed.append(ref_idx)
+        for ref_idx in added:
+            self._added.discard(ref_idx)
+            self._ref_changed(ref_idx)
+        self._remove_refs(removed)
+
+    def discard_changes(self):
+        for ref_idx, ref in self._originals.items():
+            self._refs[ref_idx] = ref
+        new = [ref_idx for ref_idx in self._added if ref_idx not in self._originals]
+        changed = self._deleted | set(self._originals)
+        self._added.clear()
+        self._deleted.clear()
+        self._originals.clear()
+        for ref_idx in changed:
+            self._ref_changed(ref_idx)
+        self._remove_refs(new)
+
+    def _remove_refs(self, ref_idxs):
+        """Remove the rows of the given references in contiguous ranges."""
+        rows = []
+        for ref_idx in ref_idxs:
+            self._refs[ref_idx] = None
+            if ref_idx in self._positions:
+                rows.append(self._positions[ref_idx])
+        if not rows:
+            return
+        rows.sort()
+        end = len(rows)
+        while end > 0:
+            start = end - 1
+            while start > 0 and rows[start - 1] == rows[start] - 1:
+                start -= 1
+            self.beginRemoveRows(QModelIndex(), rows[start], rows[end - 1])
+            del self._rows[rows[start]:rows[end - 1] + 1]
+            self.endRemoveRows()
+            end = start
+        self._update_positions()
+
+    def _update_positions(self, start=0):
+        """Map the references of the rows from start on to their row."""
+        if start == 0:
+            self._positions.clear()
+        for row in range(start, len(self._rows)):
+            self._positions[self._rows[row]] = row
+
+    def _get_text(self, ref_idx, col):
+        key = (ref_idx, col)
+        if key not in self._texts:
+            ref = self._refs[ref_idx]
+            if col == 0:
+                text = self._get_name(ref.ReferenceTypeId)
+            elif col == 1:
+                if ref.NodeId.NamespaceIndex == 0 and ref.NodeId.Identifier in ua.ObjectIdNames:
+                    text = ua.ObjectIdNames[ref.NodeId.Identifier]
+                else:
+                    text = ref.NodeId.to_string()
+            elif col == 2:
+                text = ref.BrowseName.to_string()
+            else:
+                text = self._get_name(ref.TypeDefinition)
+            self._texts[key] = text
+        return self._texts[key]
+
+    def canFetchMore(self, parent):
+        return not parent.isValid() and bool(self.continuation_point)
+
+    def fetchMore(self, parent):
+        if self.canFetchMore(parent):
+            self._widget.fetch_more()
+
+    def append_refs(self, refs):
+        start = len(self._refs)
+        self._refs.extend(refs)
+        new_rows = [ref_idx for ref_idx in range(start, len(self._refs))
+                    if self._accepts(ref_idx)]
+        if not new_rows:
+            return
+        if self._sort_column >= 0:
+            # merge the sorted page into the sorted rows
+            key = self._get_sort_key
+            reverse = self._sort_order == Qt.DescendingOrder
+            new_rows.sort(key=key, reverse=reverse)
+            self._set_rows(list(heapq.merge(self._rows, new_rows, key=key,
+                                            reverse=reverse)))
+            return
+        first = len(self._rows)
+        self.beginInsertRows(QModelIndex(), first, first + len(new_rows) - 1)
+        self._rows.extend(new_rows)
+        self._update_positions(first)
+        self.endInsertRows()
+
+    def get_row(self, ref):
+        """Return the row showing ref, or -1 if it is filtered out."""
+        for ref_idx in reversed(range(len(self._refs))):
+            if self._refs[ref_idx] is ref:
+                return self._positions.get(ref_idx, -1)
+        return -1
+
+    def get_reference_types(self):
+        """Return the ReferenceTypeIds used by the loaded references."""
+        return list(dict.fromkeys(ref.ReferenceTypeId for ref in self._refs
+                                  if ref is not None))
+
+    def get_type_filter(self):
+        return self._type_filter
+
+    def set_type_filter(self, reftype):
+        """Only show references of the given type, None shows all."""
+        if reftype != self._type_filter:
+            self._type_filter = reftype
+            self._relayout()
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        self._sort_column = column
+        self._sort_order = order
+        self._relayout()
+
+    def _accepts(self, ref_idx):
+        ref = self._refs[ref_idx]
+        return ref is not None and (self._type_filter is None
+                                    or ref.ReferenceTypeId == self._type_filter)
+
+    def _get_sort_key(self, ref_idx):
+        return self._get_text(ref_idx, self._sort_column)
+
+    def _relayout(self):
+        """Filter and sort all rows again."""
+        rows = [ref_idx for ref_idx in range(len(self._refs))
+                if self._accepts(ref_idx)]
+        if self._sort_column >= 0:
+            rows.sort(key=self._get_sort_key,
+                      reverse=self._sort_order == Qt.DescendingOrder)
+        self._set_rows(rows)
+
+    def _set_rows(self, rows):
+        """Show the given rows, keeping persistent indexes."""
+        self.layoutAboutToBeChanged.emit()
+        old_indexes = self.persistentIndexList()
+        old_refs = [self._rows[idx.row()] for idx in old_indexes]
+        self._rows = rows
+        self._update_positions()
+        new_indexes = [self.index(self._positions[ref_idx], idx.column())
+                       if ref_idx in self._positions else QModelIndex()
+                       for idx, ref_idx in zip(old_indexes, old_refs)]
+        self.changePersistentIndexList(old_indexes, new_indexes)
+        self.layoutChanged.emit()
 
 
 class MyDelegate(QStyledItemDelegate):
 
     error = pyqtSignal(Exception)
-    reference_changed = pyqtSignal(Node)
 
     def __init__(self, parent, widget):
         QStyledItemDelegate.__init__(self, parent)
@@ -162,9 +671,7 @@ class MyDelegate(QStyledItemDelegate):
     def createEditor(self, parent, option, idx):
         if idx.column() > 1:
             return None
-        data_idx = idx.sibling(idx.row(), 0)
-        item = self._widget.model.itemFromIndex(data_idx)
-        ref = item.data(Qt.UserRole)
+        ref = idx.sibling(idx.row(), 0).data(Qt.UserRole)
         if idx.column() == 1:
             node = Node(self._widget.node.server, ref.NodeId)
             startnode = Node(self._widget.node.server, ua.ObjectIds.RootFolder)
@@ -178,36 +685,10 @@ class MyDelegate(QStyledItemDelegate):
 
     def setModelData(self, editor, model, idx):
         data_idx = idx.sibling(idx.row(), 0)
-        ref = model.data(data_idx, Qt.UserRole)
-        self._widget.do_remove_ref(ref, check=False)
+        ref = copy(model.data(data_idx, Qt.UserRole))
         if idx.column() == 0:
             ref.ReferenceTypeId = editor.get_node().nodeid
-            model.setData(idx, ref.ReferenceTypeId.to_string(), Qt.DisplayRole)
         elif idx.column() == 1:
             ref.NodeId = editor.get_node().nodeid
             ref.NodeClass = editor.get_node().get_node_class()
-            model.setData(idx, ref.NodeId.to_string(), Qt.DisplayRole)
-        model.setData(data_idx, ref, Qt.UserRole)
-        if ref.NodeId.is_null() or ref.ReferenceTypeId.is_null():
-            logger.info("Do not save yet. Need NodeId and ReferenceTypeId to be set")
-            return
-        self._write_ref(ref)
-
-    def _write_ref(self, ref):
-        logger.info("Writing ref %s", ref)
-        it = ua.AddReferencesItem()
-        it.SourceNodeId = self._widget.node.nodeid
-        it.ReferenceTypeId = ref.ReferenceTypeId
-        it.IsForward = ref.IsForward
-        it.TargetNodeId = ref.NodeId
-        it.TargetNodeClass = ref.NodeClass
-
-        results = self._widget.node.server.add_references([it])
-        results[0].check()
-
-        self.reference_changed.emit(self._widget.node)
-        self._widget.reload()
-
-
-
-
+        self._widget.edit_ref(idx.row(), ref)
@@ -7,7 +7,8 @@ from PyQt5.QtGui import QStandardItemModel, QStandardItem, QIcon
 from PyQt5.QtWidgets import QApplication, QTreeView, QHeaderView
 
 from asyncua.ua import ReferenceDescription, ObjectIds, TwoByteNodeId, \
-    NodeClass
+    NodeClass, NodeId
+from asyncua import Node as AsyncNode
 from asyncua.sync import Node
 
 
@@ -16,11 +17,16 @@ class TreeWidget(QObject):
 
     HEADER_LABELS = ['DisplayName', "BrowseName", 'NodeId']
 
-    def __init__(self, view: QTreeView) -> None:
-        """Create a new TreeWidget."""
+    def __init__(self, view: QTreeView, display_names=None,
+                 reference_index=None) -> None:
+        """
+        Create a new TreeWidget, the names of browsed nodes are added to
+        the optional display_names cache and their references to the
+        optional reference_index.
+        """
         QObject.__init__(self, view)
         self._view = view
-        self._model = TreeViewModel()
+        self._model = TreeViewModel(display_names, reference_index)
         self._view.setModel(self._model)
 
         self._model.setHorizontalHeaderLabels(TreeWidget.HEADER_LABELS)
@@ -50,6 +56,14 @@ class TreeWidget(QObject):
         self._model.set_root_node(node)
         self._view.expandToDepth(0)
 
+    def set_reference_filter(self, reftype: NodeId,
+                             include_subtypes: bool = True) -> None:
+        """Set the references followed to the children and reload."""
+        root_node = self._model.get_root_node()
+        self._model.set_reference_filter(reftype, include_subtypes)
+        if root_node is not None:
+            self.set_root_node(root_node)
+
     def copy_path(self) -> None:
         """Copy the current path to the Clipboard."""
         path = self.get_current_path()
@@ -92,17 +106,27 @@ class TreeWidget(QObject):
         logging.debug("Got node for Index: %s", node)
         return node
 
+    def get_selected_nodes(self) -> List[Node]:
+        """Get all selected nodes."""
+        return [self._model.itemFromIndex(index).data(Qt.UserRole)
+                for index in self._view.selectionModel().selectedRows(0)]
+
 
 class TreeViewModel(QStandardItemModel):
     """Tree view model containing Nodes of the connected server."""
 
     # pylint: disable=invalid-name
-    def __init__(self) -> None:
+    def __init__(self, display_names=None, reference_index=None) -> None:
         """Create a new TreeViewModel."""
         super(TreeViewModel, self).__init__()
+        self._display_names = display_names
+        self._reference_index = reference_index
         self._fetched: List[Node] = []
         self._descr_cache: Dict[Node, ReferenceDescription] = {}
         self._root_node: Optional[Node] = None
+        # ReferenceTypeId and IncludeSubtypes browsed for the children
+        self._reftype: NodeId = TwoByteNodeId(ObjectIds.HierarchicalReferences)
+        self._include_subtypes: bool = True
 
     def clear(self) -> None:
         """Remove all items and reset the header."""
@@ -112,6 +136,25 @@ class TreeViewModel(QStandardItemModel):
         self._descr_cache.clear()
         self._root_node = None
 
+    def get_root_node(self) -> Optional[Node]:
+        """Return the root node of the model."""
+        return self._root_node
+
+    def set_reference_filter(self, reftype: NodeId,
+                             include_subtypes: bool) -> None:
+        """Set the references browsed for the children of the nodes."""
+        self._reftype = reftype
+        self._include_subtypes = include_subtypes
+
+    def _get_children_descriptions(self, node: Node)\
+            -> List[ReferenceDescription]:
+        """Browse the children of a node with the reference filter."""
+        descriptions = node.get_children_descriptions(
+            refs=self._reftype, includesubtypes=self._include_subtypes)
+        if self._reference_index is not None:
+            self._reference_index.add(node.nodeid, descriptions)
+        return descriptions
+
     def set_root_node(self, node: Node) -> None:
         """Set the root node for the model."""
         self._root_node = node
@@ -134,7 +177,10 @@ class TreeViewModel(QStandardItemModel):
                               parent: QStandardItem) -> None:
         """Add an item to the model with the given parent."""
         parent_node = parent.data(Qt.UserRole)
-        node = parent_node.get_child(desc.BrowseName.to_string())
+        # children reached by non hierarchical references have no path to
+        # translate, so the node is made from the NodeId of the reference
+        node = Node(parent_node.tloop,
+                    AsyncNode(parent_node.aio_obj.server, desc.NodeId))
         item = self._create_items(desc, node)
         parent.appendRow(item)
 
@@ -204,7 +250,7 @@ class TreeViewModel(QStandardItemModel):
         try:
             return bool(self._descr_cache[node])
         except KeyError:
-            descriptions = node.get_children_descriptions()
+            descriptions = self._get_children_descriptions(node)
             self._descr_cache[node] = descriptions
             return bool(descriptions)
 
@@ -213,9 +259,14 @@ class TreeViewModel(QStandardItemModel):
         parent = self.itemFromIndex(idx)
         node = parent.data(Qt.UserRole)
         self._fetched.append(node)
-        descriptions = node.get_children_descriptions()
+        descriptions = self._get_children_descriptions(node)
         descriptions.sort(key=lambda x: x.BrowseName)
         self._descr_cache[node] = descriptions
+        if self._display_names is not None:
+            for desc in descriptions:
+                if desc.DisplayName.Text:
+                    self._display_names.set_name(desc.NodeId,
+                                                 desc.DisplayName.Text)
         for desc in descriptions:
             self._add_item_with_parent(desc, parent)
 